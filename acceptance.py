@@ -0,0 +1,133 @@
+import math
+
+
+class GreedyAcceptance:
+    '''Accepts only changes which make score strictly better'''
+
+    # score of accepted changes never gets worse
+    monotonic = True
+
+    def start(self, numIterations: int):
+        pass
+
+    def step(self, iteration: int, improvedBest: bool):
+        pass
+
+    def accept(self, delta: float, rng) -> bool:
+        return delta < 0
+
+    def describe(self) -> str:
+        return "greedy"
+
+
+class Metropolis:
+    '''Accepts worse changes with probability exp(-delta / T) at constant temperature T'''
+
+    monotonic = False
+
+    def __init__(self, temperature: float):
+        if temperature <= 0:
+            raise ValueError("Temperature must be > 0")
+        self.temperature = temperature
+
+    def start(self, numIterations: int):
+        pass
+
+    def step(self, iteration: int, improvedBest: bool):
+        pass
+
+    def accept(self, delta: float, rng) -> bool:
+        if delta < 0:
+            return True
+        return rng.random() < math.exp(-delta / self.temperature)
+
+    def describe(self) -> str:
+        return f"metropolis (T: {self.temperature})"
+
+
+class SimulatedAnnealing:
+    '''
+    Simulated annealing: worse changes are accepted with probability exp(-delta / T).
+    Temperature T goes from <initialTemperature> to <finalTemperature> during the stage
+    (geometric or linear cooling). If there is no new best score for <reheatAfter> iterations,
+    cooling restarts from <reheatFactor> * <initialTemperature> for the rest of the stage.
+    '''
+
+    monotonic = False
+
+    GEOMETRIC = "geometric"
+    LINEAR = "linear"
+
+    def __init__(self, initialTemperature: float = 10.0, finalTemperature: float = 0.5,
+                 cooling: str = GEOMETRIC, reheatAfter: int = None, reheatFactor: float = 0.5):
+        if cooling not in (SimulatedAnnealing.GEOMETRIC, SimulatedAnnealing.LINEAR):
+            raise ValueError(f"Unknown cooling schedule: {cooling}")
+        if initialTemperature <= 0 or finalTemperature <= 0:
+            raise ValueError("Temperatures must be > 0")
+        self.initialTemperature = initialTemperature
+        self.finalTemperature = finalTemperature
+        self.cooling = cooling
+        self.reheatAfter = reheatAfter
+        self.reheatFactor = reheatFactor
+
+    def start(self, numIterations: int):
+        self.numIterations = max(1, numIterations)
+        self.phaseStart = 0
+        self.phaseTemperature = self.initialTemperature
+        self.lastBest = 0
+        self.reheats = 0
+        self.temperature = self.initialTemperature
+
+    def step(self, iteration: int, improvedBest: bool):
+        '''Updates temperature before <iteration>'''
+        if improvedBest:
+            self.lastBest = iteration
+        elif self.reheatAfter is not None and iteration - self.lastBest >= self.reheatAfter:
+            self.phaseStart = iteration
+            self.phaseTemperature = max(self.finalTemperature, self.reheatFactor * self.initialTemperature)
+            self.lastBest = iteration
+            self.reheats += 1
+
+        length = max(1, self.numIterations - self.phaseStart)
+        progress = min(1.0, (iteration - self.phaseStart) / length)
+        if self.cooling == SimulatedAnnealing.GEOMETRIC:
+            self.temperature = self.phaseTemperature * (self.finalTemperature / self.phaseTemperature) ** progress
+        else:
+            self.temperature = self.phaseTemperature + (self.finalTemperature - self.phaseTemperature) * progress
+
+    def accept(self, delta: float, rng) -> bool:
+        if delta < 0:
+            return True
+        return rng.random() < math.exp(-delta / self.temperature)
+
+    def describe(self) -> str:
+        return f"annealing (T: {self.initialTemperature} -> {self.finalTemperature}, {self.cooling}, reheats: {self.reheats})"
+
+
+class ContinuedAcceptance:
+    '''
+    Wraps <acceptance>, so that consecutive stages continue one schedule
+    of <numIterations> iterations instead of restarting it every stage
+    (e.g. annealing cools down once over all rungs of successive halving).
+    '''
+
+    def __init__(self, acceptance, numIterations: int):
+        self.acceptance = acceptance
+        self.monotonic = acceptance.monotonic
+        self.offset = 0
+        self.stageIterations = 0
+        acceptance.start(numIterations)
+
+    def start(self, numIterations: int):
+        self.offset += self.stageIterations
+        self.stageIterations = 0
+
+    def step(self, iteration: int, improvedBest: bool):
+        self.stageIterations = iteration + 1
+        self.acceptance.step(self.offset + iteration, improvedBest)
+
+    def accept(self, delta: float, rng) -> bool:
+        return self.acceptance.accept(delta, rng)
+
+    def describe(self) -> str:
+        return self.acceptance.describe()
@@ -0,0 +1,55 @@
+import math
+
+
+def solveAssignment(cost: list) -> list:
+    '''
+    Hungarian algorithm (shortest augmenting paths with potentials), O(n^3).
+    Finds assignment of n rows to n columns of square <cost> matrix with minimal total cost.
+    Returns list: column of every row.
+    '''
+    n = len(cost)
+
+    # potentials of rows and columns, row matched to every column (1-based, 0 is a fake column)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (n + 1)
+    match = [0] * (n + 1)
+    way = [0] * (n + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        minValues = [math.inf] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[column] = True
+            current = match[column]
+            delta = math.inf
+            nextColumn = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    value = cost[current - 1][j - 1] - u[current] - v[j]
+                    if value < minValues[j]:
+                        minValues[j] = value
+                        way[j] = column
+                    if minValues[j] < delta:
+                        delta = minValues[j]
+                        nextColumn = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minValues[j] -= delta
+            column = nextColumn
+            if match[column] == 0:
+                break
+
+        # augment along the path
+        while column != 0:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+
+    result = [0] * n
+    for j in range(1, n + 1):
+        result[match[j] - 1] = j - 1
+    return result
@@ -0,0 +1,270 @@
+'''
+Performance benchmarks: scoring functions, optimizer throughput and time to reach a target score
+for every preset of main.Configurations and synthetic larger tournaments.
+
+    python benchmark.py                          # run and print results
+    python benchmark.py --save baseline.json     # store results as a baseline
+    python benchmark.py --compare baseline.json  # flag regressions against a baseline (exit code 1)
+
+Timings depend on the machine and on the metrics backend (numpy or not),
+so baselines are only comparable on the same environment, see Benchmark.environment.
+'''
+from configuration import Configuration
+from schedule_factory import ScheduleFactory
+from metrics import Metrics
+from optimize_opponents import OptimizeOpponents
+from optimize_seats import OptimizeSeats
+from stopping import StoppingCriteria, StopReason
+from instrumentation import StatsCollector
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import timeit
+
+
+SyntheticConfigurations = {
+    "Synthetic-60":
+        Configuration(numPlayers=60, numTables=6, numRounds=12,
+                      numGames=72, numAttempts=12),
+    "Synthetic-100":
+        Configuration(numPlayers=100, numTables=10, numRounds=10,
+                      numGames=100, numAttempts=10),
+}
+
+# name -> (opponents target, seats target) for time-to-target measurements:
+# greedy optimization from the default start reaches them within a few thousand iterations
+TargetScores = {
+    "VaWaCa-2017": (700, 400),
+    "VaWaCa-2019": (850, 300),
+    "MiniTournament12": (14400, 60),
+    "GG-2021": (1000, 320),
+    "Synthetic-60": (2500, 520),
+    "Synthetic-100": (19000, 1100),
+}
+
+
+def allConfigurations() -> dict:
+    from main import Configurations
+    return {**Configurations, **SyntheticConfigurations}
+
+
+def higherIsBetter(metric: str) -> bool:
+    '''Throughput metrics grow with performance, times and iterations to target shrink'''
+    return metric.endswith("PerSecond")
+
+
+def bestTime(func, repeat: int) -> float:
+    '''
+    Seconds per call of <func>: the best of <repeat> loops, every loop takes at least 0.2 seconds
+    (single calls take microseconds, their timings are too noisy)
+    '''
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+class Benchmark:
+    '''
+    Measures for every configuration (results are keyed by metric name):
+    - metricsPenaltySeconds, metricsSeatsSeconds: Metrics.penaltyPlayers and Metrics.calcSeatsMatrix
+    - opponentsScoreSeconds, seatsScoreSeconds: OptimizeOpponents.scoreFunc and OptimizeSeats.scoreFunc
+    - opponentsIterationsPerSecond, seatsIterationsPerSecond: greedy swaps of <iterations> iterations
+    - opponentsTargetIterations/Seconds, seatsTargetIterations/Seconds: greedy optimization until
+      the score from TargetScores (None if not reached within <maxTargetIterations>)
+    Every timing is the best of <repeat> measurements.
+    Scoring functions are measured on a balanced schedule (see ScheduleFactory.createBalancedSchedule),
+    all runs use <seed>, so iterations to target are reproducible.
+    '''
+
+    def __init__(self, iterations: int = 20 * 1000, repeat: int = 3, seed: int = 1,
+                 maxTargetIterations: int = 100 * 1000):
+        self.iterations = iterations
+        self.repeat = repeat
+        self.seed = seed
+        self.maxTargetIterations = maxTargetIterations
+
+    @staticmethod
+    def environment() -> dict:
+        try:
+            import numpy
+            numpyVersion = numpy.__version__
+        except ImportError:
+            numpyVersion = None
+        return {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "numpy": numpyVersion,
+        }
+
+    def run(self, configurations: dict, log=print) -> dict:
+        results = {}
+        for name, conf in configurations.items():
+            conf.validate()
+            log(f"Benchmark: {name}")
+            results[name] = self.runConfiguration(name, conf)
+        return {"environment": Benchmark.environment(), "results": results}
+
+    def runConfiguration(self, name: str, conf: Configuration) -> dict:
+        result = {}
+        schedule = ScheduleFactory.createBalancedSchedule(conf, self.seed)
+
+        result["metricsPenaltySeconds"] = bestTime(lambda: Metrics.create(schedule).penaltyPlayers(), self.repeat)
+        result["metricsSeatsSeconds"] = bestTime(lambda: Metrics.create(schedule).calcSeatsMatrix(), self.repeat)
+
+        opponents = OptimizeOpponents(verbose=False)
+        opponents.schedule = schedule
+        result["opponentsScoreSeconds"] = bestTime(opponents.scoreFunc, self.repeat)
+        result["seatsScoreSeconds"] = bestTime(OptimizeSeats(schedule, verbose=False).scoreFunc, self.repeat)
+
+        stats = self.optimizeOpponents(conf, self.iterations)
+        result["opponentsIterationsPerSecond"] = stats.iterationsPerSecond
+        stats = self.optimizeSeats(conf, self.iterations)
+        result["seatsIterationsPerSecond"] = stats.iterationsPerSecond
+
+        opponentsTarget, seatsTarget = TargetScores.get(name, (None, None))
+        if opponentsTarget is not None:
+            stats = self.optimizeOpponents(conf, self.maxTargetIterations, StoppingCriteria(targetScore=opponentsTarget))
+            result.update(Benchmark.targetResults("opponents", stats))
+        if seatsTarget is not None:
+            stats = self.optimizeSeats(conf, self.maxTargetIterations, StoppingCriteria(targetScore=seatsTarget))
+            result.update(Benchmark.targetResults("seats", stats))
+        return result
+
+    def optimizeOpponents(self, conf: Configuration, numIterations: int, stop: StoppingCriteria = None):
+        collector = StatsCollector(progressInterval=numIterations)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(self.repeat):
+                OptimizeOpponents(verbose=False, listener=collector).optimize(
+                    conf, numRuns=1, numIterations=numIterations, seed=self.seed, stop=stop)
+        return Benchmark.fastestStage(collector)
+
+    def optimizeSeats(self, conf: Configuration, numIterations: int, stop: StoppingCriteria = None):
+        collector = StatsCollector(progressInterval=numIterations)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(self.repeat):
+                schedule = ScheduleFactory.createBalancedSchedule(conf, self.seed)
+                OptimizeSeats(schedule, verbose=False, listener=collector).optimize(
+                    numRuns=1, iterations=[numIterations], seed=self.seed, stop=stop)
+        return Benchmark.fastestStage(collector)
+
+    @staticmethod
+    def fastestStage(collector: StatsCollector):
+        '''Runs with the same seed do the same iterations, only their time differs'''
+        return min(collector.stages, key=lambda stats: stats.seconds)
+
+    @staticmethod
+    def targetResults(optimizer: str, stats) -> dict:
+        reached = stats.stopReason in (StopReason.TARGET_SCORE, StopReason.LOWER_BOUND)
+        return {
+            f"{optimizer}TargetIterations": stats.iterations if reached else None,
+            f"{optimizer}TargetSeconds": stats.seconds if reached else None,
+        }
+
+    @staticmethod
+    def compare(baseline: dict, current: dict, tolerance: float = 0.15) -> list:
+        '''
+        Compares <current> benchmark with <baseline>, returns list of regressions:
+        (configuration, metric, baseline value, current value) for every metric
+        worse than baseline by more than <tolerance> (relative). A target which is
+        no longer reached is a regression; configurations and metrics missing
+        in one of the benchmarks are skipped.
+        '''
+        regressions = []
+        for name, baseResults in baseline["results"].items():
+            results = current["results"].get(name)
+            if results is None:
+                continue
+            for metric, baseValue in baseResults.items():
+                if metric not in results or baseValue is None:
+                    continue
+                value = results[metric]
+                if value is None:
+                    worse = True
+                elif higherIsBetter(metric):
+                    worse = value < baseValue * (1 - tolerance)
+                else:
+                    worse = value > baseValue * (1 + tolerance)
+                if worse:
+                    regressions.append((name, metric, baseValue, value))
+        return regressions
+
+    @staticmethod
+    def describe(benchmark: dict, baseline: dict = None) -> str:
+        '''Text table of results, with relative changes against <baseline>'''
+        lines = []
+        for name, results in benchmark["results"].items():
+            lines.append(f"{name}:")
+            baseResults = baseline["results"].get(name, {}) if baseline is not None else {}
+            for metric, value in results.items():
+                line = f"    {metric:30s} {Benchmark.formatValue(value):>14s}"
+                baseValue = baseResults.get(metric)
+                if baseValue and value is not None:
+                    line += f"  ({value / baseValue - 1:+.1%} vs {Benchmark.formatValue(baseValue)})"
+                lines.append(line)
+        return "\n".join(lines)
+
+    @staticmethod
+    def formatValue(value) -> str:
+        if value is None:
+            return "not reached"
+        if isinstance(value, int):
+            return str(value)
+        if value < 0.01:
+            return f"{value * 1e6:.1f}us"
+        if value < 100:
+            return f"{value:.4f}"
+        return f"{value:.0f}"
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description="Performance benchmarks of scoring and optimizers")
+    parser.add_argument("--save", metavar="FILE", help="store results as JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="flag regressions against JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative slowdown reported as regression (default: 0.15)")
+    parser.add_argument("--configs", nargs="+", metavar="NAME", help="benchmark only these configurations")
+    parser.add_argument("--iterations", type=int, default=20 * 1000,
+                        help="iterations of throughput measurements (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of scoring timings (default: 3)")
+    parser.add_argument("--seed", type=int, default=1)
+    options = parser.parse_args(args)
+
+    configurations = allConfigurations()
+    if options.configs:
+        unknown = [name for name in options.configs if name not in configurations]
+        if unknown:
+            parser.error(f"unknown configurations: {', '.join(unknown)} (known: {', '.join(configurations)})")
+        configurations = {name: configurations[name] for name in options.configs}
+
+    baseline = None
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+
+    benchmark = Benchmark(options.iterations, options.repeat, options.seed).run(configurations)
+    print(Benchmark.describe(benchmark, baseline))
+
+    if options.save:
+        with open(options.save, "w") as f:
+            json.dump(benchmark, f, indent=2)
+        print(f"Baseline saved: {options.save}")
+
+    if baseline is None:
+        return 0
+    if baseline.get("environment") != benchmark["environment"]:
+        print(f"Warning: baseline environment differs: {baseline.get('environment')}")
+    regressions = Benchmark.compare(baseline, benchmark, options.tolerance)
+    for name, metric, baseValue, value in regressions:
+        print(f"REGRESSION {name} {metric}: {Benchmark.formatValue(baseValue)} -> {Benchmark.formatValue(value)}")
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import functools
+import math
+
+from configuration import Configuration
+from schedule_factory import ScheduleFactory
+from metrics import Metrics
+from opponents_score import OpponentsScore
+from seats_score import SeatsScore
+
+
+class Bounds:
+    '''
+    Theoretical lower bounds of OptimizeOpponents.scoreFunc and OptimizeSeats.scoreFunc
+    for given configuration. Bounds are calculated for every player independently,
+    so they may be not reachable, but no schedule can have a better score.
+    '''
+
+    # relative tolerance to compare scores with bounds
+    tolerance = 1e-9
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def opponentsLowerBound(conf: Configuration) -> float:
+        '''Lower bound of OptimizeOpponents.scoreFunc'''
+        numPlayers = conf.numPlayers
+        numPairs = numPlayers - 1
+
+        # weights and ideal histogram, the same as in OpponentsScore
+        schedule = ScheduleFactory.createInitialSchedule(conf)
+        ideal = Metrics(schedule).penaltyIdealHistogram()
+        target = 9 * conf.numAttempts / numPairs
+        weights = [(idx - target) ** 2 for idx in range(conf.numAttempts + 1)]
+        costs = [[weights[idx] * abs(ideal[idx] - value) for value in range(numPairs + 1)]
+                 for idx in range(conf.numAttempts + 1)]
+
+        # two players can't miss more games than there are,
+        # so they play together at least 2 * numAttempts - numGames times
+        minTogether = max(0, 2 * conf.numAttempts - conf.numGames)
+        for idx in range(minTogether):
+            for value in range(1, numPairs + 1):
+                costs[idx][value] = math.inf
+
+        # min player penalty with and without exactly one zero pair
+        withZero = Bounds.minPairsPenalty(costs, numPairs, 9 * conf.numAttempts, [1])
+        noZero = Bounds.minPairsPenalty(costs, numPairs, 9 * conf.numAttempts,
+                                        [value for value in range(numPairs + 1) if value != 1])
+
+        best = math.inf
+        for zeroPlayers in range(numPlayers + 1):
+            if (zeroPlayers > 0 and withZero == math.inf) or (zeroPlayers < numPlayers and noZero == math.inf):
+                continue
+            penalty = 0.0
+            if zeroPlayers > 0:
+                penalty += zeroPlayers * withZero
+            if zeroPlayers < numPlayers:
+                penalty += (numPlayers - zeroPlayers) * noZero
+            zeroPenalty = OpponentsScore.zeroFactor * (zeroPlayers - OpponentsScore.expectedZeroPlayers) ** 2
+            best = min(best, penalty + zeroPenalty)
+        return best
+
+    @staticmethod
+    def minPairsPenalty(costs: list, numPairs: int, numGames: int, zeroValues: list) -> float:
+        '''
+        Minimal penalty of pairs histogram h (dynamic programming by histogram bins):
+        sum(h) == numPairs (every opponent once), sum(idx * h[idx]) == numGames
+        (9 opponents in every game), h[0] is one of <zeroValues>.
+        <costs>[idx][value] is penalty of h[idx] == value.
+        '''
+        # best[pairs][games] - min penalty of already processed bins
+        best = [[math.inf] * (numGames + 1) for _ in range(numPairs + 1)]
+        for value in zeroValues:
+            if value <= numPairs:
+                best[value][0] = costs[0][value]
+
+        for idx in range(1, len(costs)):
+            nextBest = [[math.inf] * (numGames + 1) for _ in range(numPairs + 1)]
+            for pairs in range(numPairs + 1):
+                for games in range(numGames + 1):
+                    penalty = best[pairs][games]
+                    if penalty == math.inf:
+                        continue
+                    maxValue = min(numPairs - pairs, (numGames - games) // idx)
+                    for value in range(maxValue + 1):
+                        newPenalty = penalty + costs[idx][value]
+                        line = nextBest[pairs + value]
+                        if newPenalty < line[games + idx * value]:
+                            line[games + idx * value] = newPenalty
+            best = nextBest
+        return best[numPairs][numGames]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def seatsLowerBound(conf: Configuration) -> float:
+        '''Lower bound of OptimizeSeats.scoreFunc'''
+        numAttempts = conf.numAttempts
+        target = numAttempts / 10
+
+        def balanced(total: int, numSeats: int) -> float:
+            # min sum of square deviations of <numSeats> seats with <total> games
+            q, r = divmod(total, numSeats)
+            return r * (q + 1 - target) ** 2 + (numSeats - r) * (q - target) ** 2
+
+        # enumerate first and last seats and seat groups [0:3], [3:7], [7:10]
+        best = math.inf
+        for first in range(numAttempts + 1):
+            for last in range(numAttempts + 1 - first):
+                for a in range(first, numAttempts + 1 - last):
+                    for c in range(last, numAttempts + 1 - a):
+                        b = numAttempts - a - c
+                        sd = (first - target) ** 2 + balanced(a - first, 2) + balanced(b, 4) + \
+                            balanced(c - last, 2) + (last - target) ** 2
+                        penalty = sd / 10
+                        if SeatsScore.calcTrippleSimmetry:
+                            penalty += SeatsScore.factorTripple * (
+                                (10 * a / numAttempts - 3) ** 2 +
+                                (10 * b / numAttempts - 4) ** 2 +
+                                (10 * c / numAttempts - 3) ** 2)
+                        if SeatsScore.calcFirstLastSimmetry:
+                            penalty += SeatsScore.factorFirstLast * (
+                                (10 * first / numAttempts - 1) ** 2 +
+                                (10 * last / numAttempts - 1) ** 2)
+                        best = min(best, penalty)
+
+        # half simmetry term is not negative, so the bound stays valid without it
+        return conf.numPlayers * best
+
+    @staticmethod
+    def reached(score: float, bound: float) -> bool:
+        '''Checks if <score> is equal to lower <bound> (up to rounding errors)'''
+        return score <= bound + Bounds.tolerance * max(1.0, abs(bound))
+
+    @staticmethod
+    def gap(score: float, bound: float) -> float:
+        '''Optimality gap: how much <score> is worse than lower <bound>'''
+        return max(0.0, score - bound)
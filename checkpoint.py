@@ -0,0 +1,94 @@
+import os
+import pickle
+import threading
+
+
+class Checkpoint:
+    '''
+    Periodic checkpoints of a long optimization (see OptimizeOpponents.optimize and OptimizeSeats.optimize)
+    and the source for their resume().
+
+    Every <interval> iterations optimizer passes its state to save(). The state is pickled at once,
+    so it's consistent, and written to disk by a background thread, so iterations don't wait for the disk.
+    Data goes to a temporary file which then replaces <path> (os.replace is atomic),
+    so <path> always holds a complete checkpoint, even after a crash in the middle of writing.
+    If the writer is still busy with the previous checkpoint, only the latest state is kept.
+    '''
+
+    def __init__(self, path: str, interval: int = 100 * 1000):
+        if interval < 1:
+            raise ValueError(f"interval must be >= 1 (value: {interval})")
+        self.path = path
+        self.interval = interval
+        self.writes = 0
+
+        self._condition = threading.Condition()
+        self._pending = None
+        self._closing = False
+        self._error = None
+        self._thread = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> dict:
+        '''Loads the last saved state'''
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, state: dict):
+        '''Schedules writing of <state>, returns without waiting for the disk'''
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._condition:
+            self._raiseError()
+            self._pending = data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="checkpoint writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def close(self, remove: bool = False):
+        '''
+        Waits until the last state is written and stops the writer.
+        With <remove> (optimization is complete) the checkpoint file is removed.
+        '''
+        with self._condition:
+            thread = self._thread
+            self._closing = True
+            self._condition.notify()
+        if thread is not None:
+            thread.join()
+        with self._condition:
+            self._thread = None
+            self._closing = False
+            self._raiseError()
+
+        if remove and self.exists():
+            os.remove(self.path)
+
+    def _raiseError(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Can't write checkpoint: {self.path}") from error
+
+    def _writer(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                data, self._pending = self._pending, None
+
+            try:
+                tmpPath = self.path + ".tmp"
+                with open(tmpPath, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmpPath, self.path)
+                self.writes += 1
+            except OSError as e:
+                with self._condition:
+                    self._error = e
+                return
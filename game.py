@@ -49,20 +49,57 @@ class Game:
 
 class GameSet:
     '''
-    Game for opponents optimization, just set of players, without seat numbers
+    Game for opponents optimization, just set of players, without seat numbers.
+    Players are stored as bitmask: bit <id> is set if player <id> plays the game.
     '''
     
     id: int
-    players: set[int] = {}
+    mask: int
 
     def __init__(self, id: int, players: set):
         self.id = id
-        self.players = players
+        self.mask = playersMask(players)
+
+    @property
+    def players(self) -> set[int]:
+        return set(maskPlayers(self.mask))
+
+    def __len__(self):
+        return maskCount(self.mask)
+
+    def contains(self, playerId: int) -> bool:
+        return (self.mask >> playerId) & 1 == 1
+
+    def swap(self, playerOut: int, playerIn: int):
+        '''Replaces <playerOut> with <playerIn>'''
+        self.mask ^= (1 << playerOut) | (1 << playerIn)
 
     @staticmethod
     def create(game: Game) -> GameSet:
         '''Creates a GameSet from Game'''
-        player_set = {id for id in game.players}
-        return GameSet(game.id, player_set)
-
-
+        return GameSet(game.id, game.players)
+
+
+def playersMask(players) -> int:
+    '''Converts collection of player ids to bitmask'''
+    mask = 0
+    for id in players:
+        mask |= 1 << id
+    return mask
+
+def maskPlayers(mask: int):
+    '''Iterates player ids of bitmask in ascending order'''
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def maskCount(mask: int) -> int:
+    '''Number of players in bitmask'''
+    return bin(mask).count('1')
+
+def maskChoice(mask: int, rng) -> int:
+    '''Picks random player id from non-empty bitmask using <rng>'''
+    for _ in range(rng.randrange(maskCount(mask))):
+        mask &= mask - 1
+    return (mask & -mask).bit_length() - 1
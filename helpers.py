@@ -1,8 +1,17 @@
 import json
 import os.path
+import random
 
 from schedule import *
 
+def runSeeds(seed: int, numRuns: int) -> list[int]:
+    '''
+    Derives seeds for <numRuns> independent optimization runs from single <seed>.
+    If <seed> is None, seeds are random.
+    '''
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(numRuns)]
+
 def saveSchedule(schedule: Schedule, fname: str):
     jsonDict = schedule.toJson()
     jsonStr = json.dumps(jsonDict, indent=2)
@@ -32,7 +41,6 @@ def loadSchedule(fname: str) -> Schedule:
     d = json.loads(s)
 
     s = Schedule.fromJson(d)
-    s.generateSlotsFromGames()
     return s
 
 def loadParticipants(fname: str) -> Participants:
@@ -0,0 +1,342 @@
+from array import array
+import copy
+
+import numpy as np
+
+from configuration import Configuration
+from schedule import Schedule
+from schedule_factory import ScheduleFactory
+from optimize_opponents import OptimizeOpponents
+from opponents_score import OpponentsScore
+from seats_score import SeatsScore
+from acceptance import GreedyAcceptance, Metropolis, SimulatedAnnealing
+from stopping import StoppingCriteria, StoppingState, StopReason
+from bounds import Bounds
+
+
+def acceptMany(acceptance, deltas: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    '''Vectorized <acceptance>.accept for score changes of all chains'''
+    if isinstance(acceptance, GreedyAcceptance):
+        return deltas < 0
+    if isinstance(acceptance, (Metropolis, SimulatedAnnealing)):
+        with np.errstate(over='ignore'):
+            probability = np.exp(-np.maximum(deltas, 0) / acceptance.temperature)
+        return (deltas < 0) | (rng.random(len(deltas)) < probability)
+    raise ValueError(f"Acceptance is not supported by lockstep backend: {acceptance.describe()}")
+
+
+def toSnapshot(players: np.ndarray) -> array:
+    '''Games x 10 players of one chain as Schedule.snapshot'''
+    snapshot = array('i')
+    snapshot.frombytes(players.astype(np.intc).tobytes())
+    return snapshot
+
+
+class LockstepChains:
+    '''
+    Base class of lockstep engines: <numChains> copies of a schedule
+    stored as one chains x games x 10 array and advanced together,
+    so interpreter overhead of an iteration is shared by all chains.
+    Subclasses implement step(): one vectorized move in every chain.
+    '''
+
+    def __init__(self, schedule: Schedule, numChains: int, acceptance, rng: np.random.Generator):
+        self.numChains = numChains
+        self.acceptance = acceptance
+        self.rng = rng
+        self.chains = np.arange(numChains)
+
+        players = np.frombuffer(schedule.playersArray, dtype=np.intc).reshape(-1, 10).astype(np.intp)
+        self.players = np.repeat(players[None], numChains, axis=0)
+
+    def runStage(self, numIterations: int, lowerBound: float,
+                 stop: StoppingCriteria = None, deadline: float = None) -> str:
+        '''Runs up to <numIterations> iterations in all chains. Returns StopReason'''
+        state = StoppingState(stop, deadline, lowerBound)
+        reason = StopReason.ITERATIONS
+        self.acceptance.start(numIterations)
+
+        self.bestScores = self.scores.copy()
+        self.bestPlayers = self.players.copy()
+        bestScore = self.bestScores.min()
+        improvedBest = False
+
+        goodIterations = 0
+        i = 0
+        while i < numIterations:
+            stopReason = state.check(i, bestScore)
+            if stopReason:
+                reason = stopReason
+                break
+
+            if i % 1000 == 0:
+                print(f"Iteration: {i:8d} of {numIterations} (changes: {goodIterations:6d}, best score: {bestScore:8.4f})")
+
+            self.acceptance.step(i, improvedBest)
+            improvedBest = False
+            accepted = self.step()
+            goodIterations += int(accepted.sum())
+
+            improved = self.scores < self.bestScores
+            if improved.any():
+                self.bestScores[improved] = self.scores[improved]
+                self.bestPlayers[improved] = self.players[improved]
+                improvedBest = True
+                if self.bestScores.min() < bestScore:
+                    bestScore = self.bestScores.min()
+                    state.improved(i)
+            i += 1
+
+        print(f"Best score: {bestScore:8.4f} (lower bound: {lowerBound:8.4f}, gap: {Bounds.gap(bestScore, lowerBound):8.4f})")
+        print(f"Good iterations: {goodIterations} of {i * self.numChains}, stopped: {reason}, " +
+              f"acceptance: {self.acceptance.describe()}")
+        return reason
+
+    def bestChain(self) -> int:
+        return int(np.argmin(self.bestScores))
+
+
+class LockstepOpponents(LockstepChains):
+    '''
+    Lockstep version of OptimizeOpponents: every iteration proposes a random
+    swap in every chain, scores all proposals at once and applies accepted ones.
+    Opponents matrices and pairs histograms are kept the same way as in OpponentsScore.
+    '''
+
+    def __init__(self, schedule: Schedule, numChains: int, acceptance, rng: np.random.Generator):
+        super().__init__(schedule, numChains, acceptance, rng)
+        conf = schedule.configuration
+        tracker = OpponentsScore(schedule)
+        self.ideal = np.array(tracker.ideal, dtype=float)
+        self.weights = np.array(tracker.weights)
+        self.zeroFactor = tracker.zeroFactor
+        self.expectedZeroPlayers = tracker.expectedZeroPlayers
+        self.numBins = conf.numAttempts + 1
+
+        # games which can swap players: games of the same round,
+        # or any two games if every round has only one game
+        if conf.numTables == 1:
+            groups = [list(range(conf.numGames))]
+        else:
+            index = {game.id: i for i, game in enumerate(schedule.games)}
+            groups = [[index[gameId] for gameId in r.gameIds] for r in schedule.rounds]
+        self.pairs = np.array([(one, two) for group in groups for one in group for two in group if one != two],
+                              dtype=np.intp)
+
+        self.numPlayers = conf.numPlayers
+        repeat = lambda values, dtype: np.repeat(np.array(values, dtype=dtype)[None], numChains, axis=0)
+        self.opponents = repeat(tracker.opponents, np.int32)
+        self.hist = repeat(tracker.hist, np.int32)
+        self.penalties = repeat(tracker.penalties, float)
+        self.zeroPlayers = np.full(numChains, tracker.zeroPlayers)
+        self.scores = np.full(numChains, tracker.score)
+
+        # players of the first game are on one side, of the second one on another
+        self.sideBefore = np.arange(20) < 10
+
+    def step(self) -> np.ndarray:
+        '''One iteration in every chain. Returns mask of chains where swap is accepted'''
+        chains = self.chains
+        numChains = self.numChains
+        pairs = self.pairs[self.rng.integers(len(self.pairs), size=numChains)]
+        gameOne = pairs[:, 0]
+        gameTwo = pairs[:, 1]
+        playersOne = self.players[chains, gameOne]
+        playersTwo = self.players[chains, gameTwo]
+        players = np.concatenate([playersOne, playersTwo], axis=1)
+
+        # only players who are in one game only can be swapped (and affected)
+        inBoth = playersOne[:, :, None] == playersTwo[:, None, :]
+        valid = np.concatenate([~inBoth.any(axis=2), ~inBoth.any(axis=1)], axis=1)
+        choice = np.where(valid, self.rng.random((numChains, 20)), -1.0)
+        seatA = np.argmax(choice[:, :10], axis=1)
+        seatB = np.argmax(choice[:, 10:], axis=1)
+        possible = valid[chains, seatA] & valid[chains, 10 + seatB]
+
+        # only counts of pairs with A or B change: opponents of A on its old side lose
+        # one common game and on its new side get one, the opposite for B
+        # (players who are in both games and pair A-B itself don't change)
+        changeA = np.where(self.sideBefore, -1, 1) * valid
+        changeA[chains, seatA] = 0
+        changeA[chains, 10 + seatB] = 0
+        changeB = -changeA
+
+        # opponents matrix is symmetric, so rows of A and B are the same as columns
+        rowIndex = chains[:, None] * self.numPlayers + players
+        playerA = players[chains, seatA]
+        playerB = players[chains, 10 + seatB]
+        opponents = self.opponents.reshape(-1)
+        columnA = opponents.take(rowIndex * self.numPlayers + playerA[:, None])
+        columnB = opponents.take(rowIndex * self.numPlayers + playerB[:, None])
+
+        # histogram changes: every player changes counts with A and B, A and B change the whole rows
+        bins = np.arange(self.numBins)
+        changesA = ((columnA + changeA)[..., None] == bins).astype(np.int32) - (columnA[..., None] == bins)
+        changesB = ((columnB + changeB)[..., None] == bins).astype(np.int32) - (columnB[..., None] == bins)
+        histChange = changesA + changesB
+        histChange[chains, seatA] = changesA.sum(axis=1)
+        histChange[chains, 10 + seatB] = changesB.sum(axis=1)
+
+        allHist = self.hist.reshape(-1, self.numBins)
+        hist = allHist.take(rowIndex, axis=0)
+        distance = self.ideal - hist
+        deltas = (self.weights * (np.abs(distance - histChange) - np.abs(distance))).sum(axis=(1, 2))
+
+        zeroChange = ((hist[..., 0] + histChange[..., 0] == 1).sum(axis=1) - (hist[..., 0] == 1).sum(axis=1))
+        zeroPlayers = self.zeroPlayers + zeroChange
+        deltas += self.zeroFactor * ((zeroPlayers - self.expectedZeroPlayers) ** 2 -
+                                     (self.zeroPlayers - self.expectedZeroPlayers) ** 2)
+        deltas[~possible] = np.inf
+
+        accepted = acceptMany(self.acceptance, deltas, self.rng) & possible
+        idx = np.flatnonzero(accepted)
+        if len(idx) == 0:
+            return accepted
+
+        # apply accepted swaps: players who are in both games appear twice,
+        # but their counts don't change, so both writes are the same
+        rowA = (idx * self.numPlayers + playerA[idx]) * self.numPlayers
+        rowB = (idx * self.numPlayers + playerB[idx]) * self.numPlayers
+        newA = columnA[idx] + changeA[idx]
+        newB = columnB[idx] + changeB[idx]
+        opponents[rowIndex[idx] * self.numPlayers + playerA[idx, None]] = newA
+        opponents[rowA[:, None] + players[idx]] = newA
+        opponents[rowIndex[idx] * self.numPlayers + playerB[idx, None]] = newB
+        opponents[rowB[:, None] + players[idx]] = newB
+        newHist = hist[idx] + histChange[idx]
+        allHist[rowIndex[idx]] = newHist
+        self.penalties.reshape(-1)[rowIndex[idx]] = (self.weights * np.abs(self.ideal - newHist)).sum(axis=2)
+        self.zeroPlayers[idx] = zeroPlayers[idx]
+        self.scores[idx] = self.penalties[idx].sum(axis=1) + \
+            self.zeroFactor * (self.zeroPlayers[idx] - self.expectedZeroPlayers) ** 2
+
+        self.players[idx, gameOne[idx], seatA[idx]] = playerB[idx]
+        self.players[idx, gameTwo[idx], seatB[idx]] = playerA[idx]
+        return accepted
+
+    @staticmethod
+    def optimize(conf: Configuration, numChains: int, numIterations: int, acceptance, seed: int = None,
+                 stop: StoppingCriteria = None, startSchedule: Schedule = None, initial: str = OptimizeOpponents.SEQUENTIAL):
+        '''
+        Runs <numChains> chains from the initial schedule of <conf> or from a copy of <startSchedule>.
+        With <initial> OptimizeOpponents.BALANCED all chains start from
+        the balanced schedule of <seed> (see ScheduleFactory.createBalancedSchedule).
+        Returns (score, schedule, stop reason) of the best chain.
+        '''
+        if startSchedule is not None:
+            schedule = copy.deepcopy(startSchedule)
+        elif initial == OptimizeOpponents.BALANCED:
+            schedule = ScheduleFactory.createBalancedSchedule(conf, seed)
+        else:
+            schedule = ScheduleFactory.createInitialSchedule(conf)
+        engine = LockstepOpponents(schedule, numChains, acceptance, np.random.default_rng(seed))
+        deadline = stop.deadline() if stop else None
+        reason = engine.runStage(numIterations, Bounds.opponentsLowerBound(conf), stop, deadline)
+
+        best = engine.bestChain()
+        schedule.restore(toSnapshot(engine.bestPlayers[best]))
+        return (float(engine.bestScores[best]), schedule, reason)
+
+
+class LockstepSeats(LockstepChains):
+    '''
+    Lockstep version of OptimizeSeats: every iteration swaps seats
+    of two random players of a random game in every chain.
+    '''
+
+    def __init__(self, schedule: Schedule, numChains: int, acceptance, rng: np.random.Generator):
+        super().__init__(schedule, numChains, acceptance, rng)
+        self.target = schedule.numAttempts / 10
+        tracker = SeatsScore(schedule)
+        self.seats = np.repeat(np.array(tracker.seats)[None], numChains, axis=0)
+        self.penalties = np.repeat(np.array(tracker.penalties)[None], numChains, axis=0)
+        self.scores = self.penalties.sum(axis=1)
+
+    @staticmethod
+    def penaltyPlayers(seats: np.ndarray, target: float) -> np.ndarray:
+        '''Vectorized SeatsScore.penaltyPlayer over the last axis of <seats>'''
+        penalty = ((seats - target) ** 2).sum(axis=-1) / seats.shape[-1]
+        allSeats = seats.sum(axis=-1)
+
+        if SeatsScore.calcHalfSimmetry:
+            k_lo = seats[..., 0:5].sum(axis=-1) / allSeats
+            k_hi = seats[..., 5:10].sum(axis=-1) / allSeats
+            penalty = penalty + SeatsScore.factorHalf * ((k_lo - 0.5) ** 2 + (k_hi - 0.5) ** 2)
+
+        if SeatsScore.calcTrippleSimmetry:
+            k_a = seats[..., 0:3].sum(axis=-1) / allSeats
+            k_b = seats[..., 3:7].sum(axis=-1) / allSeats
+            k_c = seats[..., 7:10].sum(axis=-1) / allSeats
+            penalty = penalty + SeatsScore.factorTripple * (
+                (10 * k_a - 3) ** 2 + (10 * k_b - 4) ** 2 + (10 * k_c - 3) ** 2)
+
+        if SeatsScore.calcFirstLastSimmetry:
+            k_first = seats[..., 0] / allSeats
+            k_last = seats[..., -1] / allSeats
+            penalty = penalty + SeatsScore.factorFirstLast * ((10 * k_first - 1) ** 2 + (10 * k_last - 1) ** 2)
+
+        return penalty
+
+    def step(self) -> np.ndarray:
+        '''One iteration in every chain. Returns mask of chains where swap is accepted'''
+        chains = self.chains
+        numChains = self.numChains
+        game = self.rng.integers(self.players.shape[1], size=numChains)
+        seatOne = self.rng.integers(10, size=numChains)
+        seatTwo = (seatOne + self.rng.integers(1, 10, size=numChains)) % 10
+        playerOne = self.players[chains, game, seatOne]
+        playerTwo = self.players[chains, game, seatTwo]
+
+        newOne = self.seats[chains, playerOne]
+        newOne[chains, seatOne] -= 1
+        newOne[chains, seatTwo] += 1
+        newTwo = self.seats[chains, playerTwo]
+        newTwo[chains, seatTwo] -= 1
+        newTwo[chains, seatOne] += 1
+
+        penaltyOne = LockstepSeats.penaltyPlayers(newOne, self.target)
+        penaltyTwo = LockstepSeats.penaltyPlayers(newTwo, self.target)
+        deltas = penaltyOne + penaltyTwo - self.penalties[chains, playerOne] - self.penalties[chains, playerTwo]
+
+        accepted = acceptMany(self.acceptance, deltas, self.rng)
+        idx = np.flatnonzero(accepted)
+        if len(idx) == 0:
+            return accepted
+
+        self.seats[idx, playerOne[idx]] = newOne[idx]
+        self.seats[idx, playerTwo[idx]] = newTwo[idx]
+        self.penalties[idx, playerOne[idx]] = penaltyOne[idx]
+        self.penalties[idx, playerTwo[idx]] = penaltyTwo[idx]
+        self.scores[idx] = self.penalties[idx].sum(axis=1)
+        self.players[idx, game[idx], seatOne[idx]] = playerTwo[idx]
+        self.players[idx, game[idx], seatTwo[idx]] = playerOne[idx]
+        return accepted
+
+    @staticmethod
+    def optimize(schedule: Schedule, numChains: int, iterations: list, acceptance, seed: int = None,
+                 stop: StoppingCriteria = None):
+        '''
+        Runs <numChains> chains from the current seating of <schedule>,
+        stage by stage, every stage continues from the best seating of every chain.
+        Restores the best seating into <schedule>. Returns (score, stop reason).
+        '''
+        engine = LockstepSeats(schedule, numChains, acceptance, np.random.default_rng(seed))
+        lowerBound = Bounds.seatsLowerBound(schedule.configuration)
+        deadline = stop.deadline() if stop else None
+        reason = StopReason.ITERATIONS
+        for stage in range(len(iterations)):
+            print(f"\nStage: {stage+1} (iterations: {iterations[stage]}, chains: {numChains})")
+            reason = engine.runStage(iterations[stage], lowerBound, stop, deadline)
+            if StopReason.isFinal(reason):
+                break
+
+            # next stage starts from the best seating of every chain
+            engine.players = engine.bestPlayers.copy()
+            engine.seats[:] = 0
+            np.add.at(engine.seats, (engine.chains[:, None, None], engine.players, np.arange(10)), 1)
+            engine.penalties = LockstepSeats.penaltyPlayers(engine.seats, engine.target)
+            engine.scores = engine.penalties.sum(axis=1)
+
+        best = engine.bestChain()
+        schedule.restore(toSnapshot(engine.bestPlayers[best]))
+        return (float(engine.bestScores[best]), reason)
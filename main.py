@@ -1,3 +1,17 @@
+'''
+Command line tool: schedule optimization, reports and export.
+
+    python main.py optimize-opponents --preset GG-2021 --runs 100 --jobs 4 --time-budget 3600 -o opponents.txt
+    python main.py optimize-seats opponents.txt --time-budget 600 -o seats.txt
+    python main.py pipeline --players 40 --tables 4 --rounds 10 --attempts 10 --time-budget 7200 -o seats.txt
+    python main.py refine seats.txt --time-budget 600
+    python main.py report seats.txt
+    python main.py export seats.txt --participants participants.txt -o mwt.txt
+    python main.py participants --players 36 -o participants.txt
+
+File paths are relative to the current directory. With --checkpoint an interrupted
+optimization continues from the checkpoint file when the same command is run again.
+'''
 from schedule import *
 from schedule_factory import *
 
@@ -10,6 +24,14 @@ from optimize_opponents import *
 from optimize_seats import *
 
 from helpers import *
+from acceptance import SimulatedAnnealing
+from stopping import StoppingCriteria
+from checkpoint import Checkpoint
+
+import argparse
+import contextlib
+import os.path
+import sys
 
 
 filename_opponents = "schedule_opponents.txt"
@@ -32,81 +54,266 @@ Configurations = {
 }
 
 
-def demoOptimizeOpponents():
-    conf = Configurations["GG-2021"]
+def path(filename: str) -> str:
+    '''helpers.py puts relative file names to the home directory, the command line is relative to the current one'''
+    return os.path.abspath(filename)
+
+
+def configuration(args) -> Configuration:
+    '''Configuration from --preset or from explicit --players, --tables, --rounds, --attempts [--games]'''
+    explicit = [args.players, args.tables, args.rounds, args.attempts]
+    if args.preset is not None:
+        if any(value is not None for value in explicit + [args.games]):
+            raise ConfigurationException("--preset can't be combined with explicit configuration")
+        conf = Configurations[args.preset]
+    else:
+        if any(value is None for value in explicit):
+            raise ConfigurationException("either --preset or all of --players, --tables, --rounds, --attempts are required")
+        numGames = args.games if args.games is not None else args.players * args.attempts // 10
+        conf = Configuration(numPlayers=args.players, numTables=args.tables, numRounds=args.rounds,
+                             numGames=numGames, numAttempts=args.attempts)
     conf.validate()
 
-    opponents = OptimizeOpponents(verbose=False)
-    s = opponents.optimize(conf, numRuns=3, numIterations=10 * 1000)
+    # rounds are filled table by table, so only the last round may be incomplete;
+    # opponents optimization swaps players between games of one round
+    lastRoundGames = conf.numGames - conf.numTables * (conf.numRounds - 1)
+    if lastRoundGames < 1:
+        raise ConfigurationException(f"the last round has no games, use --rounds {conf.numRounds - 1}")
+    if conf.numTables > 1 and lastRoundGames < 2:
+        raise ConfigurationException("the last round has a single game, players can't be swapped in it")
+    return conf
+
+
+def stoppingCriteria(timeBudget: float) -> StoppingCriteria:
+    return StoppingCriteria(timeBudget=timeBudget) if timeBudget is not None else None
+
+
+def checkpoint(filename: str) -> Checkpoint:
+    return Checkpoint(path(filename)) if filename is not None else None
+
+
+def optimizeOpponents(args, conf: Configuration, timeBudget: float, saved: Checkpoint) -> Schedule:
+    opponents = OptimizeOpponents(verbose=args.verbose, initial=args.initial)
+    stop = stoppingCriteria(timeBudget)
+    if saved is not None and saved.exists():
+        return opponents.resume(saved, stop)
+    return opponents.optimize(conf, args.runs, args.iterations, args.jobs, args.seed, stop, saved)
+
+
+def optimizeSeats(args, s: Schedule, timeBudget: float, saved: Checkpoint):
+    seats = OptimizeSeats(s, verbose=args.verbose, acceptance=SimulatedAnnealing(1.0, 0.01), adaptiveMoves=True)
+    stop = stoppingCriteria(timeBudget)
+    if saved is not None and saved.exists():
+        seats.resume(saved, stop)
+        return
+    # constructed seating is optimal for numAttempts multiple of 10, then optimization stops at the lower bound
+    if not args.no_construct:
+        seats.construct(args.seed)
+    seats.optimize(args.seat_runs, args.seat_iterations, args.jobs, args.seed, stop, saved)
+
+
+def commandOptimizeOpponents(args):
+    s = optimizeOpponents(args, configuration(args), args.time_budget, checkpoint(args.checkpoint))
 
     print("\n*** Schedule after opponents optimization:")
     Print.printScheduleByGames(s)
     Print.printScheduleByPlayers(s)
     Print.printOpponentsMatrix(s)
     Print.printPairsMatrix(s)
-    Print.printMinMaxPairs(s, [0, 6, 7, 8, 9])
 
-    saveSchedule(s, filename_opponents)
+    saveSchedule(s, path(args.output))
 
 
-def demoOptimizeSeats():
-    s = loadSchedule(filename_opponents)
-    s.generateSlotsFromGames()
+def commandOptimizeSeats(args):
+    s = loadSchedule(path(args.input))
+    optimizeSeats(args, s, args.time_budget, checkpoint(args.checkpoint))
 
-    print("\n*** Loaded schedule")
+    print("\n*** Schedule after seats optimization:")
     Print.printScheduleByGames(s)
-    Print.printScheduleByPlayers(s)
-    Print.printOpponentsMatrix(s)
-    Print.printPairsMatrix(s)
+    Print.printSeatsMatrix(s)
+    Print.printOptimalityGap(s)
 
-    seats = OptimizeSeats(s, verbose=False)
-    seats.optimize(numRuns=50, iterations=[30 * 1000, 30 * 1000])
+    saveSchedule(s, path(args.output))
 
-    print("\n*** Schedule after seats optimization:")
+
+def commandPipeline(args):
+    '''Opponents, then seats of the same configuration, the time budget is split in halves'''
+    timeBudget = args.time_budget / 2 if args.time_budget is not None else None
+    s = optimizeOpponents(args, configuration(args), timeBudget, checkpoint(args.checkpoint))
+    if args.opponents_output is not None:
+        saveSchedule(s, path(args.opponents_output))
+
+    optimizeSeats(args, s, timeBudget, None)
+
+    print("\n*** Schedule after optimization:")
     Print.printScheduleByGames(s)
+    Print.printPairsMatrix(s)
     Print.printSeatsMatrix(s)
+    Print.printOptimalityGap(s)
+
+    saveSchedule(s, path(args.output))
 
-    print("\n*** MWT-compatible schedule")
-    Print.printMwtSchedule(s)
 
-    saveSchedule(s, filename_seats)
+def commandRefine(args):
+    '''
+    Spends the time budget improving a saved schedule: half of it on opponents, half on seats.
+    Seats of players who are not moved to other games are kept.
+    '''
+    s = loadSchedule(path(args.input))
+    print(f"\n*** Refine schedule, time budget: {args.time_budget} seconds")
 
+    # greedy acceptance: annealing would first destroy the good schedule
+    opponents = OptimizeOpponents(verbose=args.verbose)
+    s = opponents.refine(s, numRuns=1000, numIterations=100 * 1000, jobs=args.jobs, seed=args.seed,
+                         stop=StoppingCriteria(timeBudget=args.time_budget / 2))
 
-def demoParticipants():
-    numPlayers = 36
-    p = Participants.create(numPlayers)
-    saveParticipants(p, filename_participants)
+    seats = OptimizeSeats(s, verbose=args.verbose)
+    seats.optimizeAssignment(kicks=1000 * 1000, seed=args.seed, stop=StoppingCriteria(timeBudget=args.time_budget / 2))
 
+    print("\n*** Schedule after refinement:")
+    Print.printPairsMatrix(s)
+    Print.printSeatsMatrix(s)
+    Print.printOptimalityGap(s)
 
-def demoMwt(filename):
-    s = loadSchedule(filename)
+    output = args.output
+    if output is None:
+        directory, filename = os.path.split(args.input)
+        output = os.path.join(directory, "refined_" + filename)
+    saveSchedule(s, path(output))
+
+
+def commandReport(args):
+    s = loadSchedule(path(args.input))
 
-    print("\n*** Loaded schedule")
     Print.printScheduleByGames(s)
     Print.printScheduleByPlayers(s)
     Print.printOpponentsMatrix(s)
     Print.printPairsMatrix(s)
     Print.printMinMaxPairs(s, [0, 6, 7, 8, 9])
-    
     Print.printSeatsMatrix(s)
+    Print.printOptimalityGap(s)
+
+
+def commandExport(args):
+    '''MWT-compatible schedule with player IDs or, with --participants, with names'''
+    # messages of loading don't go to the exported schedule
+    with contextlib.redirect_stdout(sys.stderr):
+        s = loadSchedule(path(args.input))
+        if args.participants is not None:
+            s.setParticipants(loadParticipants(path(args.participants)))
+
+    if args.output is None:
+        Print.printMwtSchedule(s)
+        return
+    with open(path(args.output), "w") as f, contextlib.redirect_stdout(f):
+        Print.printMwtSchedule(s)
+    print(f"Saving MWT schedule to: {path(args.output)}")
+
+
+def commandParticipants(args):
+    saveParticipants(Participants.create(args.players), path(args.output))
+
+
+def addConfigurationArguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("configuration", "a preset or explicit parameters")
+    group.add_argument("--preset", choices=list(Configurations))
+    group.add_argument("--players", type=int)
+    group.add_argument("--tables", type=int)
+    group.add_argument("--rounds", type=int)
+    group.add_argument("--attempts", type=int, help="games of every player")
+    group.add_argument("--games", type=int, help="total number of games (default: players * attempts / 10)")
+
+
+def addRunArguments(parser: argparse.ArgumentParser, opponents: bool, seats: bool):
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for independent runs (default: 1)")
+    parser.add_argument("--seed", type=int, help="seed of all runs, random by default")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS", help="wall-clock budget, unlimited by default")
+    parser.add_argument("--verbose", action="store_true", help="log every improvement")
+    if opponents:
+        parser.add_argument("--runs", type=int, default=3, help="opponents runs (default: 3)")
+        parser.add_argument("--iterations", type=int, default=10 * 1000,
+                            help="iterations of every opponents run (default: 10000)")
+        parser.add_argument("--initial", choices=[OptimizeOpponents.SEQUENTIAL, OptimizeOpponents.BALANCED],
+                            default=OptimizeOpponents.SEQUENTIAL, help="start schedule of opponents runs")
+    if seats:
+        parser.add_argument("--seat-runs", type=int, default=50, help="seats runs (default: 50)")
+        parser.add_argument("--seat-iterations", type=int, nargs="+", default=[30 * 1000, 30 * 1000],
+                            help="iterations of every stage of seats runs (default: 30000 30000)")
+        parser.add_argument("--no-construct", action="store_true",
+                            help="optimize seats from the loaded seating instead of constructed one")
+
+
+def createParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Mafia tournament schedules",
+                                     epilog="File paths are relative to the current directory.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    command = commands.add_parser("optimize-opponents", help="create a schedule with balanced opponents")
+    addConfigurationArguments(command)
+    addRunArguments(command, opponents=True, seats=False)
+    command.add_argument("--checkpoint", metavar="FILE", help="save progress, resume if the file exists")
+    command.add_argument("-o", "--output", default=filename_opponents)
+    command.set_defaults(func=commandOptimizeOpponents)
+
+    command = commands.add_parser("optimize-seats", help="balance seats of a schedule, players keep their games")
+    command.add_argument("input", help="schedule file")
+    addRunArguments(command, opponents=False, seats=True)
+    command.add_argument("--checkpoint", metavar="FILE", help="save progress, resume if the file exists")
+    command.add_argument("-o", "--output", default=filename_seats)
+    command.set_defaults(func=commandOptimizeSeats)
+
+    command = commands.add_parser("pipeline", help="optimize opponents, then seats")
+    addConfigurationArguments(command)
+    addRunArguments(command, opponents=True, seats=True)
+    command.add_argument("--checkpoint", metavar="FILE", help="checkpoint of the opponents stage")
+    command.add_argument("--opponents-output", metavar="FILE", help="also save the schedule before seats optimization")
+    command.add_argument("-o", "--output", default=filename_seats)
+    command.set_defaults(func=commandPipeline)
+
+    command = commands.add_parser("refine", help="improve opponents and seats of a saved schedule")
+    command.add_argument("input", help="schedule file")
+    command.add_argument("legacy_budget", nargs="?", type=float, metavar="budget", help=argparse.SUPPRESS)
+    command.add_argument("--jobs", type=int, default=1, help="worker processes for opponents runs (default: 1)")
+    command.add_argument("--seed", type=int, help="seed of all runs, random by default")
+    command.add_argument("--time-budget", type=float, default=600, metavar="SECONDS", help="(default: 600)")
+    command.add_argument("--verbose", action="store_true", help="log every improvement")
+    command.add_argument("-o", "--output", help="default: refined_<input>")
+    command.set_defaults(func=commandRefine)
+
+    command = commands.add_parser("report", help="print matrices and optimality gap of a schedule")
+    command.add_argument("input", help="schedule file")
+    command.set_defaults(func=commandReport)
+
+    command = commands.add_parser("export", help="MWT-compatible schedule")
+    command.add_argument("input", help="schedule file")
+    command.add_argument("--participants", metavar="FILE", help="names of players instead of IDs")
+    command.add_argument("-o", "--output", help="default: standard output")
+    command.set_defaults(func=commandExport)
+
+    command = commands.add_parser("participants", help="create participants file with generated names")
+    command.add_argument("--players", type=int, required=True)
+    command.add_argument("-o", "--output", default=filename_participants)
+    command.set_defaults(func=commandParticipants)
+    return parser
+
 
-    print("\n*** MWT-compatible schedule with IDs:")
-    Print.printMwtSchedule(s)
+def main(argv: list = None):
+    parser = createParser()
+    args = parser.parse_args(argv)
 
-    participants = loadParticipants(filename_participants)
+    # python main.py refine <file> <budget>: the budget used to be positional
+    if getattr(args, "legacy_budget", None) is not None:
+        args.time_budget = args.legacy_budget
 
-    s.setParticipants(participants)
-    print("\n*** MWT-compatible schedule with names:")
-    Print.printMwtSchedule(s)
+    # checkpoints are saved by runs in this process only
+    if getattr(args, "checkpoint", None) is not None and args.jobs > 1:
+        parser.error("--checkpoint requires --jobs 1")
 
+    try:
+        args.func(args)
+    except ConfigurationException as e:
+        parser.error(str(e))
 
-def main():
-    # demoOptimizeOpponents()
-    # demoOptimizeSeats()
-    # demoParticipants()
-    # demoMwt("schedule_seats_great.txt")
 
-    demoMwt("schedule_seats_great_noc3.txt")
-    
 if __name__ == '__main__':
     main()
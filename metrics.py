@@ -9,6 +9,18 @@ class Metrics:
         self.schedule = schedule
         self.idealHist = None
 
+    @staticmethod
+    def create(schedule: Schedule):
+        '''
+        Creates the fastest available metrics backend for <schedule>:
+        NumpyMetrics if numpy is installed, Metrics otherwise.
+        '''
+        try:
+            from metrics_numpy import NumpyMetrics
+        except ImportError:
+            return Metrics(schedule)
+        return NumpyMetrics(schedule)
+
     def calcPlayerOpponents(self, thisPlayerId: int):
         '''
         Calculates opponents histogram for given <thisPlayerId>
@@ -17,12 +29,11 @@ class Metrics:
         '''
         opponents = [0] * self.schedule.numPlayers
 
-        # go through all games
-        for slotId, slot in self.schedule.slots.items():
-            if thisPlayerId in slot.players:
-                for id in slot.players:
-                    if thisPlayerId != id:
-                        opponents[id] += 1
+        # go through games of this player
+        for gameId, roundId, seat in self.schedule.playerGames(thisPlayerId):
+            for id in maskPlayers(self.schedule.slots[gameId].mask):
+                if thisPlayerId != id:
+                    opponents[id] += 1
 
         return opponents
 
@@ -50,6 +61,10 @@ class Metrics:
                 pairs[numGames] += 1
         return pairs
 
+    def calcPlayerPairsHistograms(self):
+        '''Calculates pairs histograms for every player'''
+        return [self.calcPlayerPairsHistogram(playerId) for playerId in range(self.schedule.numPlayers)]
+
     def calcPlayerPairs(self, thisPlayerId : int):
         '''
         Calculates pairs for current user.
@@ -138,6 +153,10 @@ class Metrics:
             penalty += idxDist * valueDist
         return penalty
 
+    def penaltyPlayers(self):
+        '''Calculates penalties for every player'''
+        return [self.penaltyPlayer(playerId) for playerId in range(self.schedule.numPlayers)]
+
     def calcPlayerSeatsHistogram(self, thisPlayerId: int):
         '''
         Calculates seats histogram for given <thisPlayerId>
@@ -146,11 +165,9 @@ class Metrics:
         '''
         seats = [0] * 10
 
-        # go through all games
-        for game in self.schedule.games:
-            for seat_idx in range(0, 10):
-                if game.players[seat_idx] == thisPlayerId:
-                    seats[seat_idx] += 1
+        # go through games of this player
+        for gameId, roundId, seat in self.schedule.playerGames(thisPlayerId):
+            seats[seat] += 1
         return seats
 
     def calcSeatsMatrix(self):
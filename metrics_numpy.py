@@ -0,0 +1,98 @@
+import numpy as np
+
+from metrics import Metrics
+from schedule import Schedule
+
+
+class NumpyMetrics(Metrics):
+    '''
+    Vectorized Metrics backend built on games x players incidence matrix.
+    Returns the same values as Metrics, but calculates them for all players at once.
+    '''
+
+    def __init__(self, schedule: Schedule):
+        super().__init__(schedule)
+        self._opponents = None
+        self._pairs = None
+        self._seats = None
+        self._penalties = None
+
+    def playersArray(self) -> np.ndarray:
+        '''Games x 10 matrix of player ids'''
+        return np.frombuffer(self.schedule.playersArray, dtype=np.intc).reshape(-1, 10)
+
+    def incidenceMatrix(self) -> np.ndarray:
+        '''Games x players matrix, a[g][p] == 1 if player <p> plays game <g>'''
+        players = self.playersArray()
+        incidence = np.zeros((len(players), self.schedule.numPlayers), dtype=np.int32)
+        incidence[np.arange(len(players))[:, None], players] = 1
+        return incidence
+
+    def opponentsArray(self) -> np.ndarray:
+        if self._opponents is None:
+            incidence = self.incidenceMatrix()
+            opponents = incidence.T @ incidence
+            np.fill_diagonal(opponents, 0)
+            self._opponents = opponents
+        return self._opponents
+
+    def pairsArray(self) -> np.ndarray:
+        '''Players x (numAttempts + 1) matrix of pairs histograms'''
+        if self._pairs is None:
+            numPlayers = self.schedule.numPlayers
+            numBins = self.schedule.numAttempts + 1
+
+            # shift values of every player to its own range of bins
+            shifted = self.opponentsArray() + numBins * np.arange(numPlayers)[:, None]
+            offDiagonal = ~np.eye(numPlayers, dtype=bool)
+            counts = np.bincount(shifted[offDiagonal], minlength=numPlayers * numBins)
+            self._pairs = counts.reshape(numPlayers, numBins)
+        return self._pairs
+
+    def seatsArray(self) -> np.ndarray:
+        '''Players x 10 matrix of seats histograms'''
+        if self._seats is None:
+            players = self.playersArray().astype(np.int64)
+            seats = np.arange(10)[None, :]
+            counts = np.bincount((10 * players + seats).ravel(), minlength=10 * self.schedule.numPlayers)
+            self._seats = counts.reshape(self.schedule.numPlayers, 10)
+        return self._seats
+
+    def calcPlayerOpponents(self, thisPlayerId: int):
+        return self.opponentsArray()[thisPlayerId].tolist()
+
+    def calcOpponentsMatrix(self):
+        return self.opponentsArray().tolist()
+
+    def calcPlayerPairsHistogram(self, thisPlayerId: int):
+        return dict(enumerate(self.pairsArray()[thisPlayerId].tolist()))
+
+    def calcPlayerPairsHistograms(self):
+        return [dict(enumerate(line)) for line in self.pairsArray().tolist()]
+
+    def calcPairsHistogram(self):
+        return dict(enumerate(self.pairsArray().sum(axis=0).tolist()))
+
+    def penaltyPlayers(self):
+        if self._penalties is not None:
+            return self._penalties
+
+        target = 9 * self.schedule.numAttempts / (self.schedule.numPlayers-1)
+        if self.idealHist == None:
+            self.idealHist = self.penaltyIdealHistogram()
+
+        idx = np.arange(self.schedule.numAttempts + 1)
+        idxDist = (idx - target) ** 2
+        ideal = np.array([self.idealHist[i] for i in idx])
+        valueDist = np.abs(ideal[None, :] - self.pairsArray())
+        self._penalties = (valueDist @ idxDist).tolist()
+        return self._penalties
+
+    def penaltyPlayer(self, playerId: int):
+        return self.penaltyPlayers()[playerId]
+
+    def calcPlayerSeatsHistogram(self, thisPlayerId: int):
+        return self.seatsArray()[thisPlayerId].tolist()
+
+    def calcSeatsMatrix(self):
+        return self.seatsArray().tolist()
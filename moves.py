@@ -0,0 +1,48 @@
+class AdaptiveMoveSelector:
+    '''
+    Chooses one of <numMoves> moves at random with probability proportional
+    to its recent acceptance rate (exponential moving average with <decay>),
+    so moves which stopped being useful are tried less often.
+    Every move keeps at least <minShare> of the choices.
+    '''
+
+    def __init__(self, numMoves: int, decay: float = 0.01, minShare: float = 0.05):
+        if numMoves * minShare > 1:
+            raise ValueError("Too big minShare for given number of moves")
+        self.numMoves = numMoves
+        self.decay = decay
+        self.minShare = minShare
+
+        # all moves start equally good
+        self.rates = [1.0] * numMoves
+        self.tried = [0] * numMoves
+        self.accepted = [0] * numMoves
+
+    def probabilities(self) -> list:
+        total = sum(self.rates)
+        free = 1 - self.numMoves * self.minShare
+        if total <= 0:
+            return [1 / self.numMoves] * self.numMoves
+        return [self.minShare + free * rate / total for rate in self.rates]
+
+    def choose(self, rng) -> int:
+        '''Returns index of the next move'''
+        # the same as walking probabilities(), but without a new list in every iteration
+        value = rng.random()
+        total = sum(self.rates)
+        free = 1 - self.numMoves * self.minShare
+        for index, rate in enumerate(self.rates):
+            value -= self.minShare + free * rate / total if total > 0 else 1 / self.numMoves
+            if value < 0:
+                return index
+        return self.numMoves - 1
+
+    def update(self, index: int, accepted: bool):
+        '''Records result of the move <index>'''
+        self.tried[index] += 1
+        self.accepted[index] += accepted
+        self.rates[index] += self.decay * (accepted - self.rates[index])
+
+    def describe(self, names: list) -> str:
+        return ", ".join(f"{name}: {accepted}/{tried}"
+                         for name, accepted, tried in zip(names, self.accepted, self.tried))
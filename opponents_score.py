@@ -0,0 +1,158 @@
+from schedule import Schedule
+from metrics import Metrics
+from game import maskPlayers
+
+
+class OpponentsScore:
+    '''
+    Incremental version of OptimizeOpponents.scoreFunc.
+
+    Keeps a live opponents matrix, pairs histogram and penalty for every player,
+    so score change of swapping two players between two games is calculated
+    by touching only rows of players from these two games.
+    '''
+
+    # zero pairs penalty: number of players expected to have exactly one zero pair
+    expectedZeroPlayers = 6 * 2
+    zeroFactor = 100
+
+    @staticmethod
+    def create(schedule: Schedule):
+        '''
+        Creates the fastest available implementation for <schedule>:
+        NumpyOpponentsScore (vectorized swapDeltas) if numpy is installed, OpponentsScore otherwise.
+        '''
+        try:
+            from opponents_score_numpy import NumpyOpponentsScore
+        except ImportError:
+            return OpponentsScore(schedule)
+        return NumpyOpponentsScore(schedule)
+
+    def __init__(self, schedule: Schedule):
+        self.numPlayers = schedule.numPlayers
+        self.numAttempts = schedule.numAttempts
+
+        m = Metrics(schedule)
+        target = 9 * schedule.numAttempts / (schedule.numPlayers-1)
+        ideal = m.penaltyIdealHistogram()
+        self.ideal = [ideal[idx] for idx in range(self.numAttempts + 1)]
+        self.weights = [(idx - target) ** 2 for idx in range(self.numAttempts + 1)]
+
+        # opponents matrix
+        self.opponents = [[0] * self.numPlayers for _ in range(self.numPlayers)]
+        for slot in schedule.slots.values():
+            players = list(maskPlayers(slot.mask))
+            for playerId in players:
+                row = self.opponents[playerId]
+                for id in players:
+                    if id != playerId:
+                        row[id] += 1
+
+        # pairs histograms
+        self.hist = []
+        for playerId in range(self.numPlayers):
+            hist = [0] * (self.numAttempts + 1)
+            row = self.opponents[playerId]
+            for id in range(self.numPlayers):
+                if id != playerId:
+                    hist[row[id]] += 1
+            self.hist.append(hist)
+
+        self.penalties = [self.penaltyHist(hist) for hist in self.hist]
+        self.zeroPlayers = sum(1 for hist in self.hist if hist[0] == 1)
+        self.updateScore()
+
+    def penaltyHist(self, hist: list) -> float:
+        '''Same as Metrics.penaltyPlayer, but for already calculated histogram'''
+        penalty = 0.0
+        for idx in range(len(hist)):
+            penalty += self.weights[idx] * abs(self.ideal[idx] - hist[idx])
+        return penalty
+
+    def zeroPenalty(self, zeroPlayers: int) -> float:
+        return self.zeroFactor * (zeroPlayers - self.expectedZeroPlayers) ** 2
+
+    def updateScore(self):
+        self.score = sum(self.penalties) + self.zeroPenalty(self.zeroPlayers)
+
+    def rowChanges(self, one: int, two: int, playerA: int, playerB: int):
+        '''
+        Lists changes of opponents matrix when <playerA> from game <one>
+        is swapped with <playerB> from game <two> (games are player bitmasks).
+        Players who are in both games are not affected at all.
+        Returns list of (playerId, [(opponentId, change)])
+        '''
+        onlyOne = list(maskPlayers(one & ~two & ~(1 << playerA)))
+        onlyTwo = list(maskPlayers(two & ~one & ~(1 << playerB)))
+
+        changes = []
+        changes.append((playerA, [(id, -1) for id in onlyOne] + [(id, 1) for id in onlyTwo]))
+        changes.append((playerB, [(id, 1) for id in onlyOne] + [(id, -1) for id in onlyTwo]))
+        for id in onlyOne:
+            changes.append((id, [(playerA, -1), (playerB, 1)]))
+        for id in onlyTwo:
+            changes.append((id, [(playerA, 1), (playerB, -1)]))
+        return changes
+
+    def swapDelta(self, one: int, two: int, playerA: int, playerB: int) -> float:
+        '''
+        Calculates score change if <playerA> from game <one>
+        is swapped with <playerB> from game <two>. Doesn't change anything.
+        '''
+        delta = 0.0
+        zeroPlayers = self.zeroPlayers
+        for playerId, row in self.rowChanges(one, two, playerA, playerB):
+            opponents = self.opponents[playerId]
+            hist = self.hist[playerId]
+
+            # histogram changes of this player
+            bins = {}
+            for id, change in row:
+                numGames = opponents[id]
+                bins[numGames] = bins.get(numGames, 0) - 1
+                bins[numGames + change] = bins.get(numGames + change, 0) + 1
+
+            for idx, change in bins.items():
+                if change != 0:
+                    weight = self.weights[idx]
+                    ideal = self.ideal[idx]
+                    delta += weight * (abs(ideal - hist[idx] - change) - abs(ideal - hist[idx]))
+
+            zeroChange = bins.get(0, 0)
+            if zeroChange != 0:
+                zeroPlayers += (hist[0] + zeroChange == 1) - (hist[0] == 1)
+
+        delta += self.zeroPenalty(zeroPlayers) - self.zeroPenalty(self.zeroPlayers)
+        return delta
+
+    def swapDeltas(self, one: int, two: int):
+        '''
+        Calculates score changes of all swaps of a player who is only in game <one>
+        with a player who is only in game <two> (games are player bitmasks).
+        Returns (playersOne, playersTwo, deltas), deltas[a][b] is score change of
+        swapping playersOne[a] with playersTwo[b]. Doesn't change anything.
+        '''
+        playersOne = list(maskPlayers(one & ~two))
+        playersTwo = list(maskPlayers(two & ~one))
+        deltas = [[self.swapDelta(one, two, playerA, playerB) for playerB in playersTwo]
+                  for playerA in playersOne]
+        return (playersOne, playersTwo, deltas)
+
+    def applySwap(self, one: int, two: int, playerA: int, playerB: int):
+        '''
+        Updates opponents matrix, histograms and score after
+        <playerA> from game <one> is swapped with <playerB> from game <two>.
+        Must be called with games as they were before the swap.
+        '''
+        for playerId, row in self.rowChanges(one, two, playerA, playerB):
+            opponents = self.opponents[playerId]
+            hist = self.hist[playerId]
+            wasZero = hist[0] == 1
+            for id, change in row:
+                hist[opponents[id]] -= 1
+                opponents[id] += change
+                hist[opponents[id]] += 1
+            self.penalties[playerId] = self.penaltyHist(hist)
+            self.zeroPlayers += (hist[0] == 1) - wasZero
+
+        self.updateScore()
@@ -0,0 +1,64 @@
+import numpy as np
+
+from opponents_score import OpponentsScore
+from schedule import Schedule
+from game import maskPlayers
+
+
+class NumpyOpponentsScore(OpponentsScore):
+    '''
+    OpponentsScore with vectorized swapDeltas: all swap candidates
+    of two games are scored in one pass.
+    '''
+
+    def __init__(self, schedule: Schedule):
+        super().__init__(schedule)
+        self.weightsArray = np.array(self.weights)
+        self.idealArray = np.array(self.ideal, dtype=float)
+
+    def swapDeltas(self, one: int, two: int):
+        playersOne = list(maskPlayers(one & ~two))
+        playersTwo = list(maskPlayers(two & ~one))
+        n1 = len(playersOne)
+        n2 = len(playersTwo)
+        if n1 == 0 or n2 == 0:
+            return (playersOne, playersTwo, [[] for _ in playersOne])
+
+        # only rows and columns of players from one game are changed
+        players = playersOne + playersTwo
+        n = n1 + n2
+        numBins = self.numAttempts + 1
+        matrix = np.array([[self.opponents[playerId][id] for id in players] for playerId in players])
+        hist = np.array([self.hist[playerId] for playerId in players])
+
+        # side of every player before and after swap of candidates a and b
+        before = np.zeros(n, dtype=bool)
+        before[:n1] = True
+        after = np.broadcast_to(before, (n1, n2, n)).copy()
+        after[np.arange(n1), :, np.arange(n1)] = False
+        after[:, np.arange(n2), n1 + np.arange(n2)] = True
+
+        # change of number of games for every pair of players
+        sameBefore = before[:, None] == before[None, :]
+        sameAfter = after[..., :, None] == after[..., None, :]
+        change = sameAfter.astype(np.int64) - sameBefore
+
+        # histogram changes of every player: new values of its row minus old ones
+        newValues = matrix + change
+        rows = np.arange(n1 * n2 * n).reshape(n1, n2, n, 1) * numBins
+        counts = np.bincount((rows + newValues).ravel(), minlength=n1 * n2 * n * numBins)
+        counts = counts.reshape(n1, n2, n, numBins)
+        oldCounts = np.zeros((n, numBins), dtype=np.int64)
+        np.add.at(oldCounts, (np.arange(n)[:, None], matrix), 1)
+        histChange = counts - oldCounts
+
+        distance = self.idealArray - hist
+        deltas = (self.weightsArray * (np.abs(distance - histChange) - np.abs(distance))).sum(axis=(2, 3))
+
+        # zero pairs penalty
+        zeroBefore = hist[:, 0] == 1
+        zeroAfter = (hist[:, 0] + histChange[..., 0]) == 1
+        zeroPlayers = self.zeroPlayers + (zeroAfter.sum(axis=2) - zeroBefore.sum())
+        deltas += self.zeroFactor * ((zeroPlayers - self.expectedZeroPlayers) ** 2 -
+                                     (self.zeroPlayers - self.expectedZeroPlayers) ** 2)
+        return (playersOne, playersTwo, deltas.tolist())
@@ -2,12 +2,33 @@ from schedule_factory import ScheduleFactory
 from schedule import *
 from metrics import *
 from print import *
-
+from opponents_score import OpponentsScore
+from game import maskChoice
+
+from helpers import runSeeds
+from stopping import StoppingCriteria, StoppingState, StopReason
+from bounds import Bounds
+from acceptance import GreedyAcceptance, SimulatedAnnealing, ContinuedAcceptance
+from racing import SuccessiveHalving
+from checkpoint import Checkpoint
+from instrumentation import OptimizationListener, StageMonitor, StageStats
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import copy
 import random
 
 
 class OptimizeOpponents:
+    # backends: independent runs one by one, or all runs in lockstep (see lockstep.py, requires numpy)
+    LOOP = "loop"
+    LOCKSTEP = "lockstep"
+
+    # initial schedules: sequential (ScheduleFactory.createInitialSchedule) or greedy pair-balancing
+    SEQUENTIAL = "sequential"
+    BALANCED = "balanced"
+
     verbose: bool
 
     # current score and schedule
@@ -18,69 +39,393 @@ class OptimizeOpponents:
     bestSchedule: Schedule
     bestScore: float
 
+    # incremental score of current schedule
+    tracker: OpponentsScore
+
     def log(self, *kargs, **kwargs):
         if self.verbose:
             print(*kargs, **kwargs)
 
-    def __init__(self, verbose: bool = True):
+    def __init__(self, verbose: bool = True, acceptance=None, steepest: bool = False, tabuTenure: int = 0,
+                 backend: str = LOOP, initial: str = SEQUENTIAL, listener: OptimizationListener = None):
+        '''
+        <acceptance> decides which changes are accepted:
+        GreedyAcceptance (default) or SimulatedAnnealing.
+        With <steepest> every iteration scores all swaps between two games and
+        tries the best one instead of a random one. Players swapped by steepest
+        descent can't return to their games for <tabuTenure> iterations,
+        unless it gives a new best score.
+        <backend> LOCKSTEP runs all runs as chains of one vectorized engine
+        (random swaps only, <jobs> are not used).
+        <initial> BALANCED starts every run from its own greedy pair-balancing schedule
+        (see ScheduleFactory.createBalancedSchedule) instead of the sequential one,
+        with LOCKSTEP backend all chains start from the balanced schedule of <seed>.
+        <listener> receives statistics of every stage run in this process (see instrumentation.py).
+        '''
+        if backend not in (OptimizeOpponents.LOOP, OptimizeOpponents.LOCKSTEP):
+            raise ValueError(f"Unknown backend: {backend}")
+        if initial not in (OptimizeOpponents.SEQUENTIAL, OptimizeOpponents.BALANCED):
+            raise ValueError(f"Unknown initial schedule: {initial}")
+        if backend == OptimizeOpponents.LOCKSTEP and steepest:
+            raise ValueError("Steepest descent is not supported by lockstep backend")
         self.verbose = verbose
-
-    def optimize(self, conf: Configuration, numRuns: int, numIterations: int):
+        self.acceptance = acceptance if acceptance is not None else GreedyAcceptance()
+        self.steepest = steepest
+        self.tabuTenure = tabuTenure
+        self.backend = backend
+        self.initial = initial
+        self.startSchedule = None
+        self.checkpoint = None
+        self.listener = listener
+        self.timer = None
+        self.random = random.Random()
+        self.lowerBound = None
+
+    def optimize(self, conf: Configuration, numRuns: int, numIterations: int, jobs: int = 1, seed: int = None,
+                 stop: StoppingCriteria = None, checkpoint: Checkpoint = None):
+        '''
+        Runs <numRuns> independent optimizations and returns the best schedule.
+        Every run gets its own seed derived from <seed>, so the same <seed>
+        gives the same result regardless of <jobs> (number of worker processes).
+        Runs stop early on criteria from <stop>, time budget is for the whole optimization.
+        With <checkpoint> (serial runs of loop backend only) state is saved periodically,
+        so an interrupted optimization can be continued by resume().
+        '''
         print("\n*** Optimize opponents")
+        if checkpoint is not None and (jobs > 1 or self.backend != OptimizeOpponents.LOOP):
+            raise ValueError("Checkpoints are supported by serial runs of loop backend only")
 
         self.bestSchedule = None
         self.bestScore = 0
+        self.stopReasons = []
+
+        seeds = runSeeds(seed, numRuns)
+        deadline = stop.deadline() if stop else None
+        if self.backend == OptimizeOpponents.LOCKSTEP:
+            from lockstep import LockstepOpponents
+            results = [LockstepOpponents.optimize(conf, numRuns, numIterations, self.acceptance, seed, stop,
+                                                  self.startSchedule, self.initial)]
+        elif jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = executor.map(_optimizeOpponentsRun,
+                    repeat(self.verbose), repeat(self.acceptance), repeat(self.steepest), repeat(self.tabuTenure),
+                    repeat(self.initial), repeat(self.startSchedule), repeat(conf),
+                    range(numRuns), seeds, repeat(numIterations), repeat(stop), repeat(deadline))
+                results = list(results)
+        else:
+            # generator, so every run is reported right after it's done
+            results = self.serialRuns(conf, seeds, numIterations, stop, deadline, checkpoint)
+        return self.collectResults(results, checkpoint)
+
+    def resume(self, checkpoint: Checkpoint, stop: StoppingCriteria = None):
+        '''
+        Continues optimize() from the last checkpoint exactly where it has stopped:
+        the result is the same as without interruption. Settings of the optimizer
+        are loaded from the checkpoint too, <stop> criteria (and time budget) are new.
+        '''
+        print("\n*** Optimize opponents: resume")
+        saved = checkpoint.load()
+        if saved["optimizer"] != "opponents":
+            raise ValueError(f"Not an opponents optimization checkpoint: {checkpoint.path}")
+        self.acceptance, self.steepest, self.tabuTenure, self.initial, self.startSchedule = saved["settings"]
+        self.bestSchedule = saved["bestSchedule"]
+        self.bestScore = saved["bestScore"]
+        self.stopReasons = saved["stopReasons"]
+
+        deadline = stop.deadline() if stop else None
+        results = self.serialRuns(saved["conf"], saved["seeds"], saved["numIterations"], stop, deadline,
+                                  checkpoint, saved)
+        return self.collectResults(results, checkpoint)
+
+    def collectResults(self, results, checkpoint: Checkpoint = None):
+        '''Keeps the best of (score, schedule, stop reason) <results>, returns the best schedule'''
+        try:
+            for score, schedule, reason in results:
+                self.stopReasons.append(reason)
+
+                # debug output
+                Print.printPairsMatrix(schedule)
+
+                # strict comparison: on equal scores the earliest run wins
+                if not self.bestSchedule or score < self.bestScore:
+                    print("Found best schedule!")
+                    self.bestSchedule = schedule
+                    self.bestScore = score
+        except BaseException:
+            # interrupted: the last checkpoint is kept for resume()
+            self.checkpoint = None
+            if checkpoint is not None:
+                checkpoint.close()
+            raise
+
+        self.checkpoint = None
+        if checkpoint is not None:
+            checkpoint.close(remove=True)
+        return self.bestSchedule
+
+    def refine(self, schedule: Schedule, numRuns: int, numIterations: int, jobs: int = 1, seed: int = None,
+               stop: StoppingCriteria = None):
+        '''
+        Warm start: continues optimization of <schedule> (e.g. loaded by helpers.loadSchedule),
+        every run starts from a copy of it instead of the initial schedule.
+        Swapped players take seats of each other, so seats of all other players are kept.
+        Returns the best schedule, which is <schedule> itself if no run has improved it.
+        '''
+        self.startSchedule = schedule
+        try:
+            self.optimize(schedule.configuration, numRuns, numIterations, jobs, seed, stop)
+        finally:
+            self.startSchedule = None
+
+        startScore = OpponentsScore.create(schedule).score
+        print(f"Refined score: {self.bestScore:8.4f} (start score: {startScore:8.4f})")
+        if startScore <= self.bestScore:
+            self.bestSchedule = schedule
+            self.bestScore = startScore
+        return self.bestSchedule
+
+    def optimizeHalving(self, conf: Configuration, numRuns: int, minIterations: int, keep: float = 0.5,
+                        growth: int = 2, seed: int = None, stop: StoppingCriteria = None):
+        '''
+        Races <numRuns> optimizations with successive halving (see racing.py):
+        every run gets <minIterations> iterations, the best <keep> part of runs
+        continues with <growth> times more iterations, until one run is left.
+        Returns the best schedule.
+        '''
+        print("\n*** Optimize opponents: successive halving")
+
+        seeds = runSeeds(seed, numRuns)
+        deadline = stop.deadline() if stop else None
+        # acceptance of a run continues over all rungs it takes part in
+        halving = SuccessiveHalving(minIterations, keep, growth)
+        horizon = sum(numIterations for _, numIterations in halving.rungs(numRuns))
+
+        runs = []
         for i in range(numRuns):
-            print(f"\n*** Opponents optimization run: {i+1}")
+            acceptance = ContinuedAcceptance(copy.deepcopy(self.acceptance), horizon)
+            run = OptimizeOpponents(self.verbose, acceptance, self.steepest, self.tabuTenure, initial=self.initial,
+                                    listener=self.listener)
+            run.startSchedule = self.startSchedule
+            run.startRun(conf, seeds[i])
+            runs.append(run)
+
+        def advance(run: OptimizeOpponents, numIterations: int):
+            reason = run.optimizeStage(numIterations, stop, deadline)
+            return (run.score, reason)
+
+        best, self.bestScore, reason = halving.race(runs, advance)
+        self.bestSchedule = best.schedule
+        self.stopReasons = [reason]
+        return self.bestSchedule
+
+    def optimizeTempering(self, conf: Configuration, temperatures: list, numIterations: int,
+                          exchangeInterval: int = 1000, jobs: int = 1, seed: int = None,
+                          stop: StoppingCriteria = None):
+        '''
+        Parallel tempering: one replica for every temperature, replicas are split
+        between <jobs> worker processes and exchange schedules after every
+        <exchangeInterval> iterations (see tempering.py). Returns the best schedule.
+        '''
+        print("\n*** Optimize opponents: parallel tempering")
+        from tempering import ParallelTempering
+
+        tempering = ParallelTempering(conf, temperatures, exchangeInterval, self.steepest, self.tabuTenure,
+                                      self.initial)
+        score, schedule, reason = tempering.optimize(numIterations, jobs, seed, stop)
+        self.bestSchedule = schedule
+        self.bestScore = score
+        self.stopReasons = [reason]
+        return schedule
+
+    def serialRuns(self, conf: Configuration, seeds: list, numIterations: int, stop: StoppingCriteria, deadline: float,
+                   checkpoint: Checkpoint = None, saved: dict = None):
+        first = saved["runIndex"] if saved else 0
+        for i in range(first, len(seeds)):
+            # everything checkpointState() needs, but current run
+            self.checkpoint = checkpoint
+            self.runs = (conf, seeds, numIterations, i)
+            result = self.optimizeRun(conf, i, seeds[i], numIterations, stop, deadline, saved if i == first else None)
+            yield result
+
+            # no need to start other runs
+            reason = result[2]
+            if StopReason.isFinal(reason):
+                print(f"Skipping remaining runs: {reason}")
+                return
+
+    def optimizeRun(self, conf: Configuration, runIndex: int, runSeed: int, numIterations: int,
+                    stop: StoppingCriteria = None, deadline: float = None, saved: dict = None):
+        '''Single optimization run, continued from <saved> checkpoint if given. Returns (score, schedule, stop reason)'''
+        print(f"\n*** Opponents optimization run: {runIndex+1}")
+        if saved:
+            self.loadRun(conf, saved)
+        else:
+            self.startRun(conf, runSeed)
+        reason = self.optimizeStage(numIterations, stop, deadline, saved)
+
+        result = (self.score, self.schedule, reason)
+
+        self.schedule = None
+        self.tracker = None
+        self.score = 0
+        return result
+
+    def startRun(self, conf: Configuration, runSeed: int):
+        '''Starts a run from the initial schedule of <conf> or from a copy of <startSchedule> (see refine)'''
+        self.random = random.Random(runSeed)
+        if self.startSchedule is not None:
+            self.schedule = copy.deepcopy(self.startSchedule)
+        elif self.initial == OptimizeOpponents.BALANCED:
+            self.schedule = ScheduleFactory.createBalancedSchedule(conf, runSeed)
+        else:
             self.schedule = ScheduleFactory.createInitialSchedule(conf)
-            self.schedule.generateSlotsFromGames()
-            self.score = self.scoreFunc()
-            self.optimizeStage(numIterations)
+        self.tracker = OpponentsScore.create(self.schedule)
+        self.score = self.tracker.score
+        self.lowerBound = Bounds.opponentsLowerBound(conf)
+        self.stageBestScore = self.score
+        self.tabu = {}
+        self.iteration = 0
+
+    def loadRun(self, conf: Configuration, saved: dict):
+        '''Continues a run from <saved> checkpoint'''
+        self.random = random.Random()
+        self.random.setstate(saved["random"])
+        self.schedule = saved["schedule"]
+        self.tracker = OpponentsScore.create(self.schedule)
+        self.score = self.tracker.score
+        self.lowerBound = Bounds.opponentsLowerBound(conf)
+        self.stageBestScore = saved["stageBestScore"]
+        self.tabu = saved["tabu"]
+        self.iteration = saved["iteration"]
+
+    def checkpointState(self, i: int, goodIterations: int, bestPlayers: array, improvedBest: bool,
+                        state: StoppingState) -> dict:
+        '''State of optimize() before iteration <i> of the current run, see resume()'''
+        conf, seeds, numIterations, runIndex = self.runs
+        return {
+            "optimizer": "opponents",
+            "settings": (self.acceptance, self.steepest, self.tabuTenure, self.initial, self.startSchedule),
+            "conf": conf,
+            "seeds": seeds,
+            "numIterations": numIterations,
+            "runIndex": runIndex,
+            "bestSchedule": self.bestSchedule,
+            "bestScore": self.bestScore,
+            "stopReasons": self.stopReasons,
+
+            # current run and stage
+            "random": self.random.getstate(),
+            "schedule": self.schedule,
+            "stageBestScore": self.stageBestScore,
+            "tabu": self.tabu,
+            "iteration": i,
+            "goodIterations": goodIterations,
+            "bestPlayers": bestPlayers,
+            "improvedBest": improvedBest,
+            "lastImprovement": state.lastImprovement,
+        }
+
+    def loadPlayers(self, players: array):
+        '''Replaces current schedule with <players> (schedule snapshot)'''
+        self.schedule.restore(players)
+        self.tracker = OpponentsScore.create(self.schedule)
+        self.score = self.tracker.score
+
+    def optimizeStage(self, numIterations: int, stop: StoppingCriteria = None, deadline: float = None,
+                      saved: dict = None) -> str:
+        '''Runs up to <numIterations> iterations, continues from <saved> checkpoint if given. Returns StopReason'''
+        state = StoppingState(stop, deadline, self.lowerBound)
+        reason = StopReason.ITERATIONS
+        checkpoint = self.checkpoint
+        monitor = StageMonitor(self.listener, StageStats("opponents", numIterations, self.score)) if self.listener else None
+        timer = self.timer = monitor.timer if monitor else None
+        if saved:
+            # acceptance, stage best score and tabu memory are already loaded
+            bestPlayers = saved["bestPlayers"]
+            improvedBest = saved["improvedBest"]
+            goodIterations = saved["goodIterations"]
+            i = saved["iteration"]
+            state.lastImprovement = saved["lastImprovement"]
+        else:
+            self.acceptance.start(numIterations)
 
-            self.schedule.updateGamesFromSlots()
+            # with non-monotonic acceptance current schedule may be worse than the best one
+            self.stageBestScore = self.score
+            bestPlayers = None
+            improvedBest = False
 
-            # debug output
-            Print.printPairsMatrix(self.schedule)
+            # tabu memory of steepest descent: (playerId, gameId) -> iteration when player may return to game
+            self.tabu = {}
 
-            if not self.bestSchedule or self.score < self.bestScore:
-                print("Found best schedule!")
-                self.bestSchedule = self.schedule
-                self.bestScore = self.score
-            
-            self.schedule = None
-            self.score = 0
+            goodIterations = 0
+            i = 0
+        while i < numIterations:
+            stopReason = state.check(i, self.score)
+            if stopReason:
+                reason = stopReason
+                break
 
-        return self.bestSchedule
+            if checkpoint is not None and i % checkpoint.interval == 0:
+                checkpoint.save(self.checkpointState(i, goodIterations, bestPlayers, improvedBest, state))
+            if monitor is not None and i % monitor.listener.progressInterval == 0:
+                monitor.progress(i, goodIterations, self.score, self.stageBestScore)
 
-    def optimizeStage(self, numIterations: int):
-        goodIterations = 0
-        for i in range(0, numIterations):
             # debug
             if i % 1000 == 0:
                 print(
                     f"Iteration: {i:8d} of {numIterations} (changes: {goodIterations:4d}, score: {self.score:8.4f})")
 
+            self.iteration = i
+            self.acceptance.step(i, improvedBest)
+            improvedBest = False
+            if timer is not None:
+                timer.start()
             success = self.randomOpponentChange()
             if success:
                 goodIterations += 1
+                if self.score < self.stageBestScore:
+                    self.stageBestScore = self.score
+                    improvedBest = True
+                    state.improved(i)
+                    if not self.acceptance.monotonic:
+                        bestPlayers = self.schedule.snapshot()
+            i += 1
+
+        if bestPlayers is not None and self.stageBestScore < self.score:
+            self.loadPlayers(bestPlayers)
+
+        if monitor is not None:
+            move = "steepest swap" if self.steepest else "random swap"
+            monitor.finish(i, goodIterations, self.score, self.stageBestScore, reason, {move: (i, goodIterations)})
+            self.timer = None
 
         # debug
-        print(f"Final score: {self.score:8.4f}")
-        print(f"Good iterations: {goodIterations} of {numIterations}")
+        if self.lowerBound is not None:
+            print(f"Final score: {self.score:8.4f} (lower bound: {self.lowerBound:8.4f}, gap: {Bounds.gap(self.score, self.lowerBound):8.4f})")
+        else:
+            print(f"Final score: {self.score:8.4f}")
+        print(f"Good iterations: {goodIterations} of {i}, stopped: {reason}, acceptance: {self.acceptance.describe()}")
+        return reason
 
     def randomOpponentChange(self) -> bool:
         if self.schedule.configuration.numTables == 1:
-            roundOne = random.choice(self.schedule.rounds)
+            roundOne = self.random.choice(self.schedule.rounds)
             roundTwo = roundOne
             while roundTwo == roundOne:
-                roundTwo = random.choice(self.schedule.rounds)
+                roundTwo = self.random.choice(self.schedule.rounds)
+            if self.steepest:
+                # the only game of a round
+                return self.bestOpponentChangeInGames(self.schedule.games[roundOne.id].id,
+                                                      self.schedule.games[roundTwo.id].id)
             return self.randomOpponentChangeInRounds(roundOne.id, roundTwo.id)
 
-        r = random.choice(self.schedule.rounds)
-        gameOneId = random.choice(r.gameIds)
+        r = self.random.choice(self.schedule.rounds)
+        gameOneId = self.random.choice(r.gameIds)
         gameTwoId = gameOneId
         while gameTwoId == gameOneId:
-            gameTwoId = random.choice(r.gameIds)
+            gameTwoId = self.random.choice(r.gameIds)
+        if self.steepest:
+            return self.bestOpponentChangeInGames(gameOneId, gameTwoId)
         return self.randomOpponentChangeInGames(gameOneId, gameTwoId)
 
     def randomOpponentChangeInRounds(self, roundOneId: int, roundTwoId: int) -> bool:
@@ -92,83 +437,148 @@ class OptimizeOpponents:
         slotOne = self.schedule.slots[gameOneId]
         slotTwo = self.schedule.slots[gameTwoId]
 
-        # figure out what players can be switched
-        all = {playerId for playerId in range(self.schedule.numPlayers)}
-        busyOne = slotOne.players
-        freeOne = all.difference(busyOne)
-        busyTwo = slotTwo.players
-        freeTwo = all.difference(busyTwo)
-
-        # chose 2 players to switch between games
-        poolA = busyOne.intersection(freeTwo)
-        poolB = busyTwo.intersection(freeOne)
-        if len(poolA) == 0 or len(poolB) == 0:
+        # chose 2 players to switch between games:
+        # players of one game who are free in the other one
+        busyOne = slotOne.mask
+        busyTwo = slotTwo.mask
+        poolA = busyOne & ~busyTwo
+        poolB = busyTwo & ~busyOne
+        if poolA == 0 or poolB == 0:
             # can not find substitution as one of player pools is empty
             # print("empty pool!")
+            if self.timer is not None:
+                self.timer.lap("proposal")
             return False
 
-        playerA = random.choice(list(poolA))
-        playerB = random.choice(list(poolB))
-
-        # switch players from games
-        slotOne.players.remove(playerA)
-        slotOne.players.add(playerB)
-        slotTwo.players.remove(playerB)
-        slotTwo.players.add(playerA)
-
-        # continue only if score gets better
-        currentScore = self.scoreFunc()
-        if currentScore < self.score:
-            self.score = currentScore
-            self.log(
-                f"Score: {self.score:8.4f}. " +
-                f"Swap in rounds: {roundOneId:2d} x {roundTwoId:2d}, players: {playerA:2d} x {playerB:2d}")
+        playerA = maskChoice(poolA, self.random)
+        playerB = maskChoice(poolB, self.random)
+        if self.timer is not None:
+            self.timer.lap("proposal")
+
+        # continue only if the change is accepted
+        accepted = self.acceptance.accept(self.tracker.swapDelta(busyOne, busyTwo, playerA, playerB), self.random)
+        if self.timer is not None:
+            self.timer.lap("scoring")
+        if accepted:
+            self.tracker.applySwap(busyOne, busyTwo, playerA, playerB)
+
+            # switch players from games
+            slotOne.swap(playerA, playerB)
+            slotTwo.swap(playerB, playerA)
+
+            self.score = self.tracker.score
+            if self.verbose:
+                self.log(
+                    f"Score: {self.score:8.4f}. " +
+                    f"Swap in rounds: {roundOneId:2d} x {roundTwoId:2d}, players: {playerA:2d} x {playerB:2d}")
+            if self.timer is not None:
+                self.timer.lap("apply")
             return True
         else:
-            slotOne.players.remove(playerB)
-            slotOne.players.add(playerA)
-            slotTwo.players.remove(playerA)
-            slotTwo.players.add(playerB)
             return False
 
     def randomOpponentChangeInGames(self, gameOneId: int, gameTwoId: int) -> bool:
         slotOne = self.schedule.slots[gameOneId]
         slotTwo = self.schedule.slots[gameTwoId]
 
-        busyOne = slotOne.players
-        busyTwo = slotTwo.players
-        busyBoth = busyOne.intersection(busyTwo)
+        busyOne = slotOne.mask
+        busyTwo = slotTwo.mask
+        busyBoth = busyOne & busyTwo
 
-        one = busyOne.difference(busyBoth)
-        two = busyTwo.difference(busyBoth)
-        if len(one) == 0 or len(two) == 0:
+        one = busyOne & ~busyBoth
+        two = busyTwo & ~busyBoth
+        if one == 0 or two == 0:
             # no candidates to swap
             # print("No candidates to swap!")
+            if self.timer is not None:
+                self.timer.lap("proposal")
             return False
 
-        playerA = random.choice(list(one))
-        playerB = random.choice(list(two))
-
-        # switch players from games
-        slotOne.players.remove(playerA)
-        slotOne.players.add(playerB)
-        slotTwo.players.remove(playerB)
-        slotTwo.players.add(playerA)
-
-        # continue only if score gets better
-        currentScore = self.scoreFunc()
-        if currentScore < self.score:
-            self.score = currentScore
-            self.log(f"Score: {self.score:8.4f}. " +
-                     f"Swap in games: {gameOneId:2d} x {gameTwoId:2d}, players: {playerA:2d} x {playerB:2d}")
+        playerA = maskChoice(one, self.random)
+        playerB = maskChoice(two, self.random)
+        if self.timer is not None:
+            self.timer.lap("proposal")
+
+        # continue only if the change is accepted
+        accepted = self.acceptance.accept(self.tracker.swapDelta(busyOne, busyTwo, playerA, playerB), self.random)
+        if self.timer is not None:
+            self.timer.lap("scoring")
+        if accepted:
+            self.tracker.applySwap(busyOne, busyTwo, playerA, playerB)
+
+            # switch players from games
+            slotOne.swap(playerA, playerB)
+            slotTwo.swap(playerB, playerA)
+
+            self.score = self.tracker.score
+            if self.verbose:
+                self.log(f"Score: {self.score:8.4f}. " +
+                         f"Swap in games: {gameOneId:2d} x {gameTwoId:2d}, players: {playerA:2d} x {playerB:2d}")
+            if self.timer is not None:
+                self.timer.lap("apply")
             return True
         else:
-            slotOne.players.remove(playerB)
-            slotOne.players.add(playerA)
-            slotTwo.players.remove(playerA)
-            slotTwo.players.add(playerB)
             return False
 
+    def bestOpponentChangeInGames(self, gameOneId: int, gameTwoId: int) -> bool:
+        '''Steepest descent: scores all swaps between two games and tries the best allowed one'''
+        slotOne = self.schedule.slots[gameOneId]
+        slotTwo = self.schedule.slots[gameTwoId]
+
+        busyOne = slotOne.mask
+        busyTwo = slotTwo.mask
+        if self.timer is not None:
+            self.timer.lap("proposal")
+        playersOne, playersTwo, deltas = self.tracker.swapDeltas(busyOne, busyTwo)
+
+        best = None
+        for a, playerA in enumerate(playersOne):
+            row = deltas[a]
+            for b, playerB in enumerate(playersTwo):
+                delta = row[b]
+                if best is not None and delta >= best[0]:
+                    continue
+                # tabu swaps are allowed only if they give a new best score
+                if self.isTabu(playerA, gameTwoId) or self.isTabu(playerB, gameOneId):
+                    if self.score + delta >= self.stageBestScore:
+                        continue
+                best = (delta, playerA, playerB)
+
+        if best is None:
+            # no candidates to swap
+            if self.timer is not None:
+                self.timer.lap("scoring")
+            return False
+
+        delta, playerA, playerB = best
+        accepted = self.acceptance.accept(delta, self.random)
+        if self.timer is not None:
+            self.timer.lap("scoring")
+        if not accepted:
+            return False
+
+        self.tracker.applySwap(busyOne, busyTwo, playerA, playerB)
+
+        # switch players from games
+        slotOne.swap(playerA, playerB)
+        slotTwo.swap(playerB, playerA)
+
+        if self.tabuTenure > 0:
+            self.tabu[(playerA, gameOneId)] = self.iteration + self.tabuTenure
+            self.tabu[(playerB, gameTwoId)] = self.iteration + self.tabuTenure
+
+        self.score = self.tracker.score
+        if self.verbose:
+            self.log(f"Score: {self.score:8.4f}. " +
+                     f"Best swap in games: {gameOneId:2d} x {gameTwoId:2d}, players: {playerA:2d} x {playerB:2d}")
+        if self.timer is not None:
+            self.timer.lap("apply")
+        return True
+
+    def isTabu(self, playerId: int, gameId: int) -> bool:
+        '''Checks if <playerId> has recently left game <gameId>'''
+        return self.tabu.get((playerId, gameId), -1) > self.iteration
+
     '''
     # old score func
     def scoreFunc(self) -> float:
@@ -186,15 +596,12 @@ class OptimizeOpponents:
 
     # new score function
     def scoreFunc(self) -> float:
-        metrics = Metrics(self.schedule)
+        metrics = Metrics.create(self.schedule)
 
-        basePenalty = 0.0
-        for playerId in range(self.schedule.numPlayers):
-            basePenalty += metrics.penaltyPlayer(playerId)
+        basePenalty = sum(metrics.penaltyPlayers())
 
         zeroPlayers = 0
-        for playerId in range(self.schedule.numPlayers):
-            pairs = metrics.calcPlayerPairsHistogram(playerId)
+        for pairs in metrics.calcPlayerPairsHistograms():
             if pairs[0] == 1:
                 zeroPlayers +=1
         
@@ -203,3 +610,11 @@ class OptimizeOpponents:
 
         return basePenalty + zeroPenalty
 
+
+def _optimizeOpponentsRun(verbose: bool, acceptance, steepest: bool, tabuTenure: int, initial: str,
+                          startSchedule: Schedule, conf: Configuration, runIndex: int, runSeed: int,
+                          numIterations: int, stop: StoppingCriteria, deadline: float):
+    '''Single optimization run in worker process'''
+    optimizer = OptimizeOpponents(verbose, acceptance, steepest, tabuTenure, initial=initial)
+    optimizer.startSchedule = startSchedule
+    return optimizer.optimizeRun(conf, runIndex, runSeed, numIterations, stop, deadline)
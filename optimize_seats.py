@@ -1,14 +1,39 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import copy
+import dataclasses
+import math
+import multiprocessing
 import random
 
 from schedule import *
 from metrics import *
 from print import *
+from seats_score import SeatsScore
+from seats_construction import SeatsConstruction
+from helpers import runSeeds
+from stopping import StoppingCriteria, StoppingState, StopReason
+from bounds import Bounds
+from acceptance import GreedyAcceptance, SimulatedAnnealing, ContinuedAcceptance
+from moves import AdaptiveMoveSelector
+from assignment import solveAssignment
+from racing import SuccessiveHalving
+from checkpoint import Checkpoint
+from instrumentation import OptimizationListener, StageMonitor, StageStats
 
 
 class OptimizeSeats:
+    # backends: independent runs one by one, or all runs in lockstep (see lockstep.py, requires numpy)
+    LOOP = "loop"
+    LOCKSTEP = "lockstep"
+
     verbose: bool
     schedule: Schedule
 
+    # incremental score of current seating
+    tracker: SeatsScore
+
 
     shuffleGameFunc = None
 
@@ -16,133 +41,548 @@ class OptimizeSeats:
         if self.verbose:
             print(*kargs, **kwargs)
 
-    def __init__(self, schedule: Schedule, verbose: bool = True):
+    def __init__(self, schedule: Schedule, verbose: bool = True, acceptance=None, adaptiveMoves: bool = False,
+                 backend: str = LOOP, listener: OptimizationListener = None):
+        '''
+        <acceptance> decides which changes are accepted: GreedyAcceptance (default) or SimulatedAnnealing.
+        With <adaptiveMoves> every iteration picks a move (full shuffle, two players swap or
+        three players rotation) by their acceptance rates, otherwise a run uses one move chosen by its index.
+        <backend> LOCKSTEP runs all runs as chains of one vectorized engine
+        (two players swaps only, <jobs> are not used).
+        <listener> receives statistics of every stage run in this process (see instrumentation.py).
+        '''
+        if backend not in (OptimizeSeats.LOOP, OptimizeSeats.LOCKSTEP):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == OptimizeSeats.LOCKSTEP and adaptiveMoves:
+            raise ValueError("Adaptive moves are not supported by lockstep backend")
         self.schedule = schedule
         self.verbose = verbose
+        self.acceptance = acceptance if acceptance is not None else GreedyAcceptance()
+        self.adaptiveMoves = adaptiveMoves
+        self.moveSelector = None
+        self.backend = backend
+        self.random = random.Random()
+        self.sharedBestScore = None
+        self.stopReason = None
+        self.checkpoint = None
+        self.listener = listener
+        self.timer = None
 
-    def optimize(self, numRuns: int, iterations: list()):
+    def optimize(self, numRuns: int, iterations: list(), jobs: int = 1, seed: int = None,
+                 stop: StoppingCriteria = None, checkpoint: Checkpoint = None):
+        '''
+        Runs <numRuns> seating optimizations starting from current seating
+        and keeps the best one. Every run gets its own seed derived from <seed>.
+        With <jobs> > 1 runs are executed in worker processes, which share
+        the best score, so hopeless runs are still abandoned early.
+        Stages stop early on criteria from <stop>, time budget is for the whole optimization.
+        With <checkpoint> (serial runs of loop backend only) state is saved periodically,
+        so an interrupted optimization can be continued by resume().
+        '''
         print("\n*** Optimize seats")
+        if checkpoint is not None and (jobs > 1 or self.backend != OptimizeSeats.LOOP):
+            raise ValueError("Checkpoints are supported by serial runs of loop backend only")
 
-        gamePlayers = self.schedule.saveGamePlayers()
+        initialPlayers = self.schedule.snapshot()
         self.currentScore = None
         self.bestScore = None
-        self.bestGamePlayers = None
+        self.bestPlayers = None
+        self.stopReasons = []
 
-        for i in range(numRuns):
-            print(f"\n*** Seating optimization run: {i+1}")
-            self.schedule.updateGamePlayers(gamePlayers)
-
-            func = [
-                self.swapAllPlayers,
-                self.swapTwoPlayers]
-
-            for stage in range(len(iterations)):
-                numIterations = iterations[stage]
-                print(f"\nStage: {stage+1} (iterations: {numIterations})")
-                self.shuffleGameFunc = func[i % len(func)]
-                self.optimizeStage(numIterations)
-                if self.bestScore != None and 2 * self.bestScore < self.currentScore:
-                    print("We have better best score, so... don't continue")
+        seeds = runSeeds(seed, numRuns)
+        deadline = stop.deadline() if stop else None
+        if self.backend == OptimizeSeats.LOCKSTEP:
+            from lockstep import LockstepSeats
+            self.bestScore, reason = LockstepSeats.optimize(self.schedule, numRuns, iterations, self.acceptance, seed, stop)
+            self.bestPlayers = self.schedule.snapshot()
+            self.stopReasons.append(reason)
+        elif jobs > 1:
+            self.optimizeParallel(initialPlayers, seeds, iterations, jobs, stop, deadline)
+        else:
+            self.serialRuns(initialPlayers, seeds, iterations, stop, deadline, checkpoint)
+
+        self.schedule.restore(self.bestPlayers)
+
+    def resume(self, checkpoint: Checkpoint, stop: StoppingCriteria = None):
+        '''
+        Continues optimize() from the last checkpoint exactly where it has stopped:
+        the result is the same as without interruption. Seating and settings of the optimizer
+        are loaded from the checkpoint too, <stop> criteria (and time budget) are new.
+        '''
+        print("\n*** Optimize seats: resume")
+        saved = checkpoint.load()
+        if saved["optimizer"] != "seats":
+            raise ValueError(f"Not a seats optimization checkpoint: {checkpoint.path}")
+        self.acceptance, self.adaptiveMoves = saved["settings"]
+        self.bestScore = saved["bestScore"]
+        self.bestPlayers = saved["bestPlayers"]
+        self.stopReasons = saved["stopReasons"]
+
+        deadline = stop.deadline() if stop else None
+        self.serialRuns(saved["initialPlayers"], saved["seeds"], saved["iterations"], stop, deadline,
+                        checkpoint, saved)
+        self.schedule.restore(self.bestPlayers)
+
+    def serialRuns(self, initialPlayers: array, seeds: list, iterations: list, stop: StoppingCriteria,
+                   deadline: float, checkpoint: Checkpoint = None, saved: dict = None):
+        first = saved["runIndex"] if saved else 0
+        try:
+            for i in range(first, len(seeds)):
+                # everything checkpointState() needs, but current run
+                self.checkpoint = checkpoint
+                self.runs = (initialPlayers, seeds, iterations, i)
+                self.schedule.restore(initialPlayers)
+                score = self.optimizeRun(i, seeds[i], iterations, stop, deadline, saved if i == first else None)
+                self.stopReasons.append(self.stopReason)
+
+                if self.bestPlayers == None or score < self.bestScore:
+                    print(f"Found best seating, score : {score:8.4f}")
+                    self.bestScore = score
+                    self.bestPlayers = self.schedule.snapshot()
+
+                # no need to start other runs
+                if StopReason.isFinal(self.stopReason):
+                    print(f"Skipping remaining runs: {self.stopReason}")
                     break
+        except BaseException:
+            # interrupted: the last checkpoint is kept for resume()
+            self.checkpoint = None
+            if checkpoint is not None:
+                checkpoint.close()
+            raise
+
+        self.checkpoint = None
+        if checkpoint is not None:
+            checkpoint.close(remove=True)
+
+    def construct(self, seed: int = None) -> float:
+        '''
+        Replaces current seating with constructed balanced seating (see seats_construction.py).
+        With <numAttempts> multiple of 10 it's already optimal, otherwise it's a good start
+        for a short optimize(). Returns its score.
+        '''
+        print("\n*** Construct seats")
+        self.schedule.restore(SeatsConstruction.balancedSeating(self.schedule, seed))
+        self.tracker = SeatsScore(self.schedule)
+        self.currentScore = self.tracker.score
+        print(f"Constructed seating, score: {self.currentScore:8.4f}")
+        return self.currentScore
+
+    def optimizeParallel(self, initialPlayers: array, seeds: list, iterations: list, jobs: int,
+                         stop: StoppingCriteria, deadline: float):
+        sharedBestScore = multiprocessing.Value('d', math.inf)
+        initargs = (self.schedule, initialPlayers, self.verbose, self.acceptance, self.adaptiveMoves, sharedBestScore)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_initSeatsWorker, initargs=initargs) as executor:
+            results = executor.map(_optimizeSeatsRun, range(len(seeds)), seeds,
+                repeat(iterations), repeat(stop), repeat(deadline))
+
+            # only runs which improved the shared best score send their seating back
+            for i, score, bestPlayers, reason in results:
+                self.stopReasons.append(reason)
+                if bestPlayers == None:
+                    continue
+                if self.bestPlayers == None or score < self.bestScore:
+                    print(f"Found best seating, run: {i+1}, score : {score:8.4f}")
+                    self.bestScore = score
+                    self.bestPlayers = bestPlayers
+
+    def optimizeHalving(self, numRuns: int, minIterations: int, keep: float = 0.5, growth: int = 2,
+                        seed: int = None, stop: StoppingCriteria = None):
+        '''
+        Races <numRuns> seating optimizations starting from current seating with
+        successive halving (see racing.py): every run gets <minIterations> iterations,
+        the best <keep> part of runs continues with <growth> times more iterations,
+        until one run is left. Keeps the best seating.
+        '''
+        print("\n*** Optimize seats: successive halving")
+
+        initialPlayers = self.schedule.snapshot()
+        seeds = runSeeds(seed, numRuns)
+        deadline = stop.deadline() if stop else None
+
+        # every run has its own optimizer and seating, current seating is loaded into shared schedule
+        # acceptance of a run continues over all rungs it takes part in
+        halving = SuccessiveHalving(minIterations, keep, growth)
+        horizon = sum(numIterations for _, numIterations in halving.rungs(numRuns))
+
+        runs = []
+        for i in range(numRuns):
+            acceptance = ContinuedAcceptance(copy.deepcopy(self.acceptance), horizon)
+            run = OptimizeSeats(self.schedule, self.verbose, acceptance, self.adaptiveMoves, listener=self.listener)
+            run.startRun(i, seeds[i])
+            run.players = initialPlayers
+            runs.append(run)
+
+        def advance(run: OptimizeSeats, numIterations: int):
+            self.schedule.restore(run.players)
+            reason = run.optimizeStage(numIterations, stop, deadline)
+            run.players = self.schedule.snapshot()
+            return (run.currentScore, reason)
+
+        best, self.bestScore, reason = halving.race(runs, advance)
+        self.bestPlayers = best.players
+        self.stopReasons = [reason]
+        self.schedule.restore(self.bestPlayers)
+
+    def optimizeAssignment(self, maxSweeps: int = 100, kicks: int = 0, kickGames: int = 2, seed: int = None,
+                           stop: StoppingCriteria = None) -> float:
+        '''
+        Exact coordinate descent from current seating: every sweep goes through all games
+        in random order and seats players of a game optimally given seats of all other games
+        (10x10 assignment problem, see assignment.py), until a sweep improves no game
+        or <maxSweeps> sweeps are done.
+        With <kicks> > 0 it's iterated local search: seats of <kickGames> random games are
+        shuffled and descent is repeated <kicks> times, worse results are rolled back.
+        Keeps the best seating and returns its score.
+        '''
+        print("\n*** Optimize seats: exact assignment of games")
+
+        self.random = random.Random(seed)
+        self.tracker = SeatsScore(self.schedule)
+        self.currentScore = self.tracker.score
+
+        # criteria are checked once per sweep, so the clock has to be checked every time
+        criteria = dataclasses.replace(stop if stop else StoppingCriteria(), timeCheckInterval=1)
+        lowerBound = Bounds.seatsLowerBound(self.schedule.configuration)
+        state = StoppingState(criteria, criteria.deadline(), lowerBound)
+        self.sweep = 0
+
+        reason = self.descend(maxSweeps, state)
+        bestScore = self.currentScore
+        bestPlayers = self.schedule.snapshot()
+        for kick in range(kicks):
+            if StopReason.isFinal(reason):
+                break
+
+            for game in self.random.sample(self.schedule.games, kickGames):
+                oldPlayers = game.players.copy()
+                self.swapAllPlayers(game)
+                self.tracker.applyChange(oldPlayers, game.players.copy())
+            self.currentScore = self.tracker.score
+
+            reason = self.descend(maxSweeps, state)
+            print(f"Kick: {kick+1:4d} of {kicks}, score: {self.currentScore:8.4f}, best score: {bestScore:8.4f}")
+            if self.currentScore < bestScore - 1e-9:
+                bestScore = self.currentScore
+                bestPlayers = self.schedule.snapshot()
+            else:
+                self.schedule.restore(bestPlayers)
+                self.tracker = SeatsScore(self.schedule)
+                self.currentScore = self.tracker.score
+
+        print(f"Final score: {self.currentScore:8.4f} (lower bound: {lowerBound:8.4f}, gap: {Bounds.gap(self.currentScore, lowerBound):8.4f})")
+        self.bestScore = self.currentScore
+        self.bestPlayers = bestPlayers
+        self.stopReasons = [reason]
+        return self.currentScore
+
+    def descend(self, maxSweeps: int, state: StoppingState) -> str:
+        '''Sweeps of optimizeAssignment until no game improves. Returns StopReason'''
+        order = list(range(len(self.schedule.games)))
+        for _ in range(maxSweeps):
+            stopReason = state.check(self.sweep, self.currentScore)
+            if stopReason:
+                return stopReason
+
+            self.random.shuffle(order)
+            improvedGames = sum(self.assignGame(self.schedule.games[index]) for index in order)
+            self.sweep += 1
+            if self.verbose:
+                self.log(f"Sweep: {self.sweep:4d} (improved games: {improvedGames:4d}, score: {self.currentScore:8.4f})")
+            if improvedGames == 0:
+                return StopReason.NO_IMPROVEMENT
+            state.improved(self.sweep)
+        return StopReason.ITERATIONS
+
+    def assignGame(self, game: Game) -> bool:
+        '''
+        Seats players of <game> optimally given seats of all other games.
+        Penalty of a player depends only on his own seats, so the cost of a player at a seat
+        is his penalty with this seat added to his seats in other games.
+        Returns True if the score is improved.
+        '''
+        players = game.players.copy()
+        target = self.tracker.target
+        cost = []
+        for seat, playerId in enumerate(players):
+            seats = list(self.tracker.seats[playerId])
+            seats[seat] -= 1
+            row = []
+            for newSeat in range(len(seats)):
+                seats[newSeat] += 1
+                row.append(SeatsScore.penaltyPlayer(seats, target))
+                seats[newSeat] -= 1
+            cost.append(row)
+
+        newPlayers = [None] * len(players)
+        for i, newSeat in enumerate(solveAssignment(cost)):
+            newPlayers[newSeat] = players[i]
 
-            if self.bestGamePlayers == None or self.currentScore < self.bestScore:
-                print(f"Found best seating, score : {self.currentScore:8.4f}")
-                self.bestScore = self.currentScore
-                self.bestGamePlayers = self.schedule.saveGamePlayers()
-        
-        self.schedule.updateGamePlayers(self.bestGamePlayers)
+        # tolerance: the same seating may differ in the last bits of float sums
+        if self.tracker.changeDelta(players, newPlayers) > -1e-9:
+            return False
+        self.tracker.applyChange(players, newPlayers)
+        self.currentScore = self.tracker.score
+        game.players = newPlayers
+        return True
+
+    def startRun(self, runIndex: int, runSeed: int):
+        '''Prepares run <runIndex>: random generator and moves'''
+        self.random = random.Random(runSeed)
+
+        func = [
+            self.swapAllPlayers,
+            self.swapTwoPlayers]
+        self.shuffleGameFunc = func[runIndex % len(func)]
+        self.moveList = self.moves()
+        if self.adaptiveMoves:
+            self.moveSelector = AdaptiveMoveSelector(len(self.moveList))
+
+    def optimizeRun(self, runIndex: int, runSeed: int, iterations: list,
+                    stop: StoppingCriteria = None, deadline: float = None, saved: dict = None) -> float:
+        '''
+        Single optimization run from current seating, or continued from <saved> checkpoint.
+        Returns final score, the reason why the last stage has stopped is saved to <stopReason>.
+        '''
+        print(f"\n*** Seating optimization run: {runIndex+1}")
+        if saved:
+            self.loadRun(runIndex, saved)
+        else:
+            self.startRun(runIndex, runSeed)
+
+        for stage in range(saved["stage"] if saved else 0, len(iterations)):
+            numIterations = iterations[stage]
+            print(f"\nStage: {stage+1} (iterations: {numIterations})")
+            self.stage = stage
+            if saved and stage == saved["stage"]:
+                self.stopReason = self.optimizeStage(numIterations, stop, deadline, saved)
+            else:
+                if self.adaptiveMoves:
+                    self.moveSelector = AdaptiveMoveSelector(len(self.moveList))
+                self.stopReason = self.optimizeStage(numIterations, stop, deadline)
+            if StopReason.isFinal(self.stopReason):
+                break
+
+            bestScore = self.sharedBestScore.value if self.sharedBestScore else self.bestScore
+            if bestScore != None and 2 * bestScore < self.currentScore:
+                print("We have better best score, so... don't continue")
+                break
+
+        return self.currentScore
 
-    def optimizeStage(self, iterations: int):
-        self.currentScore = self.scoreFunc()
+    def optimizeStage(self, iterations: int, stop: StoppingCriteria = None, deadline: float = None,
+                      saved: dict = None) -> str:
+        '''Runs up to <iterations> iterations, continues from <saved> checkpoint if given. Returns StopReason'''
+        self.tracker = SeatsScore(self.schedule)
+        self.currentScore = self.tracker.score
+        lowerBound = Bounds.seatsLowerBound(self.schedule.configuration)
+        state = StoppingState(stop, deadline, lowerBound)
+        reason = StopReason.ITERATIONS
+        checkpoint = self.checkpoint
+        monitor = StageMonitor(self.listener, StageStats("seats", iterations, self.currentScore)) if self.listener else None
+        timer = self.timer = monitor.timer if monitor else None
+        if saved:
+            # acceptance and moves are already loaded
+            bestScore = saved["stageBestScore"]
+            bestPlayers = saved["stageBestPlayers"]
+            improvedBest = saved["improvedBest"]
+            goodIterations = saved["goodIterations"]
+            i = saved["iteration"]
+            state.lastImprovement = saved["lastImprovement"]
+        else:
+            self.acceptance.start(iterations)
+
+            # with non-monotonic acceptance current seating may be worse than the best one
+            bestScore = self.currentScore
+            bestPlayers = None
+            improvedBest = False
+
+            goodIterations = 0
+            i = 0
+        while i < iterations:
+            stopReason = state.check(i, self.currentScore)
+            if stopReason:
+                reason = stopReason
+                break
+
+            if checkpoint is not None and i % checkpoint.interval == 0:
+                checkpoint.save(self.checkpointState(i, goodIterations, bestScore, bestPlayers, improvedBest, state))
+            if monitor is not None and i % monitor.listener.progressInterval == 0:
+                monitor.progress(i, goodIterations, self.currentScore, bestScore)
 
-        goodIterations = 0
-        for i in range(iterations):
             if i % 1000 == 0:
                 print(
                     f"Iteration: {i:8d} of {iterations} (changes: {goodIterations:4d}, score: {self.currentScore:8.4f})")
+
+            self.acceptance.step(i, improvedBest)
+            improvedBest = False
+            if timer is not None:
+                timer.start()
             success = self.randomSeatChange()
             if success:
                 goodIterations += 1
+                if self.currentScore < bestScore:
+                    bestScore = self.currentScore
+                    improvedBest = True
+                    state.improved(i)
+                    if not self.acceptance.monotonic:
+                        bestPlayers = self.schedule.snapshot()
+            i += 1
+
+        if bestPlayers is not None and bestScore < self.currentScore:
+            self.schedule.restore(bestPlayers)
+            self.tracker = SeatsScore(self.schedule)
+            self.currentScore = self.tracker.score
+
+        if monitor is not None:
+            if self.moveSelector is not None:
+                moves = {move.__name__: (tried, accepted) for move, tried, accepted
+                         in zip(self.moveList, self.moveSelector.tried, self.moveSelector.accepted)}
+            else:
+                moves = {self.shuffleGameFunc.__name__: (i, goodIterations)}
+            monitor.finish(i, goodIterations, self.currentScore, min(bestScore, self.currentScore), reason, moves)
+            self.timer = None
 
         # debug
-        print(f"Final score: {self.currentScore:8.4f}")
-        print(f"Good iterations: {goodIterations} of {iterations}")
+        print(f"Final score: {self.currentScore:8.4f} (lower bound: {lowerBound:8.4f}, gap: {Bounds.gap(self.currentScore, lowerBound):8.4f})")
+        print(f"Good iterations: {goodIterations} of {i}, stopped: {reason}, acceptance: {self.acceptance.describe()}")
+        if self.moveSelector is not None:
+            print(f"Moves: {self.moveSelector.describe([move.__name__ for move in self.moveList])}")
+        return reason
+
+    def loadRun(self, runIndex: int, saved: dict):
+        '''Continues run <runIndex> from <saved> checkpoint'''
+        self.startRun(runIndex, None)
+        self.random.setstate(saved["random"])
+        self.moveSelector = saved["moveSelector"]
+        self.schedule.restore(saved["players"])
+
+    def checkpointState(self, i: int, goodIterations: int, stageBestScore: float, stageBestPlayers: array,
+                        improvedBest: bool, state: StoppingState) -> dict:
+        '''State of optimize() before iteration <i> of the current stage, see resume()'''
+        initialPlayers, seeds, iterations, runIndex = self.runs
+        return {
+            "optimizer": "seats",
+            "settings": (self.acceptance, self.adaptiveMoves),
+            "initialPlayers": initialPlayers,
+            "seeds": seeds,
+            "iterations": iterations,
+            "runIndex": runIndex,
+            "bestScore": self.bestScore,
+            "bestPlayers": self.bestPlayers,
+            "stopReasons": self.stopReasons,
+
+            # current run and stage
+            "stage": self.stage,
+            "random": self.random.getstate(),
+            "moveSelector": self.moveSelector,
+            "players": self.schedule.snapshot(),
+            "iteration": i,
+            "goodIterations": goodIterations,
+            "stageBestScore": stageBestScore,
+            "stageBestPlayers": stageBestPlayers,
+            "improvedBest": improvedBest,
+            "lastImprovement": state.lastImprovement,
+        }
+
+    def moves(self) -> list:
+        '''Moves of adaptive move selection'''
+        return [self.swapAllPlayers, self.swapTwoPlayers, self.rotateThreePlayers]
 
     def randomSeatChange(self) -> bool:
-        game = random.choice(self.schedule.games)
+        game = self.random.choice(self.schedule.games)
+
+        if self.moveSelector is not None:
+            move = self.moveSelector.choose(self.random)
+            shuffleGameFunc = self.moveList[move]
+        else:
+            shuffleGameFunc = self.shuffleGameFunc
 
         oldPlayers = game.players.copy()
-        self.shuffleGameFunc(game)
-        score = self.scoreFunc()
+        shuffleGameFunc(game)
+        newPlayers = game.players.copy()
+        if self.timer is not None:
+            self.timer.lap("proposal")
 
-        if score < self.currentScore:
-            # debug
-            self.log(f"Score: {score:8.4f}. Shuffle game: {game.id}")
+        accepted = self.acceptance.accept(self.tracker.changeDelta(oldPlayers, newPlayers), self.random)
+        if self.moveSelector is not None:
+            self.moveSelector.update(move, accepted)
+        if self.timer is not None:
+            self.timer.lap("scoring")
 
-            self.currentScore = score
+        if accepted:
+            self.tracker.applyChange(oldPlayers, newPlayers)
+            self.currentScore = self.tracker.score
+
+            # debug
+            if self.verbose:
+                self.log(f"Score: {self.currentScore:8.4f}. Shuffle game: {game.id}")
+            if self.timer is not None:
+                self.timer.lap("apply")
             return True
         else:
             game.players = oldPlayers
+            if self.timer is not None:
+                self.timer.lap("undo")
             return False
 
     def swapTwoPlayers(self, game: Game):
         # pick 2 players
-        playerOne = random.randrange(len(game.players))
+        playerOne = self.random.randrange(len(game.players))
         playerTwo = playerOne
         while playerOne == playerTwo:
-            playerTwo = random.randrange(len(game.players))
+            playerTwo = self.random.randrange(len(game.players))
 
-        # swap two players
-        game.players[playerOne], game.players[playerTwo] = game.players[playerTwo], game.players[playerOne]
+        # swap two players, keeps the player index of the schedule
+        game.players.swap(playerOne, playerTwo)
+
+    def rotateThreePlayers(self, game: Game):
+        # pick 3 seats and move their players one seat around
+        one, two, three = self.random.sample(range(len(game.players)), 3)
+        players = game.players.copy()
+        players[one], players[two], players[three] = players[three], players[one], players[two]
+        game.players = players
 
     def swapAllPlayers(self, game: Game):
-        random.shuffle(game.players)
+        players = game.players.copy()
+        self.random.shuffle(players)
+        game.players = players
 
     def scoreFunc(self) -> float:
-        m = Metrics(self.schedule)
+        m = Metrics.create(self.schedule)
 
         target = self.schedule.numAttempts / 10
 
-        # additional heuristics
-        calcHalfSimmetry = True
-        calcTrippleSimmetry = True
-        calcFirstLastSimmetry = True
-        factorHalf = 2.0
-        factorTripple = 3.0
-        factorFirstLast = 20.0
-
         penalty = 0.0
-        for playerId in range(self.schedule.numPlayers):
-            seats = m.calcPlayerSeatsHistogram(playerId)
-            sd = m.calcSquareDeviation(seats, target)
-            penalty += sd
-            
-            # half simmetry
-            '''if calcHalfSimmetry:
-                allSeats = sum(seats)
-                k_lo = sum(seats[0:5]) / allSeats
-                k_hi = sum(seats[5:10]) / allSeats
-                penalty_lo = (k_lo - 0.5) ** 2
-                penalty_hi = (k_hi - 0.5) ** 2
-                penalty += factorHalf * (penalty_lo + penalty_hi)
-            '''
-            # tripple simmetry
-            if calcTrippleSimmetry:
-                allSeats = sum(seats)
-                k_a = sum(seats[0:3]) / allSeats
-                k_b = sum(seats[3:7]) / allSeats
-                k_c = sum(seats[7:10]) / allSeats
-                penalty_a = (10 * k_a - 3) ** 2
-                penalty_b = (10 * k_b - 4) ** 2
-                penalty_c = (10 * k_c - 3) ** 2
-                penalty += factorTripple * (penalty_a + penalty_b + penalty_c)
-            # first and last simmetry
-            if calcFirstLastSimmetry:
-                allSeats = sum(seats)
-                k_first = seats[0] / allSeats
-                k_last = seats[-1] / allSeats
-                penalty_first = (10 * k_first - 1) ** 2
-                penalty_last = (10 * k_last - 1) ** 2
-                penalty += factorFirstLast * (penalty_first + penalty_last)
-
+        for seats in m.calcSeatsMatrix():
+            penalty += SeatsScore.penaltyPlayer(seats, target)
         return penalty
+
+
+# seats optimizer of worker process, see OptimizeSeats.optimizeParallel
+_seatsWorker = None
+_seatsWorkerInitialPlayers = None
+
+def _initSeatsWorker(schedule: Schedule, initialPlayers: array, verbose: bool, acceptance, adaptiveMoves: bool,
+                     sharedBestScore):
+    global _seatsWorker, _seatsWorkerInitialPlayers
+    _seatsWorker = OptimizeSeats(schedule, verbose, acceptance, adaptiveMoves)
+    _seatsWorker.sharedBestScore = sharedBestScore
+    _seatsWorkerInitialPlayers = initialPlayers
+
+def _optimizeSeatsRun(runIndex: int, runSeed: int, iterations: list, stop: StoppingCriteria, deadline: float):
+    '''
+    Single optimization run in worker process.
+    Returns (runIndex, score, players, stop reason), where players (schedule snapshot)
+    is None if the run didn't improve the shared best score.
+    '''
+    _seatsWorker.schedule.restore(_seatsWorkerInitialPlayers)
+    score = _seatsWorker.optimizeRun(runIndex, runSeed, iterations, stop, deadline)
+    reason = _seatsWorker.stopReason
+
+    sharedBestScore = _seatsWorker.sharedBestScore
+    with sharedBestScore.get_lock():
+        if score >= sharedBestScore.value:
+            return (runIndex, score, None, reason)
+        sharedBestScore.value = score
+    return (runIndex, score, _seatsWorker.schedule.snapshot(), reason)
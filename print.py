@@ -1,5 +1,8 @@
 from schedule import *
 from metrics import *
+from opponents_score import OpponentsScore
+from seats_score import SeatsScore
+from bounds import Bounds
 
 
 class Print:
@@ -15,7 +18,7 @@ class Print:
 
     @staticmethod
     def printOpponentsMatrix(schedule: Schedule):
-        m = Metrics(schedule)
+        m = Metrics.create(schedule)
         matrix = m.calcOpponentsMatrix()
 
         print("\n*** Opponents matrix:")
@@ -26,7 +29,7 @@ class Print:
 
     @staticmethod
     def printPairsMatrix(schedule : Schedule):
-        m = Metrics(schedule)
+        m = Metrics.create(schedule)
 
         print("\nPairs matrix:")
         for playerId in range(schedule.numPlayers):
@@ -50,7 +53,7 @@ class Print:
         print(f"{header:25s}{str}")
 
     def printMinMaxPairs(schedule : Schedule, numGames: list[int]):
-        m = Metrics(schedule)
+        m = Metrics.create(schedule)
         
         print("\n*** Min-Max opponents")
         for playerId in range(schedule.numPlayers):         
@@ -67,7 +70,7 @@ class Print:
 
     @staticmethod
     def printPairsHistogram(schedule: Schedule):
-        m = Metrics(schedule)
+        m = Metrics.create(schedule)
         allPairs = m.calcPairsHistogram()
 
         print("\nPairs histogram:")
@@ -90,16 +93,19 @@ class Print:
     def printScheduleByPlayers(schedule: Schedule):
         print("\nSchedule by players:")
         for playerId in range(schedule.numPlayers):
+            # round -> table and seat of this player
+            seats = {}
+            for gameId, roundId, seat in schedule.playerGames(playerId):
+                seats[roundId] = (gameId, seat)
+
             str = ""
             for round in schedule.rounds:
                 roundStr = f"{' *:* '}"
-                for table, gameId in enumerate(round.gameIds):
-                    game = schedule.games[gameId]
+                if round.id in seats:
+                    gameId, seat = seats[round.id]
+                    table = round.gameIds.index(gameId)
                     tableStr = chr(ord('A') + table)
-                    for seat,id in enumerate(game.players):
-                        if id == playerId:
-                            roundStr = f" {tableStr}:{(seat+1):<2d}"
-                            break
+                    roundStr = f" {tableStr}:{(seat+1):<2d}"
                 str += roundStr
 
             header = f"Player {playerId:2d}: "
@@ -107,7 +113,7 @@ class Print:
 
     @staticmethod
     def printSeatsMatrix(schedule: Schedule):
-        m = Metrics(schedule)
+        m = Metrics.create(schedule)
 
         matrix = m.calcSeatsMatrix()
         print("\n*** Seats matrix:")
@@ -133,3 +139,13 @@ class Print:
                 print(str[:-1])
             print()
 
+    @staticmethod
+    def printOptimalityGap(schedule : Schedule):
+        opponentsScore = OpponentsScore(schedule).score
+        opponentsBound = Bounds.opponentsLowerBound(schedule.configuration)
+        seatsScore = SeatsScore(schedule).score
+        seatsBound = Bounds.seatsLowerBound(schedule.configuration)
+
+        print("\n*** Optimality gap:")
+        print(f"Opponents: score={opponentsScore:10.4f}, lower bound={opponentsBound:10.4f}, gap={Bounds.gap(opponentsScore, opponentsBound):10.4f}")
+        print(f"Seats:     score={seatsScore:10.4f}, lower bound={seatsBound:10.4f}, gap={Bounds.gap(seatsScore, seatsBound):10.4f}")
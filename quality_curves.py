@@ -0,0 +1,299 @@
+'''
+Anytime quality curves: runs optimizer strategies (acceptance, moves, restarts, racing)
+under fixed seeds and a wall-clock budget and records the best score over time,
+so strategies are compared by how fast they reach a given penalty.
+
+    python quality_curves.py opponents --configs GG-2021 --budget 30 --seeds 3 --csv curves.csv
+    python quality_curves.py seats --strategies greedy annealing-adaptive --summary summary.csv
+
+Prints a summary table: median best score at 25% / 50% / 100% of the budget and median time
+to reach the target score (benchmark.TargetScores or --target) for every configuration and strategy.
+All runs are in this process, one after another, so strategies get the same single CPU.
+'''
+from configuration import Configuration
+from schedule_factory import ScheduleFactory
+from optimize_opponents import OptimizeOpponents
+from optimize_seats import OptimizeSeats
+from acceptance import SimulatedAnnealing
+from stopping import StoppingCriteria
+from instrumentation import OptimizationListener, StageStats
+from benchmark import TargetScores, allConfigurations
+
+import argparse
+import contextlib
+import csv
+import dataclasses
+import io
+import math
+import statistics
+import time
+from typing import Callable
+
+
+@dataclasses.dataclass
+class QualityCurve:
+    '''Best score over time of one run of a strategy'''
+    configuration: str
+    strategy: str
+    seed: int
+
+    # (seconds since start, best score so far), a point for every improvement
+    points: list = dataclasses.field(default_factory=list)
+
+    @property
+    def finalScore(self) -> float:
+        return self.points[-1][1] if self.points else None
+
+    def scoreAt(self, seconds: float) -> float:
+        '''Best score reached within <seconds>, None if there was no score yet'''
+        score = None
+        for pointTime, value in self.points:
+            if pointTime > seconds:
+                break
+            score = value
+        return score
+
+    def timeToTarget(self, target: float) -> float:
+        '''Seconds until score <= <target>, None if the target was not reached'''
+        for seconds, value in self.points:
+            if value <= target:
+                return seconds
+        return None
+
+
+class CurveRecorder(OptimizationListener):
+    '''Adds best scores reported by optimizer stages to <curve>, the clock starts at creation'''
+    progressInterval = 250
+
+    def __init__(self, curve: QualityCurve):
+        self.curve = curve
+        self.started = time.perf_counter()
+
+    def record(self, score: float):
+        points = self.curve.points
+        if not points or score < points[-1][1]:
+            points.append((time.perf_counter() - self.started, score))
+
+    def stageStarted(self, stats: StageStats):
+        self.record(stats.startScore)
+
+    def progress(self, stats: StageStats):
+        self.record(stats.bestScore)
+
+    def stageFinished(self, stats: StageStats):
+        self.record(stats.bestScore)
+
+
+@dataclasses.dataclass(frozen=True)
+class Strategy:
+    name: str
+
+    # run(conf, seed, stop, listener) optimizes a tournament of configuration <conf>,
+    # all stages have to report to <listener>
+    run: Callable
+
+
+def opponentsStrategies() -> list:
+    '''Variants of OptimizeOpponents; runs are long enough to be stopped by the time budget'''
+
+    def optimize(numRuns: int, numIterations: int, **options):
+        def run(conf: Configuration, seed: int, stop: StoppingCriteria, listener: OptimizationListener):
+            optimizer = OptimizeOpponents(verbose=False, listener=listener, **options)
+            optimizer.optimize(conf, numRuns, numIterations, seed=seed, stop=stop)
+        return run
+
+    def halving(conf: Configuration, seed: int, stop: StoppingCriteria, listener: OptimizationListener):
+        optimizer = OptimizeOpponents(verbose=False, listener=listener)
+        optimizer.optimizeHalving(conf, numRuns=64, minIterations=2000, seed=seed, stop=stop)
+
+    return [
+        Strategy("greedy", optimize(1, 1000 * 1000 * 1000)),
+        Strategy("restarts-5k", optimize(100 * 1000, 5 * 1000)),
+        Strategy("restarts-20k", optimize(100 * 1000, 20 * 1000)),
+        Strategy("restarts-100k", optimize(100 * 1000, 100 * 1000)),
+        Strategy("balanced-start", optimize(100 * 1000, 20 * 1000, initial=OptimizeOpponents.BALANCED)),
+        Strategy("annealing-100k", optimize(100 * 1000, 100 * 1000, acceptance=SimulatedAnnealing())),
+        Strategy("steepest-tabu", optimize(100 * 1000, 5 * 1000, steepest=True, tabuTenure=10)),
+        Strategy("halving", halving),
+    ]
+
+
+def seatsStrategies() -> list:
+    '''
+    Variants of OptimizeSeats, all start from the same balanced schedule of the configuration
+    (see ScheduleFactory.createBalancedSchedule) with sequential seating
+    '''
+
+    def optimize(numRuns: int, iterations: list, construct: bool = False, **options):
+        def run(conf: Configuration, seed: int, stop: StoppingCriteria, listener: OptimizationListener):
+            schedule = ScheduleFactory.createBalancedSchedule(conf, seed=1)
+            optimizer = OptimizeSeats(schedule, verbose=False, listener=listener, **options)
+            if construct:
+                optimizer.construct(seed)
+            optimizer.optimize(numRuns, iterations, seed=seed, stop=stop)
+        return run
+
+    def halving(conf: Configuration, seed: int, stop: StoppingCriteria, listener: OptimizationListener):
+        schedule = ScheduleFactory.createBalancedSchedule(conf, seed=1)
+        optimizer = OptimizeSeats(schedule, verbose=False, listener=listener)
+        optimizer.optimizeHalving(numRuns=64, minIterations=2000, seed=seed, stop=stop)
+
+    annealing = dict(acceptance=SimulatedAnnealing(1.0, 0.01), adaptiveMoves=True)
+    return [
+        Strategy("greedy", optimize(1, [1000 * 1000 * 1000])),
+        Strategy("restarts-5k", optimize(100 * 1000, [5 * 1000])),
+        Strategy("restarts-20k", optimize(100 * 1000, [20 * 1000])),
+        Strategy("restarts-100k", optimize(100 * 1000, [100 * 1000])),
+        Strategy("annealing-adaptive", optimize(100 * 1000, [30 * 1000, 30 * 1000], **annealing)),
+        Strategy("construct-annealing", optimize(100 * 1000, [30 * 1000, 30 * 1000], construct=True, **annealing)),
+        Strategy("halving", halving),
+    ]
+
+
+class QualityHarness:
+    '''Runs every strategy with every seed on every configuration for <budget> seconds'''
+
+    def __init__(self, strategies: list, budget: float, seeds: list):
+        self.strategies = strategies
+        self.budget = budget
+        self.seeds = seeds
+
+    def run(self, configurations: dict, log=print) -> list:
+        curves = []
+        for name, conf in configurations.items():
+            conf.validate()
+            for strategy in self.strategies:
+                for seed in self.seeds:
+                    log(f"Quality curve: {name}, {strategy.name}, seed {seed}")
+                    curves.append(self.runStrategy(name, conf, strategy, seed))
+        return curves
+
+    def runStrategy(self, name: str, conf: Configuration, strategy: Strategy, seed: int) -> QualityCurve:
+        curve = QualityCurve(name, strategy.name, seed)
+        recorder = CurveRecorder(curve)
+        with contextlib.redirect_stdout(io.StringIO()):
+            strategy.run(conf, seed, StoppingCriteria(timeBudget=self.budget), recorder)
+        return curve
+
+
+def summarize(curves: list, budget: float, targets: dict) -> list:
+    '''
+    Summary of runs of every configuration and strategy (in order of <curves>):
+    median best scores at 25%, 50% of <budget> and at the end, the best final score
+    and median time to reach the target of the configuration from <targets>
+    (a run which didn't reach it counts as infinite time, None if most runs didn't)
+    '''
+    groups = {}
+    for curve in curves:
+        groups.setdefault((curve.configuration, curve.strategy), []).append(curve)
+
+    rows = []
+    for (configuration, strategy), group in groups.items():
+        target = targets.get(configuration)
+        row = {
+            "configuration": configuration,
+            "strategy": strategy,
+            "runs": len(group),
+            "score25": statistics.median(medianScore(curve.scoreAt(budget / 4)) for curve in group),
+            "score50": statistics.median(medianScore(curve.scoreAt(budget / 2)) for curve in group),
+            "score100": statistics.median(medianScore(curve.finalScore) for curve in group),
+            "bestScore": min(medianScore(curve.finalScore) for curve in group),
+            "target": target,
+            "reached": None,
+            "timeToTarget": None,
+        }
+        if target is not None:
+            times = [curve.timeToTarget(target) for curve in group]
+            times = [math.inf if seconds is None else seconds for seconds in times]
+            row["reached"] = sum(1 for seconds in times if seconds != math.inf)
+            median = statistics.median(times)
+            row["timeToTarget"] = median if median != math.inf else None
+        rows.append(row)
+    return rows
+
+
+def medianScore(score: float) -> float:
+    '''Runs without any score yet are the worst ones'''
+    return math.inf if score is None else score
+
+
+def formatSummary(rows: list) -> str:
+    lines = [f"{'configuration':18s} {'strategy':20s} {'@25%':>10s} {'@50%':>10s} {'final':>10s} " +
+             f"{'best':>10s} {'target':>8s} {'time to target':>16s}"]
+    for row in rows:
+        if row["target"] is None:
+            target = timeToTarget = "-"
+        else:
+            target = f"{row['target']:g}"
+            seconds = "-" if row["timeToTarget"] is None else f"{row['timeToTarget']:.2f}s"
+            timeToTarget = f"{seconds} ({row['reached']}/{row['runs']})"
+        lines.append(f"{row['configuration']:18s} {row['strategy']:20s} {row['score25']:10.2f} " +
+                     f"{row['score50']:10.2f} {row['score100']:10.2f} {row['bestScore']:10.2f} " +
+                     f"{target:>8s} {timeToTarget:>16s}")
+    return "\n".join(lines)
+
+
+def saveCurves(curves: list, filename: str):
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["configuration", "strategy", "seed", "seconds", "bestScore"])
+        for curve in curves:
+            for seconds, score in curve.points:
+                writer.writerow([curve.configuration, curve.strategy, curve.seed, f"{seconds:.4f}", score])
+
+
+def saveSummary(rows: list, filename: str):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Anytime quality curves of optimizer strategies")
+    parser.add_argument("optimizer", choices=["opponents", "seats"])
+    parser.add_argument("--configs", nargs="+", metavar="NAME", help="only these configurations")
+    parser.add_argument("--strategies", nargs="+", metavar="NAME", help="only these strategies")
+    parser.add_argument("--budget", type=float, default=10, help="seconds for every run (default: 10)")
+    parser.add_argument("--seeds", type=int, default=3, help="runs of every strategy, seeds 1..N (default: 3)")
+    parser.add_argument("--target", type=float, help="target score for all configurations")
+    parser.add_argument("--csv", metavar="FILE", help="save curves as CSV")
+    parser.add_argument("--summary", metavar="FILE", help="save summary as CSV")
+    options = parser.parse_args(args)
+
+    configurations = allConfigurations()
+    if options.configs:
+        unknown = [name for name in options.configs if name not in configurations]
+        if unknown:
+            parser.error(f"unknown configurations: {', '.join(unknown)} (known: {', '.join(configurations)})")
+        configurations = {name: configurations[name] for name in options.configs}
+
+    strategies = opponentsStrategies() if options.optimizer == "opponents" else seatsStrategies()
+    if options.strategies:
+        known = [strategy.name for strategy in strategies]
+        unknown = [name for name in options.strategies if name not in known]
+        if unknown:
+            parser.error(f"unknown strategies: {', '.join(unknown)} (known: {', '.join(known)})")
+        strategies = [strategy for strategy in strategies if strategy.name in options.strategies]
+
+    index = 0 if options.optimizer == "opponents" else 1
+    if options.target is not None:
+        targets = {name: options.target for name in configurations}
+    else:
+        targets = {name: TargetScores[name][index] for name in configurations if name in TargetScores}
+
+    harness = QualityHarness(strategies, options.budget, list(range(1, options.seeds + 1)))
+    curves = harness.run(configurations)
+    rows = summarize(curves, options.budget, targets)
+    print(formatSummary(rows))
+
+    if options.csv:
+        saveCurves(curves, options.csv)
+        print(f"Curves saved: {options.csv}")
+    if options.summary:
+        saveSummary(rows, options.summary)
+        print(f"Summary saved: {options.summary}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import math
+
+from stopping import StopReason
+
+
+class SuccessiveHalving:
+    '''
+    Successive halving (racing) of optimization runs: all runs get <minIterations>
+    iterations, then the best <keep> part of them continues with <growth> times more
+    iterations, and so on until only one run is left, so most of the budget
+    goes to the most promising runs.
+
+    Runs are opaque for the scheduler: advance(run, numIterations) has to continue
+    <run> for <numIterations> iterations and return (score, StopReason).
+    '''
+
+    def __init__(self, minIterations: int, keep: float = 0.5, growth: int = 2):
+        if not 0 < keep < 1:
+            raise ValueError(f"keep must be in range (0, 1) (value: {keep})")
+        if minIterations < 1 or growth < 1:
+            raise ValueError("minIterations and growth must be >= 1")
+        self.minIterations = minIterations
+        self.keep = keep
+        self.growth = growth
+
+    def rungs(self, numRuns: int) -> list:
+        '''Returns list of (number of runs, iterations of every run) for every rung'''
+        rungs = []
+        numIterations = self.minIterations
+        while True:
+            rungs.append((numRuns, numIterations))
+            if numRuns == 1:
+                return rungs
+            numRuns = max(1, math.ceil(numRuns * self.keep))
+            numIterations *= self.growth
+
+    def totalIterations(self, numRuns: int) -> int:
+        '''Total number of iterations of all runs'''
+        return sum(runs * iterations for runs, iterations in self.rungs(numRuns))
+
+    @staticmethod
+    def forBudget(numRuns: int, totalIterations: int, keep: float = 0.5, growth: int = 2):
+        '''Creates scheduler which spends about <totalIterations> iterations on <numRuns> runs'''
+        unit = SuccessiveHalving(1, keep, growth).totalIterations(numRuns)
+        return SuccessiveHalving(max(1, totalIterations // unit), keep, growth)
+
+    def race(self, runs: list, advance) -> tuple:
+        '''
+        Races <runs>. Returns (best run, its score, StopReason).
+        Stops at once if a run stops on a final reason (see StopReason.isFinal).
+        '''
+        scores = [None] * len(runs)
+        alive = list(range(len(runs)))
+        numIterations = self.minIterations
+        rung = 0
+        reason = StopReason.ITERATIONS
+        while True:
+            print(f"\n*** Rung: {rung+1}, runs: {len(alive)}, iterations: {numIterations}")
+            for i in alive:
+                scores[i], reason = advance(runs[i], numIterations)
+                if StopReason.isFinal(reason):
+                    # runs which were not advanced in this rung still compete with their old scores
+                    best = min((i for i in range(len(runs)) if scores[i] is not None), key=lambda i: scores[i])
+                    return (runs[best], scores[best], reason)
+
+            # strict order: on equal scores the earliest run wins
+            alive.sort(key=lambda i: (scores[i], i))
+            print(f"Best score: {scores[alive[0]]:8.4f}, worst score: {scores[alive[-1]]:8.4f}")
+            if len(alive) == 1:
+                return (runs[alive[0]], scores[alive[0]], reason)
+
+            alive = alive[:max(1, math.ceil(len(alive) * self.keep))]
+            numIterations *= self.growth
+            rung += 1
@@ -1,4 +1,5 @@
 import dataclasses
+from array import array
 
 from configuration import *
 from round import *
@@ -10,7 +11,101 @@ class ScheduleException(Exception):
     pass
 
 
+class GamePlayers:
+    '''
+    List-like view of players of one game (ordered by seats),
+    stored in players array of the schedule.
+    '''
+
+    def __init__(self, schedule, index: int):
+        self._schedule = schedule
+        self._index = index
+
+    def __len__(self):
+        return 10
+
+    def __getitem__(self, seat):
+        base = 10 * self._index
+        if isinstance(seat, slice):
+            return list(self._schedule._players[base:base + 10])[seat]
+        if seat < 0:
+            seat += 10
+        if seat < 0 or seat >= 10:
+            raise IndexError("seat index out of range")
+        return self._schedule._players[base + seat]
+
+    def __setitem__(self, seat: int, playerId: int):
+        if seat < 0:
+            seat += 10
+        if seat < 0 or seat >= 10:
+            raise IndexError("seat index out of range")
+        self._schedule._setSeat(self._index, seat, playerId)
+
+    def swap(self, seatOne: int, seatTwo: int):
+        '''Swaps players of two seats, O(1)'''
+        self._schedule._swapSeats(self._index, seatOne, seatTwo)
+
+    def __iter__(self):
+        base = 10 * self._index
+        return iter(self._schedule._players[base:base + 10])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __deepcopy__(self, memo):
+        return list(self)
+
+    def copy(self) -> list[int]:
+        return list(self)
+
+    def index(self, playerId: int) -> int:
+        return list(self).index(playerId)
+
+
+class GameView(Game):
+    '''Game stored in players array of the schedule'''
+
+    def __init__(self, schedule, index: int, id: int):
+        self._schedule = schedule
+        self._index = index
+        self.id = id
+
+    @property
+    def players(self) -> GamePlayers:
+        return GamePlayers(self._schedule, self._index)
+
+    @players.setter
+    def players(self, players: list[int]):
+        self._schedule._setGamePlayers(self._index, players)
+
+
+class GameSetView(GameSet):
+    '''GameSet stored in players array of the schedule'''
+
+    def __init__(self, schedule, index: int, id: int):
+        self._schedule = schedule
+        self._index = index
+        self.id = id
+
+    @property
+    def mask(self) -> int:
+        return self._schedule._gameMask(self._index)
+
+    def swap(self, playerOut: int, playerIn: int):
+        '''Replaces <playerOut> with <playerIn> keeping his seat'''
+        self._schedule._replacePlayer(self._index, playerOut, playerIn)
+
+
 class Schedule:
+    '''
+    Schedule stores players of all games in a single array (numGames x 10, by seats)
+    plus game -> round index. Games (Game), game sets (GameSet) are views of this array,
+    so changes made by opponents and seats optimizations are always in sync.
+    Inverted index player -> (game, round, seat) is maintained on every change.
+    '''
     _configuration: Configuration
     _participants : Participants
     _rounds = list[Round]
@@ -32,6 +127,15 @@ class Schedule:
     def games(self) -> list[Game]:
         return self._games
 
+    @property
+    def slots(self) -> dict[int, GameSet]:
+        return self._slots
+
+    @property
+    def playersArray(self) -> array:
+        '''Players of all games: array of numGames x 10 player ids, ordered by seats'''
+        return self._players
+
     @property
     def numPlayers(self) -> int:
         return self._configuration.numPlayers
@@ -56,7 +160,108 @@ class Schedule:
         self._configuration = conf
         self._participants = None
         self._rounds = rounds
-        self._games = games
+
+        players = array('i')
+        for game in games:
+            if len(game.players) != 10:
+                raise ScheduleException(
+                    f"Game: {game.id} must have 10 players, got: {len(game.players)}")
+            players.extend(game.players)
+        self._build(players, [game.id for game in games])
+
+    def _build(self, players: array, gameIds: list[int]):
+        self._players = players
+        self._gameIds = gameIds
+        self._masks = [None] * len(gameIds)
+        self._index = None
+
+        index = {id: i for i, id in enumerate(gameIds)}
+        self._gameRound = [None] * len(gameIds)
+        for round in self._rounds:
+            for gameId in round.gameIds:
+                if gameId in index:
+                    self._gameRound[index[gameId]] = round.id
+
+        self._games = [GameView(self, i, id) for i, id in enumerate(gameIds)]
+        self._slots = {id: GameSetView(self, i, id) for i, id in enumerate(gameIds)}
+
+    def __getstate__(self):
+        return (self._configuration, self._participants, self._rounds, self._players, self._gameIds)
+
+    def __setstate__(self, state):
+        self._configuration, self._participants, self._rounds, players, gameIds = state
+        self._build(players, gameIds)
+
+    def _playerIndex(self) -> dict[int, dict[int, int]]:
+        '''Inverted index: playerId -> {game index: seat}'''
+        if self._index is None:
+            index = {}
+            for i, playerId in enumerate(self._players):
+                index.setdefault(playerId, {})[i // 10] = i % 10
+            self._index = index
+        return self._index
+
+    def playerGames(self, playerId: int) -> list[tuple[int, int, int]]:
+        '''Returns list of (gameId, roundId, seat) for all games of player <playerId>'''
+        games = self._playerIndex().get(playerId, {})
+        return [(self._gameIds[i], self._gameRound[i], seat) for i, seat in sorted(games.items())]
+
+    def playerGamesCount(self, playerId: int) -> int:
+        '''Returns number of games of player <playerId>'''
+        return len(self._playerIndex().get(playerId, {}))
+
+    def roundOfGame(self, gameId: int) -> int:
+        '''Returns id of round for game <gameId>'''
+        return self._gameRound[self._gameIds.index(gameId)]
+
+    def _gameMask(self, index: int) -> int:
+        mask = self._masks[index]
+        if mask is None:
+            base = 10 * index
+            mask = playersMask(self._players[base:base + 10])
+            self._masks[index] = mask
+        return mask
+
+    def _setSeat(self, index: int, seat: int, playerId: int):
+        # game may have duplicates in the middle of seats shuffling,
+        # so just rebuild index and mask when they are needed
+        self._players[10 * index + seat] = playerId
+        self._masks[index] = None
+        self._index = None
+
+    def _swapSeats(self, index: int, seatOne: int, seatTwo: int):
+        # players of the game don't change, so the mask is kept
+        one = 10 * index + seatOne
+        two = 10 * index + seatTwo
+        playerOne, playerTwo = self._players[one], self._players[two]
+        self._players[one], self._players[two] = playerTwo, playerOne
+        if self._index is not None:
+            self._index[playerOne][index] = seatTwo
+            self._index[playerTwo][index] = seatOne
+
+    def _setGamePlayers(self, index: int, players: list[int]):
+        if len(players) != 10:
+            raise ScheduleException(
+                f"Game: {self._gameIds[index]} must have 10 players, got: {len(players)}")
+        base = 10 * index
+        if self._index is not None:
+            for playerId in self._players[base:base + 10]:
+                self._index[playerId].pop(index, None)
+            for seat, playerId in enumerate(players):
+                self._index.setdefault(playerId, {})[index] = seat
+        self._players[base:base + 10] = array('i', players)
+        self._masks[index] = None
+
+    def _replacePlayer(self, index: int, playerOut: int, playerIn: int):
+        playerIndex = self._playerIndex()
+        seat = playerIndex.get(playerOut, {}).pop(index, None)
+        if seat is None:
+            raise ScheduleException(f"Player: {playerOut} does not play game: {self._gameIds[index]}")
+        playerIndex.setdefault(playerIn, {})[index] = seat
+
+        self._players[10 * index + seat] = playerIn
+        if self._masks[index] is not None:
+            self._masks[index] ^= (1 << playerOut) | (1 << playerIn)
 
     def setParticipants(self, people : Participants):
         self._participants = people
@@ -76,20 +281,30 @@ class Schedule:
         return Schedule(conf, rounds, games)
 
     def generateSlotsFromGames(self):
-        self.slots = {}
-        for game in self.games:
-            self.slots[game.id] = GameSet.create(game)
+        '''Kept for compatibility: games and slots are views of the same players array'''
+        pass
 
     def updateGamesFromSlots(self):
-        for slotId in self.slots:
-            self.games[slotId] = Game.create(self.slots[slotId])
-        # Careful. Now we have both games and slots and they may not match each other...
-        # self.slots = {}
+        '''Kept for compatibility: games and slots are views of the same players array'''
+        pass
+
+    def snapshot(self) -> array:
+        '''Saves players of all games (copy of players array)'''
+        return array('i', self._players)
+
+    def restore(self, snapshot: array):
+        '''Loads players of all games from a snapshot'''
+        if len(snapshot) != len(self._players):
+            raise ScheduleException(
+                f"Snapshot size: {len(snapshot)} must match schedule: {len(self._players)}")
+        self._players[:] = snapshot
+        self._masks = [None] * len(self._gameIds)
+        self._index = None
 
     def saveGamePlayers(self) -> dict[int, list[int]]:
         '''
         Saves players of all games to dictionary.
-        This function is used by multi-run seats optimization.
+        Prefer snapshot(), which is a single array copy.
         '''
         gamePlayers = {}
         for game in self.games:
@@ -99,7 +314,7 @@ class Schedule:
     def updateGamePlayers(self, gamePlayers : dict[int, list[int]]):
         '''
         Loads game players from external dictionary.
-        This function is used by multi-run seats optimization.
+        Prefer restore(), which is a single array copy.
         '''
         for game in self.games:
             if game.id not in gamePlayers.keys():
@@ -159,12 +374,16 @@ class Schedule:
             raise ScheduleException(
                 f"Some games are not in any round: {leftIds}")
 
+        # all players of a game must be unique
+        for game in self._games:
+            if len(set(game.players)) != 10:
+                raise ScheduleException(
+                    f"Game: {game.id} has duplicate players")
+
         # calc number of games played by every player
         gamesPlayed = {}
-        for game in self._games:
-            for playerId in game.players:
-                num = 1 + gamesPlayed.get(playerId, 0)
-                gamesPlayed[playerId] = num
+        for playerId in self._playerIndex():
+            gamesPlayed[playerId] = self.playerGamesCount(playerId)
 
         # all players must play the same number of attempts
         counts = gamesPlayed.values()
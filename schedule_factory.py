@@ -5,6 +5,8 @@ from round import *
 from game import *
 from player import *
 
+import random
+
 class ScheduleFactory:
     def createInitialSchedule(conf: Configuration):
         if not conf.isValid():
@@ -40,3 +42,83 @@ class ScheduleFactory:
 
         schedule = Schedule(conf, rounds, games)
         return schedule
+
+    @staticmethod
+    def createBalancedSchedule(conf: Configuration, seed: int = None):
+        '''
+        Greedy pair-balancing schedule: every round takes players with the most
+        games left (so everyone plays exactly <numAttempts> games), then tables
+        are filled seat by seat with the player who has met the table the least.
+        Starts much closer to the ideal pairs histogram than the sequential
+        schedule of createInitialSchedule. Ties are broken at random with <seed>.
+        '''
+        if not conf.isValid():
+            return None
+
+        rng = random.Random(seed)
+        remaining = [conf.numAttempts] * conf.numPlayers
+        meetings = [[0] * conf.numPlayers for _ in range(conf.numPlayers)]
+
+        rounds = []
+        games = []
+        gameId = 0
+        for roundNum in range(conf.numRounds):
+            numGames = min(conf.numTables, conf.numGames - gameId)
+
+            # players of round: most games left first, random order among equals
+            order = list(range(conf.numPlayers))
+            rng.shuffle(order)
+            order.sort(key=lambda playerId: -remaining[playerId])
+            pool = order[:10 * numGames]
+
+            # snake order of tables, so no table always picks first
+            tables = [[] for _ in range(numGames)]
+            for seat in range(10):
+                for table in (tables if seat % 2 == 0 else reversed(tables)):
+                    playerId = min(pool, key=lambda p: sum(meetings[p][q] for q in table))
+                    pool.remove(playerId)
+                    table.append(playerId)
+
+            ScheduleFactory._balanceTables(tables, meetings)
+
+            gamesInRound = []
+            for table in tables:
+                for playerId in table:
+                    remaining[playerId] -= 1
+                games.append(Game(gameId, table))
+                gamesInRound.append(gameId)
+                gameId = gameId + 1
+
+            rounds.append(Round(roundNum, gamesInRound))
+
+        return Schedule(conf, rounds, games)
+
+    @staticmethod
+    def _balanceTables(tables: list, meetings: list):
+        '''
+        Swaps players between <tables> of one round while it lowers the sum of
+        meetings at tables, then adds meetings of the round to <meetings>.
+        '''
+        def cost(playerId: int, table: list, skip: int) -> int:
+            return sum(meetings[playerId][q] for q in table if q != skip)
+
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(tables)):
+                for j in range(i + 1, len(tables)):
+                    one, two = tables[i], tables[j]
+                    for a in range(10):
+                        for b in range(10):
+                            playerA, playerB = one[a], two[b]
+                            delta = (cost(playerA, two, playerB) + cost(playerB, one, playerA)
+                                     - cost(playerA, one, playerA) - cost(playerB, two, playerB))
+                            if delta < 0:
+                                one[a], two[b] = playerB, playerA
+                                improved = True
+
+        for table in tables:
+            for p in table:
+                for q in table:
+                    if p != q:
+                        meetings[p][q] += 1
@@ -0,0 +1,81 @@
+from array import array
+import random
+
+from schedule import Schedule
+
+
+class SeatsConstruction:
+    '''
+    Constructive seating: seats are colors of the bipartite graph
+    "player's block of up to 10 games" - "game" (players keep their games).
+    Every block meets every game once and both have at most 10 edges,
+    so by Konig's theorem the edges can be colored with 10 colors (seats):
+    a player never sits at the same seat twice within a block.
+    With <numAttempts> multiple of 10 every player gets every seat exactly
+    numAttempts / 10 times (zero seats penalty); otherwise seats of every player
+    differ by at most one, and a short optimization polishes the rest.
+    This is a generalization of Latin square rotations to arbitrary schedules.
+    '''
+
+    @staticmethod
+    def balancedSeating(schedule: Schedule, seed: int = None) -> array:
+        '''Returns balanced seating of <schedule> as a schedule snapshot (doesn't change <schedule>)'''
+        rng = random.Random(seed)
+
+        # split games of every player in blocks of 10 in order of rounds
+        edges = []
+        numBlocks = 0
+        for playerId in range(schedule.numPlayers):
+            gameIndices = sorted(index for index, game in enumerate(schedule.games) if playerId in game.players)
+            for start in range(0, len(gameIndices), 10):
+                for index in gameIndices[start:start + 10]:
+                    edges.append((numBlocks, index, playerId))
+                numBlocks += 1
+        rng.shuffle(edges)
+
+        # color -> game index for every block, color -> block for every game
+        blockSeats = [[None] * 10 for _ in range(numBlocks)]
+        gameSeats = [[None] * 10 for _ in range(len(schedule.games))]
+        for block, index, playerId in edges:
+            seatBlock = blockSeats[block].index(None)
+            seatGame = gameSeats[index].index(None)
+            if gameSeats[index][seatBlock] is not None:
+                SeatsConstruction._flipPath(blockSeats, gameSeats, index, seatBlock, seatGame)
+            blockSeats[block][seatBlock] = index
+            gameSeats[index][seatBlock] = block
+
+        blockPlayers = {block: playerId for block, _, playerId in edges}
+        players = array('i', schedule.playersArray)
+        for index, seats in enumerate(gameSeats):
+            for seat, block in enumerate(seats):
+                players[10 * index + seat] = blockPlayers[block]
+        return players
+
+    @staticmethod
+    def _flipPath(blockSeats: list, gameSeats: list, index: int, one: int, two: int):
+        '''
+        Swaps colors <one> and <two> on the alternating path starting from game <index>
+        with color <one>, so color <one> becomes free at the game.
+        In bipartite graph the path never comes back to the block which needs color <one>.
+        '''
+        path = []
+        game = index
+        color, other = one, two
+        while True:
+            block = gameSeats[game][color]
+            if block is None:
+                break
+            path.append((block, game, color))
+            nextGame = blockSeats[block][other]
+            if nextGame is None:
+                break
+            path.append((block, nextGame, other))
+            game = nextGame
+
+        for block, game, color in path:
+            blockSeats[block][color] = None
+            gameSeats[game][color] = None
+        for block, game, color in path:
+            flipped = two if color == one else one
+            blockSeats[block][flipped] = game
+            gameSeats[game][flipped] = block
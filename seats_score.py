@@ -0,0 +1,106 @@
+from schedule import Schedule
+
+
+class SeatsScore:
+    '''
+    Incremental version of OptimizeSeats.scoreFunc.
+
+    Keeps seats histogram (players x 10 matrix) and penalty for every player,
+    so a change of seats in one game is scored by recalculating
+    penalties of players of this game only.
+    '''
+
+    # additional heuristics
+    calcHalfSimmetry = False
+    calcTrippleSimmetry = True
+    calcFirstLastSimmetry = True
+    factorHalf = 2.0
+    factorTripple = 3.0
+    factorFirstLast = 20.0
+
+    def __init__(self, schedule: Schedule):
+        self.target = schedule.numAttempts / 10
+
+        self.seats = [[0] * 10 for _ in range(schedule.numPlayers)]
+        for i, playerId in enumerate(schedule.playersArray):
+            self.seats[playerId][i % 10] += 1
+
+        self.penalties = [SeatsScore.penaltyPlayer(seats, self.target) for seats in self.seats]
+        self.score = sum(self.penalties)
+
+    @staticmethod
+    def penaltyPlayer(seats: list, target: float) -> float:
+        '''Seats penalty of single player with given seats histogram'''
+        # square deviation, same as Metrics.calcSquareDeviation
+        sd = 0.0
+        for i in range(len(seats)):
+            sd += (seats[i] - target) * (seats[i] - target)
+        penalty = sd / len(seats)
+
+        # half simmetry
+        if SeatsScore.calcHalfSimmetry:
+            allSeats = sum(seats)
+            k_lo = sum(seats[0:5]) / allSeats
+            k_hi = sum(seats[5:10]) / allSeats
+            penalty_lo = (k_lo - 0.5) ** 2
+            penalty_hi = (k_hi - 0.5) ** 2
+            penalty += SeatsScore.factorHalf * (penalty_lo + penalty_hi)
+
+        # tripple simmetry
+        if SeatsScore.calcTrippleSimmetry:
+            allSeats = sum(seats)
+            k_a = sum(seats[0:3]) / allSeats
+            k_b = sum(seats[3:7]) / allSeats
+            k_c = sum(seats[7:10]) / allSeats
+            penalty_a = (10 * k_a - 3) ** 2
+            penalty_b = (10 * k_b - 4) ** 2
+            penalty_c = (10 * k_c - 3) ** 2
+            penalty += SeatsScore.factorTripple * (penalty_a + penalty_b + penalty_c)
+
+        # first and last simmetry
+        if SeatsScore.calcFirstLastSimmetry:
+            allSeats = sum(seats)
+            k_first = seats[0] / allSeats
+            k_last = seats[-1] / allSeats
+            penalty_first = (10 * k_first - 1) ** 2
+            penalty_last = (10 * k_last - 1) ** 2
+            penalty += SeatsScore.factorFirstLast * (penalty_first + penalty_last)
+
+        return penalty
+
+    def changedSeats(self, oldPlayers: list, newPlayers: list) -> dict:
+        '''
+        Calculates new seats histograms of players affected by
+        change of game players from <oldPlayers> to <newPlayers>.
+        Returns dictionary <playerId>:<seats>
+        '''
+        changed = {}
+        for seat in range(len(oldPlayers)):
+            oldId = oldPlayers[seat]
+            newId = newPlayers[seat]
+            if oldId == newId:
+                continue
+            if oldId not in changed:
+                changed[oldId] = list(self.seats[oldId])
+            if newId not in changed:
+                changed[newId] = list(self.seats[newId])
+            changed[oldId][seat] -= 1
+            changed[newId][seat] += 1
+        return changed
+
+    def changeDelta(self, oldPlayers: list, newPlayers: list) -> float:
+        '''
+        Calculates score change if players of a game are changed
+        from <oldPlayers> to <newPlayers>. Doesn't change anything.
+        '''
+        delta = 0.0
+        for playerId, seats in self.changedSeats(oldPlayers, newPlayers).items():
+            delta += SeatsScore.penaltyPlayer(seats, self.target) - self.penalties[playerId]
+        return delta
+
+    def applyChange(self, oldPlayers: list, newPlayers: list):
+        '''Updates seats histograms and score after game players are changed'''
+        for playerId, seats in self.changedSeats(oldPlayers, newPlayers).items():
+            self.seats[playerId] = seats
+            self.penalties[playerId] = SeatsScore.penaltyPlayer(seats, self.target)
+        self.score = sum(self.penalties)
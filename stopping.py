@@ -0,0 +1,73 @@
+import dataclasses
+import time
+
+from bounds import Bounds
+
+
+class StopReason:
+    '''Reasons why optimization stage has stopped'''
+    ITERATIONS = "iterations"
+    TIME_BUDGET = "time budget"
+    NO_IMPROVEMENT = "no improvement"
+    TARGET_SCORE = "target score"
+    LOWER_BOUND = "lower bound"
+
+    @staticmethod
+    def isFinal(reason: str) -> bool:
+        '''Checks if there is no reason to start other runs after a run stopped by <reason>'''
+        return reason in (StopReason.TIME_BUDGET, StopReason.TARGET_SCORE, StopReason.LOWER_BOUND)
+
+
+@dataclasses.dataclass(frozen=True)
+class StoppingCriteria:
+    '''
+    Stopping criteria for optimizers (in addition to fixed number of iterations).
+    None means the criterion is not used.
+    '''
+
+    # wall-clock budget for the whole optimization, seconds
+    timeBudget: float = None
+
+    # stop a stage after this number of iterations without improvement
+    maxStallIterations: int = None
+
+    # stop as soon as score is less or equal to target
+    targetScore: float = None
+
+    # how often (in iterations) the clock is checked
+    timeCheckInterval: int = 256
+
+    def deadline(self) -> float:
+        '''
+        Absolute deadline (time.time() based, so it can be passed to worker processes)
+        or None if there is no time budget
+        '''
+        if self.timeBudget is None:
+            return None
+        return time.time() + self.timeBudget
+
+
+class StoppingState:
+    '''Tracks one optimization stage against StoppingCriteria'''
+
+    def __init__(self, criteria: StoppingCriteria, deadline: float, lowerBound: float = None):
+        self.criteria = criteria if criteria is not None else StoppingCriteria()
+        self.deadline = deadline
+        self.lowerBound = lowerBound
+        self.lastImprovement = 0
+
+    def improved(self, iteration: int):
+        self.lastImprovement = iteration
+
+    def check(self, iteration: int, score: float) -> str:
+        '''Returns StopReason if the stage has to stop before <iteration>, None otherwise'''
+        criteria = self.criteria
+        if self.lowerBound is not None and Bounds.reached(score, self.lowerBound):
+            return StopReason.LOWER_BOUND
+        if criteria.targetScore is not None and score <= criteria.targetScore:
+            return StopReason.TARGET_SCORE
+        if criteria.maxStallIterations is not None and iteration - self.lastImprovement >= criteria.maxStallIterations:
+            return StopReason.NO_IMPROVEMENT
+        if self.deadline is not None and iteration % criteria.timeCheckInterval == 0 and time.time() >= self.deadline:
+            return StopReason.TIME_BUDGET
+        return None
@@ -0,0 +1,262 @@
+from array import array
+import dataclasses
+import math
+import multiprocessing
+import random
+import threading
+
+from configuration import Configuration
+from schedule_factory import ScheduleFactory
+from optimize_opponents import OptimizeOpponents
+from acceptance import Metropolis
+from helpers import runSeeds
+from stopping import StoppingCriteria, StoppingState, StopReason
+from bounds import Bounds
+
+
+class ReplicaStore:
+    '''
+    Current and best schedules and scores of all replicas in shared memory,
+    so worker processes and coordinator see the same replicas.
+    '''
+
+    def __init__(self, numReplicas: int, size: int):
+        self.numReplicas = numReplicas
+        self.size = size
+        self.players = multiprocessing.RawArray('i', 2 * numReplicas * size)
+        self.scores = multiprocessing.RawArray('d', numReplicas)
+        self.bestScores = multiprocessing.RawArray('d', numReplicas)
+
+        # replica's schedule was exchanged, so its worker has to reload it
+        self.reload = multiprocessing.RawArray('b', numReplicas)
+        self.stop = multiprocessing.RawValue('b', 0)
+
+        # iterations of the next segment, the last one may be shorter than exchange interval
+        self.segmentLength = multiprocessing.RawValue('i', 0)
+
+    def _offset(self, replica: int, best: bool) -> int:
+        return (replica + best * self.numReplicas) * self.size
+
+    def load(self, replica: int, best: bool = False) -> array:
+        offset = self._offset(replica, best)
+        return array('i', self.players[offset:offset + self.size])
+
+    def save(self, replica: int, players: array, best: bool = False):
+        offset = self._offset(replica, best)
+        self.players[offset:offset + self.size] = players
+
+    def exchange(self, one: int, two: int):
+        '''Swaps current schedules of replicas <one> and <two>'''
+        playersOne = self.load(one)
+        self.save(one, self.load(two))
+        self.save(two, playersOne)
+        self.scores[one], self.scores[two] = self.scores[two], self.scores[one]
+        self.reload[one] = 1
+        self.reload[two] = 1
+
+
+class Island:
+    '''Replicas of one worker process: every replica is an OptimizeOpponents run at its own temperature'''
+
+    def __init__(self, conf: Configuration, temperatures: list, replicas: list, seeds: list,
+                 steepest: bool, tabuTenure: int, initial: str, store: ReplicaStore):
+        self.replicas = replicas
+        self.store = store
+        self.optimizers = {}
+        for replica in replicas:
+            optimizer = OptimizeOpponents(False, Metropolis(temperatures[replica]), steepest, tabuTenure,
+                                          initial=initial)
+            optimizer.startRun(conf, seeds[replica])
+            self.optimizers[replica] = optimizer
+            store.save(replica, optimizer.schedule.snapshot())
+            store.save(replica, optimizer.schedule.snapshot(), best=True)
+            store.scores[replica] = optimizer.score
+            store.bestScores[replica] = optimizer.score
+
+    def runSegment(self, numIterations: int):
+        '''Runs <numIterations> iterations of every replica and publishes results'''
+        store = self.store
+        for replica in self.replicas:
+            optimizer = self.optimizers[replica]
+            if store.reload[replica]:
+                optimizer.loadPlayers(store.load(replica))
+                store.reload[replica] = 0
+
+            bestScore = store.bestScores[replica]
+            bestPlayers = None
+            for _ in range(numIterations):
+                optimizer.iteration += 1
+                if optimizer.randomOpponentChange() and optimizer.score < bestScore:
+                    bestScore = optimizer.score
+                    bestPlayers = optimizer.schedule.snapshot()
+            optimizer.stageBestScore = min(optimizer.stageBestScore, bestScore)
+
+            store.save(replica, optimizer.schedule.snapshot())
+            store.scores[replica] = optimizer.score
+            if bestPlayers is not None:
+                store.save(replica, bestPlayers, best=True)
+                store.bestScores[replica] = bestScore
+
+
+class ParallelTempering:
+    '''
+    Parallel tempering (replica exchange) for OptimizeOpponents.
+
+    Every replica is a random walk at constant temperature (Metropolis acceptance),
+    <temperatures> are sorted from the coldest to the hottest one.
+    Replicas are split between <jobs> worker processes (islands).
+    After every <exchangeInterval> iterations all workers stop at a barrier
+    and coordinator exchanges schedules of neighbour temperatures with probability
+    min(1, exp((1/T_cold - 1/T_hot) * (score_cold - score_hot))),
+    so good schedules found by hot replicas move to cold ones.
+    Schedules are exchanged in shared memory, results don't depend on <jobs>.
+    '''
+
+    def __init__(self, conf: Configuration, temperatures: list, exchangeInterval: int = 1000,
+                 steepest: bool = False, tabuTenure: int = 0, initial: str = OptimizeOpponents.SEQUENTIAL):
+        if len(temperatures) < 2:
+            raise ValueError("Parallel tempering needs at least 2 temperatures")
+        self.conf = conf
+        self.temperatures = sorted(temperatures)
+        self.exchangeInterval = exchangeInterval
+        self.steepest = steepest
+        self.tabuTenure = tabuTenure
+        self.initial = initial
+
+    @staticmethod
+    def geometricTemperatures(minTemperature: float, maxTemperature: float, numReplicas: int) -> list:
+        ratio = (maxTemperature / minTemperature) ** (1 / (numReplicas - 1))
+        return [minTemperature * ratio ** i for i in range(numReplicas)]
+
+    def optimize(self, numIterations: int, jobs: int = 1, seed: int = None, stop: StoppingCriteria = None):
+        '''
+        Runs up to <numIterations> iterations of every replica.
+        Returns (score, schedule, stop reason) of the best schedule found by any replica.
+        '''
+        numReplicas = len(self.temperatures)
+        jobs = max(1, min(jobs, numReplicas))
+        seeds = runSeeds(seed, numReplicas + 1)
+        self.random = random.Random(seeds[-1])
+        self.attempts = [0] * (numReplicas - 1)
+        self.exchanges = [0] * (numReplicas - 1)
+
+        schedule = ScheduleFactory.createInitialSchedule(self.conf)
+        store = ReplicaStore(numReplicas, len(schedule.playersArray))
+        islands = [list(range(numReplicas))[job::jobs] for job in range(jobs)]
+        if jobs == 1:
+            island = Island(self.conf, self.temperatures, islands[0], seeds, self.steepest, self.tabuTenure,
+                            self.initial, store)
+            reason = self.coordinate(store, numIterations, stop, island.runSegment)
+        else:
+            reason = self.optimizeParallel(store, islands, seeds, numIterations, stop)
+
+        best = min(range(numReplicas), key=lambda replica: store.bestScores[replica])
+        schedule.restore(store.load(best, best=True))
+        score = store.bestScores[best]
+
+        for i in range(numReplicas - 1):
+            print(f"Exchanges T: {self.temperatures[i]:7.3f} <-> {self.temperatures[i+1]:7.3f}: " +
+                  f"{self.exchanges[i]} of {self.attempts[i]}")
+        return (score, schedule, reason)
+
+    def optimizeParallel(self, store: ReplicaStore, islands: list, seeds: list, numIterations: int,
+                         stop: StoppingCriteria) -> str:
+        # every segment workers and coordinator meet twice: before and after iterations
+        barrier = multiprocessing.Barrier(len(islands) + 1)
+        workers = []
+        for replicas in islands:
+            worker = multiprocessing.Process(target=_temperingWorker,
+                args=(self.conf, self.temperatures, replicas, seeds, self.steepest, self.tabuTenure,
+                      self.initial, store, barrier))
+            worker.start()
+            workers.append(worker)
+
+        def runSegment(length: int):
+            store.segmentLength.value = length
+            barrier.wait()
+            barrier.wait()
+
+        # a worker killed by a signal can't abort the barrier itself, so the coordinator would wait forever
+        done = threading.Event()
+
+        def watch():
+            while not done.wait(0.5):
+                if any(not worker.is_alive() for worker in workers):
+                    barrier.abort()
+                    return
+
+        watchdog = threading.Thread(target=watch, name="tempering watchdog", daemon=True)
+        watchdog.start()
+        try:
+            barrier.wait()  # islands are created
+            reason = self.coordinate(store, numIterations, stop, runSegment)
+            store.stop.value = 1
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError("Parallel tempering worker has failed")
+        finally:
+            done.set()
+            watchdog.join()
+            barrier.abort()
+            for worker in workers:
+                worker.join()
+        return reason
+
+    def coordinate(self, store: ReplicaStore, numIterations: int, stop: StoppingCriteria, runSegment) -> str:
+        '''
+        Runs segments and exchanges replicas until a stopping criterion is met. Returns StopReason.
+        <runSegment>(length) runs <length> iterations of every replica.
+        '''
+        # criteria are checked once per segment, so the clock has to be checked every time
+        criteria = dataclasses.replace(stop if stop else StoppingCriteria(), timeCheckInterval=1)
+        state = StoppingState(criteria, criteria.deadline(), Bounds.opponentsLowerBound(self.conf))
+        bestScore = min(store.bestScores)
+
+        segment = 0
+        iteration = 0
+        while iteration < numIterations:
+            reason = state.check(iteration, bestScore)
+            if reason:
+                return reason
+
+            length = min(self.exchangeInterval, numIterations - iteration)
+            runSegment(length)
+            iteration += length
+            self.exchangeReplicas(store, segment % 2)
+            segment += 1
+
+            if min(store.bestScores) < bestScore:
+                bestScore = min(store.bestScores)
+                state.improved(iteration)
+            print(f"Iteration: {iteration:8d} of {numIterations}, best score: {bestScore:8.4f}, " +
+                  "scores: " + " ".join(f"{score:.1f}" for score in store.scores))
+
+        return state.check(iteration, bestScore) or StopReason.ITERATIONS
+
+    def exchangeReplicas(self, store: ReplicaStore, first: int):
+        '''Tries to exchange replicas of neighbour temperatures, starting from pair <first>'''
+        for i in range(first, len(self.temperatures) - 1, 2):
+            self.attempts[i] += 1
+            delta = (1 / self.temperatures[i] - 1 / self.temperatures[i+1]) * (store.scores[i] - store.scores[i+1])
+            if delta >= 0 or self.random.random() < math.exp(delta):
+                store.exchange(i, i + 1)
+                self.exchanges[i] += 1
+
+
+def _temperingWorker(conf: Configuration, temperatures: list, replicas: list, seeds: list,
+                     steepest: bool, tabuTenure: int, initial: str, store: ReplicaStore, barrier):
+    '''Island of replicas in worker process, see ParallelTempering.optimizeParallel'''
+    try:
+        island = Island(conf, temperatures, replicas, seeds, steepest, tabuTenure, initial, store)
+        barrier.wait()
+        while True:
+            barrier.wait()  # coordinator lets islands run the next segment or stop
+            if store.stop.value:
+                break
+            island.runSegment(store.segmentLength.value)
+            barrier.wait()  # segment is done
+    except threading.BrokenBarrierError:
+        pass
+    except BaseException:
+        barrier.abort()
+        raise
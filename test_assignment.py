@@ -0,0 +1,28 @@
+import itertools
+import random
+import unittest
+
+from assignment import *
+
+
+class TestAssignment(unittest.TestCase):
+    def bruteForce(self, cost: list) -> float:
+        n = len(cost)
+        return min(sum(cost[i][p[i]] for i in range(n)) for p in itertools.permutations(range(n)))
+
+    def test_random(self):
+        rng = random.Random(5)
+        for n in range(1, 7):
+            for _ in range(20):
+                cost = [[rng.choice([rng.randint(0, 9), rng.random() * 10]) for _ in range(n)] for _ in range(n)]
+                result = solveAssignment(cost)
+                self.assertEqual(sorted(result), list(range(n)))
+                self.assertAlmostEqual(sum(cost[i][result[i]] for i in range(n)), self.bruteForce(cost))
+
+    def test_diagonal(self):
+        cost = [[0 if i == (j + 3) % 10 else 1 for j in range(10)] for i in range(10)]
+        self.assertEqual(solveAssignment(cost), [(i - 3) % 10 for i in range(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
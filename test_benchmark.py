@@ -0,0 +1,65 @@
+import unittest
+
+from benchmark import *
+
+
+class TestBenchmark(unittest.TestCase):
+    baseline = {"results": {
+        "A": {"opponentsScoreSeconds": 0.001, "opponentsIterationsPerSecond": 10000,
+              "opponentsTargetIterations": 500, "seatsTargetIterations": None},
+        "B": {"seatsScoreSeconds": 0.002},
+    }}
+
+    def test_configurations(self):
+        configurations = allConfigurations()
+        self.assertIn("GG-2021", configurations)
+        for name, conf in configurations.items():
+            self.assertTrue(conf.isValid(), name)
+            self.assertIn(name, TargetScores)
+
+    def test_higherIsBetter(self):
+        self.assertTrue(higherIsBetter("seatsIterationsPerSecond"))
+        self.assertFalse(higherIsBetter("seatsScoreSeconds"))
+        self.assertFalse(higherIsBetter("seatsTargetIterations"))
+
+    def test_compareWithinTolerance(self):
+        current = {"results": {
+            "A": {"opponentsScoreSeconds": 0.00105, "opponentsIterationsPerSecond": 9500,
+                  "opponentsTargetIterations": 400, "seatsTargetIterations": None},
+        }}
+        self.assertEqual(Benchmark.compare(self.baseline, current, tolerance=0.1), [])
+
+    def test_compareRegressions(self):
+        current = {"results": {
+            "A": {"opponentsScoreSeconds": 0.002, "opponentsIterationsPerSecond": 5000,
+                  "opponentsTargetIterations": None, "seatsTargetIterations": 100},
+            "B": {"seatsScoreSeconds": 0.001},
+        }}
+        regressions = Benchmark.compare(self.baseline, current, tolerance=0.1)
+        self.assertEqual(regressions, [
+            ("A", "opponentsScoreSeconds", 0.001, 0.002),
+            ("A", "opponentsIterationsPerSecond", 10000, 5000),
+            ("A", "opponentsTargetIterations", 500, None),
+        ])
+
+    def test_run(self):
+        conf = allConfigurations()["MiniTournament12"]
+        benchmark = Benchmark(iterations=200, repeat=1, maxTargetIterations=5000)
+        result = benchmark.run({"MiniTournament12": conf}, log=lambda *args: None)
+
+        results = result["results"]["MiniTournament12"]
+        for metric in ["metricsPenaltySeconds", "metricsSeatsSeconds", "opponentsScoreSeconds",
+                       "seatsScoreSeconds", "opponentsIterationsPerSecond", "seatsIterationsPerSecond",
+                       "opponentsTargetSeconds", "seatsTargetSeconds"]:
+            self.assertGreater(results[metric], 0, metric)
+        self.assertGreater(results["opponentsTargetIterations"], 0)
+        self.assertGreater(results["seatsTargetIterations"], 0)
+        self.assertIn("python", result["environment"])
+
+        # the same seed gives the same iterations, so a benchmark is no regression of itself
+        self.assertEqual(Benchmark.compare(result, result), [])
+        self.assertIn("opponentsScoreSeconds", Benchmark.describe(result, result))
+
+
+if __name__ == '__main__':
+    unittest.main()
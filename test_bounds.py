@@ -0,0 +1,40 @@
+import random
+import unittest
+
+from bounds import *
+from optimize_opponents import *
+from optimize_seats import *
+
+
+class TestBounds(unittest.TestCase):
+    confs = [
+        Configuration(numPlayers=25, numTables=2, numRounds=10, numGames=20, numAttempts=8),
+        Configuration(numPlayers=12, numTables=1, numRounds=12, numGames=12, numAttempts=10),
+        Configuration(numPlayers=36, numTables=3, numRounds=12, numGames=36, numAttempts=10),
+    ]
+
+    def test_bounds_notGreaterThanScores(self):
+        for conf in self.confs:
+            opponents = OptimizeOpponents(verbose=False)
+            s = opponents.optimize(conf, numRuns=1, numIterations=2000, seed=1)
+            self.assertLessEqual(Bounds.opponentsLowerBound(conf), opponents.bestScore)
+
+            seats = OptimizeSeats(s, verbose=False)
+            seats.optimize(numRuns=1, iterations=[2000], seed=1)
+            self.assertLessEqual(Bounds.seatsLowerBound(conf), seats.bestScore)
+
+    def test_bounds_balancedSeats(self):
+        # every seat exactly once: no seats penalty at all
+        conf = Configuration(numPlayers=10, numTables=1, numRounds=10, numGames=10, numAttempts=10)
+        self.assertEqual(Bounds.seatsLowerBound(conf), 0.0)
+
+    def test_bounds_stopOnLowerBound(self):
+        conf = self.confs[1]
+        opt = OptimizeOpponents(verbose=False)
+        opt.optimize(conf, numRuns=3, numIterations=100000, seed=1)
+        self.assertEqual(opt.stopReasons, [StopReason.LOWER_BOUND])
+        self.assertTrue(Bounds.reached(opt.bestScore, Bounds.opponentsLowerBound(conf)))
+
+
+if __name__ == '__main__':
+    unittest.main()
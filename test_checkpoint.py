@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from checkpoint import *
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "test.checkpoint")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_saveLoad(self):
+        checkpoint = Checkpoint(self.path, interval=10)
+        self.assertFalse(checkpoint.exists())
+        for i in range(100):
+            checkpoint.save({"iteration": i, "players": list(range(i))})
+        checkpoint.close()
+
+        # the latest state is always written, older ones may be skipped
+        self.assertTrue(checkpoint.exists())
+        self.assertGreaterEqual(checkpoint.writes, 1)
+        self.assertEqual(checkpoint.load(), {"iteration": 99, "players": list(range(99))})
+        self.assertEqual(os.listdir(self.dir.name), ["test.checkpoint"])
+
+        # writer is restarted after close
+        checkpoint.save({"iteration": 100})
+        checkpoint.close()
+        self.assertEqual(Checkpoint(self.path).load(), {"iteration": 100})
+
+        checkpoint.close(remove=True)
+        self.assertFalse(checkpoint.exists())
+
+    def test_writeError(self):
+        checkpoint = Checkpoint(os.path.join(self.dir.name, "missing", "test.checkpoint"))
+        checkpoint.save({"iteration": 0})
+        with self.assertRaises(RuntimeError):
+            checkpoint.close()
+
+    def test_badInterval(self):
+        with self.assertRaises(ValueError):
+            Checkpoint(self.path, interval=0)
+
+
+class CrashingCheckpoint(Checkpoint):
+    '''Checkpoint which interrupts optimization (like Ctrl-C) after <numSaves> saves'''
+
+    def __init__(self, path: str, interval: int, numSaves: int):
+        super().__init__(path, interval)
+        self.numSaves = numSaves
+
+    def save(self, state: dict):
+        super().save(state)
+        self.numSaves -= 1
+        if self.numSaves == 0:
+            raise KeyboardInterrupt()
+
+
+if __name__ == '__main__':
+    unittest.main()
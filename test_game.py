@@ -1,6 +1,9 @@
+import random
 import unittest
 from game import *
 from player import *
+from schedule import *
+from schedule_factory import *
 
 
 class TestGame(unittest.TestCase):
@@ -36,7 +39,64 @@ class TestGame(unittest.TestCase):
         self.assertEqual(len(game.players), 10)
         self.assertFalse(game.isValid())
 
-    pass
+    def test_maskPlayers_Ascending(self):
+        mask = playersMask([9, 3, 0, 7])
+        self.assertEqual(mask, 0b1010001001)
+        self.assertEqual(list(maskPlayers(mask)), [0, 3, 7, 9])
+        self.assertEqual(maskCount(mask), 4)
+        self.assertEqual(list(maskPlayers(0)), [])
+
+    def test_maskChoice_ReachesEveryPlayer(self):
+        players = [2, 5, 11, 30, 63]
+        mask = playersMask(players)
+        rng = random.Random(17)
+        chosen = [maskChoice(mask, rng) for _ in range(500)]
+        self.assertEqual(set(chosen), set(players))
+
+        # the same seed gives the same choices
+        rng = random.Random(17)
+        self.assertEqual([maskChoice(mask, rng) for _ in range(500)], chosen)
+
+    def test_mask_BigPlayerIds(self):
+        players = [1, 64, 65, 100, 1000]
+        mask = playersMask(players)
+        self.assertEqual(list(maskPlayers(mask)), players)
+        self.assertEqual(maskCount(mask), len(players))
+        rng = random.Random(3)
+        self.assertEqual({maskChoice(mask, rng) for _ in range(300)}, set(players))
+
+        gameSet = GameSet(1, players)
+        self.assertTrue(gameSet.contains(1000))
+        gameSet.swap(1000, 200)
+        self.assertFalse(gameSet.contains(1000))
+        self.assertEqual(gameSet.players, {1, 64, 65, 100, 200})
+
+    def test_gameSetView_MaskAndSwap(self):
+        conf = Configuration(numPlayers=100, numTables=10, numRounds=10, numGames=100, numAttempts=10)
+        s = ScheduleFactory.createInitialSchedule(conf)
+        slot = s.slots[s.games[9].id]
+        players = list(s.games[9].players)
+        self.assertEqual(list(maskPlayers(slot.mask)), sorted(players))
+
+        # player ids >= 64 don't fit machine words
+        playerOut = max(players)
+        self.assertGreaterEqual(playerOut, 64)
+        playerIn = next(id for id in range(conf.numPlayers) if id not in players)
+        seat = players.index(playerOut)
+        slot.swap(playerOut, playerIn)
+        self.assertEqual(s.games[9].players[seat], playerIn)
+        self.assertEqual(slot.mask, playersMask(s.games[9].players))
+        self.assertIn((s.games[9].id, s.roundOfGame(s.games[9].id), seat), s.playerGames(playerIn))
+
+    def test_gameSetView_SwapMissingPlayer(self):
+        conf = Configuration(numPlayers=20, numTables=2, numRounds=10, numGames=20, numAttempts=10)
+        s = ScheduleFactory.createInitialSchedule(conf)
+        slot = s.slots[s.games[0].id]
+        missing = next(id for id in range(conf.numPlayers) if id not in s.games[0].players)
+        mask = slot.mask
+        with self.assertRaises(ScheduleException):
+            slot.swap(missing, 0)
+        self.assertEqual(slot.mask, mask)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,92 @@
+import unittest
+
+from instrumentation import *
+from schedule_factory import *
+from optimize_opponents import *
+from optimize_seats import *
+
+
+class ProgressCounter(OptimizationListener):
+    progressInterval = 100
+
+    def __init__(self):
+        self.started = 0
+        self.reports = []
+        self.finished = []
+
+    def stageStarted(self, stats: StageStats):
+        self.started += 1
+
+    def progress(self, stats: StageStats):
+        self.reports.append(stats.iterations)
+
+    def stageFinished(self, stats: StageStats):
+        self.finished.append(stats)
+
+
+class TestInstrumentation(unittest.TestCase):
+    conf = Configuration(numPlayers=30, numTables=3,
+                         numRounds=10, numGames=30, numAttempts=10)
+
+    def test_stageStats(self):
+        stats = StageStats("seats", numIterations=100, startScore=10.0)
+        self.assertEqual(stats.iterationsPerSecond, 0)
+        self.assertEqual(stats.acceptanceRate, 0)
+
+        stats.iterations = 100
+        stats.accepted = 25
+        stats.seconds = 0.5
+        stats.bestScore = 5.0
+        self.assertEqual(stats.iterationsPerSecond, 200)
+        self.assertEqual(stats.acceptanceRate, 0.25)
+        self.assertIn("200/s", stats.describe())
+
+    def test_phaseTimer(self):
+        timer = PhaseTimer()
+        timer.start()
+        timer.lap("proposal")
+        timer.lap("scoring")
+        timer.lap("proposal")
+        self.assertEqual(set(timer.seconds), {"proposal", "scoring"})
+        self.assertTrue(all(seconds >= 0 for seconds in timer.seconds.values()))
+
+    def test_opponents(self):
+        listener = ProgressCounter()
+        optimizer = OptimizeOpponents(verbose=False, listener=listener)
+        optimizer.optimize(self.conf, numRuns=2, numIterations=250, seed=1)
+        self.assertEqual(listener.started, 2)
+        self.assertEqual(listener.reports, [0, 100, 200] * 2)
+
+        stats = listener.finished[-1]
+        self.assertEqual(stats.iterations, 250)
+        self.assertEqual(stats.moves, {"random swap": (250, stats.accepted)})
+        self.assertEqual(stats.trajectory[-1], (250, stats.score))
+        self.assertEqual(min(stats.bestScore for stats in listener.finished), optimizer.bestScore)
+        self.assertLess(stats.bestScore, stats.startScore)
+        self.assertEqual(stats.phases, {})
+
+    def test_opponents_phaseTimings(self):
+        collector = StatsCollector(phaseTimings=True)
+        optimizer = OptimizeOpponents(verbose=False, steepest=True, listener=collector)
+        optimizer.optimize(self.conf, numRuns=1, numIterations=50, seed=1)
+        stats = collector.stages[0]
+        self.assertEqual(set(stats.phases), {"proposal", "scoring", "apply"})
+        self.assertEqual(list(stats.moves), ["steepest swap"])
+        self.assertIn("Stage 1: opponents", collector.report())
+
+    def test_seats(self):
+        collector = StatsCollector(phaseTimings=True)
+        s = ScheduleFactory.createInitialSchedule(self.conf)
+        opt = OptimizeSeats(s, verbose=False, adaptiveMoves=True, listener=collector)
+        opt.optimize(numRuns=2, iterations=[200, 100], seed=1)
+        self.assertEqual([stats.iterations for stats in collector.stages], [200, 100, 200, 100])
+
+        stats = collector.stages[-1]
+        self.assertEqual(list(stats.moves), ["swapAllPlayers", "swapTwoPlayers", "rotateThreePlayers"])
+        self.assertEqual(sum(tried for tried, _ in stats.moves.values()), 100)
+        self.assertEqual(sum(accepted for _, accepted in stats.moves.values()), stats.accepted)
+        self.assertTrue({"proposal", "scoring", "undo"} <= set(stats.phases))
+
+
+if __name__ == '__main__':
+    unittest.main()
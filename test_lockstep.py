@@ -0,0 +1,108 @@
+import unittest
+
+from schedule_factory import *
+from optimize_opponents import *
+from test_optimize_opponents import ScoreAssertions
+from optimize_seats import *
+from opponents_score import OpponentsScore
+from seats_score import SeatsScore
+
+try:
+    from lockstep import *
+except ImportError:
+    LockstepChains = None
+
+
+@unittest.skipIf(LockstepChains is None, "numpy is not installed")
+class TestLockstep(ScoreAssertions, unittest.TestCase):
+    confs = [
+        Configuration(numPlayers=12, numTables=1, numRounds=12, numGames=12, numAttempts=10),
+        Configuration(numPlayers=36, numTables=3, numRounds=12, numGames=36, numAttempts=10)]
+
+    def test_lockstepOpponents_chainsMatchTracker(self):
+        for conf in self.confs:
+            s = ScheduleFactory.createInitialSchedule(conf)
+            acceptance = SimulatedAnnealing()
+            engine = LockstepOpponents(s, 8, acceptance, np.random.default_rng(5))
+            acceptance.start(300)
+            for i in range(300):
+                acceptance.step(i, False)
+                engine.step()
+
+            for chain in range(8):
+                s.restore(toSnapshot(engine.players[chain]))
+                self.assertTrue(s.isValid())
+                tracker = OpponentsScore(s)
+                self.assertAlmostEqual(engine.scores[chain], tracker.score, places=6)
+                self.assertEqual(engine.opponents[chain].tolist(), tracker.opponents)
+                self.assertEqual(engine.hist[chain].tolist(), tracker.hist)
+
+    def test_lockstepSeats_chainsMatchTracker(self):
+        s = ScheduleFactory.createInitialSchedule(self.confs[1])
+        engine = LockstepSeats(s, 8, GreedyAcceptance(), np.random.default_rng(5))
+        for _ in range(300):
+            engine.step()
+
+        for chain in range(8):
+            s.restore(toSnapshot(engine.players[chain]))
+            self.assertTrue(s.isValid())
+            tracker = SeatsScore(s)
+            self.assertAlmostEqual(engine.scores[chain], tracker.score, places=6)
+            self.assertEqual(engine.seats[chain].tolist(), tracker.seats)
+
+    def test_optimizeOpponents_lockstepBackend(self):
+        conf = self.confs[1]
+        one = OptimizeOpponents(verbose=False, backend=OptimizeOpponents.LOCKSTEP)
+        s1 = one.optimize(conf, numRuns=8, numIterations=300, seed=525)
+        self.assertTrue(s1.isValid())
+        self.assertScoreMatchesReference(one)
+
+        two = OptimizeOpponents(verbose=False, backend=OptimizeOpponents.LOCKSTEP)
+        s2 = two.optimize(conf, numRuns=8, numIterations=300, seed=525)
+        self.assertEqual(s1.toJson(), s2.toJson())
+
+    def test_refine_lockstepBackend(self):
+        conf = self.confs[1]
+        start = ScheduleFactory.createBalancedSchedule(conf, seed=4)
+        startScore = OpponentsScore(start).score
+        refined = OptimizeOpponents(verbose=False, backend=OptimizeOpponents.LOCKSTEP)
+        schedule = refined.refine(start, numRuns=4, numIterations=300, seed=5)
+        self.assertTrue(schedule.isValid())
+        self.assertLess(refined.bestScore, startScore)
+        self.assertScoreMatchesReference(refined)
+
+    def test_optimizeOpponents_lockstepBalancedStart(self):
+        conf = self.confs[1]
+        sequential = OptimizeOpponents(verbose=False, backend=OptimizeOpponents.LOCKSTEP)
+        sequential.optimize(conf, numRuns=4, numIterations=0, seed=1)
+        balanced = OptimizeOpponents(verbose=False, backend=OptimizeOpponents.LOCKSTEP,
+                                     initial=OptimizeOpponents.BALANCED)
+        balanced.optimize(conf, numRuns=4, numIterations=0, seed=1)
+
+        start = ScheduleFactory.createBalancedSchedule(conf, seed=1)
+        self.assertAlmostEqual(balanced.bestScore, OpponentsScore(start).score, places=6)
+        self.assertLess(balanced.bestScore, sequential.bestScore)
+
+    def test_optimizeSeats_lockstepBackend(self):
+        s = ScheduleFactory.createInitialSchedule(self.confs[1])
+        opt = OptimizeSeats(s, verbose=False, acceptance=SimulatedAnnealing(1.0, 0.01), backend=OptimizeSeats.LOCKSTEP)
+        initialScore = opt.scoreFunc()
+        opt.optimize(numRuns=8, iterations=[300, 300], seed=727)
+        self.assertTrue(s.isValid())
+        self.assertLess(opt.bestScore, initialScore)
+        self.assertAlmostEqual(opt.bestScore, opt.scoreFunc(), places=6)
+
+        # the same games, only seats are changed
+        for game, initial in zip(s.games, ScheduleFactory.createInitialSchedule(self.confs[1]).games):
+            self.assertEqual(set(game.players), set(initial.players))
+
+    def test_lockstepBackend_unsupportedOptions(self):
+        with self.assertRaises(ValueError):
+            OptimizeOpponents(verbose=False, steepest=True, backend=OptimizeOpponents.LOCKSTEP)
+        s = ScheduleFactory.createInitialSchedule(self.confs[0])
+        with self.assertRaises(ValueError):
+            OptimizeSeats(s, verbose=False, adaptiveMoves=True, backend=OptimizeSeats.LOCKSTEP)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from main import *
+
+
+class TestMain(unittest.TestCase):
+
+    def run_main(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            main(list(argv))
+        return output.getvalue()
+
+    def test_configuration(self):
+        parser = createParser()
+        args = parser.parse_args(["optimize-opponents", "--preset", "GG-2021"])
+        self.assertEqual(configuration(args), Configurations["GG-2021"])
+
+        args = parser.parse_args(["optimize-opponents", "--players", "20", "--tables", "2",
+                                  "--rounds", "10", "--attempts", "10"])
+        self.assertEqual(configuration(args), Configuration(numPlayers=20, numTables=2, numRounds=10,
+                                                            numGames=20, numAttempts=10))
+
+        for argv in [["--preset", "GG-2021", "--players", "36"],
+                     ["--players", "20", "--tables", "2"],
+                     ["--players", "33", "--tables", "3", "--rounds", "10", "--attempts", "10"],
+                     # a single game or no games in the last round
+                     ["--players", "31", "--tables", "3", "--rounds", "11", "--attempts", "10"],
+                     ["--players", "40", "--tables", "4", "--rounds", "10", "--attempts", "9"]]:
+            args = parser.parse_args(["optimize-opponents"] + argv)
+            with self.assertRaises(ConfigurationException):
+                configuration(args)
+
+    def test_errors(self):
+        for argv in [[],
+                     ["optimize-opponents", "--preset", "GG-2021", "--checkpoint", "x", "--jobs", "2"],
+                     ["optimize-opponents", "--players", "20"]]:
+            with self.assertRaises(SystemExit):
+                self.run_main(*argv)
+
+    def test_legacyRefineBudget(self):
+        args = createParser().parse_args(["refine", "schedule.txt", "30"])
+        self.assertEqual(args.legacy_budget, 30)
+        self.assertEqual(args.time_budget, 600)
+
+    def test_commands(self):
+        with tempfile.TemporaryDirectory() as directory:
+            opponents = os.path.join(directory, "opponents.txt")
+            seats = os.path.join(directory, "seats.txt")
+            checkpoint = os.path.join(directory, "opponents.checkpoint")
+            self.run_main("optimize-opponents", "--players", "20", "--tables", "2", "--rounds", "10",
+                          "--attempts", "10", "--runs", "1", "--iterations", "500", "--seed", "1",
+                          "--checkpoint", checkpoint, "-o", opponents)
+            # finished optimization doesn't keep the checkpoint
+            self.assertFalse(os.path.exists(checkpoint))
+
+            self.run_main("optimize-seats", opponents, "--seat-runs", "1", "--seat-iterations", "100",
+                          "--seed", "1", "-o", seats)
+            s = loadSchedule(seats)
+            self.assertTrue(s.isValid())
+            self.assertEqual(s.configuration.numPlayers, 20)
+
+            self.assertIn("Optimality gap", self.run_main("report", seats))
+
+            people = os.path.join(directory, "people.txt")
+            self.run_main("participants", "--players", "20", "-o", people)
+            exported = self.run_main("export", seats, "--participants", people)
+            # 10 rounds of 10 seats, every round ends with an empty line
+            self.assertEqual(len(exported.splitlines()), 10 * 11)
+            self.assertNotIn("Loading", exported)
+
+
+if __name__ == '__main__':
+    unittest.main()
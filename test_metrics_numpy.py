@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from schedule_factory import *
+from metrics import *
+
+try:
+    from metrics_numpy import NumpyMetrics
+except ImportError:
+    NumpyMetrics = None
+
+
+@unittest.skipIf(NumpyMetrics is None, "numpy is not installed")
+class TestNumpyMetrics(unittest.TestCase):
+    def createSchedule(self):
+        random.seed(112)
+        conf = Configuration(numPlayers=25, numTables=2,
+                             numRounds=10, numGames=20, numAttempts=8)
+        s = ScheduleFactory.createInitialSchedule(conf)
+        for game in s.games:
+            random.shuffle(game.players)
+        # mix players between games to get non-trivial histograms
+        for _ in range(50):
+            gameOne, gameTwo = random.sample(s.games, 2)
+            one = set(gameOne.players)
+            two = set(gameTwo.players)
+            seatsOne = [i for i, id in enumerate(gameOne.players) if id not in two]
+            seatsTwo = [i for i, id in enumerate(gameTwo.players) if id not in one]
+            if len(seatsOne) == 0 or len(seatsTwo) == 0:
+                continue
+            seatOne = random.choice(seatsOne)
+            seatTwo = random.choice(seatsTwo)
+            gameOne.players[seatOne], gameTwo.players[seatTwo] = gameTwo.players[seatTwo], gameOne.players[seatOne]
+        return s
+
+    def test_numpyMetrics_sameAsMetrics(self):
+        s = self.createSchedule()
+        m = Metrics(s)
+        n = NumpyMetrics(s)
+
+        self.assertEqual(n.calcOpponentsMatrix(), m.calcOpponentsMatrix())
+        self.assertEqual(n.calcSeatsMatrix(), m.calcSeatsMatrix())
+        self.assertEqual(n.calcPairsHistogram(), m.calcPairsHistogram())
+        for playerId in range(s.numPlayers):
+            self.assertEqual(n.calcPlayerOpponents(playerId), m.calcPlayerOpponents(playerId))
+            self.assertEqual(n.calcPlayerPairsHistogram(playerId), m.calcPlayerPairsHistogram(playerId))
+            self.assertEqual(n.calcPlayerPairs(playerId), m.calcPlayerPairs(playerId))
+            self.assertEqual(n.calcPlayerSeatsHistogram(playerId), m.calcPlayerSeatsHistogram(playerId))
+            self.assertAlmostEqual(n.penaltyPlayer(playerId), m.penaltyPlayer(playerId), places=9)
+
+    def test_metrics_create(self):
+        s = self.createSchedule()
+        self.assertIsInstance(Metrics.create(s), NumpyMetrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
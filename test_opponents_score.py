@@ -0,0 +1,87 @@
+import random
+import unittest
+
+from schedule_factory import *
+from optimize_opponents import *
+from opponents_score import *
+
+try:
+    from opponents_score_numpy import NumpyOpponentsScore
+except ImportError:
+    NumpyOpponentsScore = None
+
+
+class TestOpponentsScore(unittest.TestCase):
+    def checkRandomSwaps(self, conf: Configuration, sameRound: bool):
+        random.seed(525)
+        opt = OptimizeOpponents(verbose=False)
+        opt.schedule = ScheduleFactory.createInitialSchedule(conf)
+        tracker = OpponentsScore(opt.schedule)
+        self.assertAlmostEqual(tracker.score, opt.scoreFunc(), places=6)
+
+        for _ in range(200):
+            if sameRound:
+                r = random.choice(opt.schedule.rounds)
+                gameOneId, gameTwoId = random.sample(r.gameIds, 2)
+            else:
+                gameOneId, gameTwoId = random.sample(range(conf.numGames), 2)
+            slotOne = opt.schedule.slots[gameOneId]
+            slotTwo = opt.schedule.slots[gameTwoId]
+            one = slotOne.mask
+            two = slotTwo.mask
+            poolA = slotOne.players.difference(slotTwo.players)
+            poolB = slotTwo.players.difference(slotOne.players)
+            if len(poolA) == 0 or len(poolB) == 0:
+                continue
+            playerA = random.choice(sorted(poolA))
+            playerB = random.choice(sorted(poolB))
+
+            before = opt.scoreFunc()
+            delta = tracker.swapDelta(one, two, playerA, playerB)
+            tracker.applySwap(one, two, playerA, playerB)
+            slotOne.swap(playerA, playerB)
+            slotTwo.swap(playerB, playerA)
+            after = opt.scoreFunc()
+
+            self.assertAlmostEqual(delta, after - before, places=6)
+            self.assertAlmostEqual(tracker.score, after, places=6)
+
+    def test_opponentsScore_swapInGames(self):
+        conf = Configuration(numPlayers=36, numTables=3,
+                             numRounds=12, numGames=36, numAttempts=10)
+        self.checkRandomSwaps(conf, sameRound=True)
+
+    def test_opponentsScore_swapInRounds(self):
+        conf = Configuration(numPlayers=12, numTables=1,
+                             numRounds=12, numGames=12, numAttempts=10)
+        self.checkRandomSwaps(conf, sameRound=False)
+
+    def checkSwapDeltas(self, tracker: OpponentsScore, schedule: Schedule):
+        for r in schedule.rounds[:3]:
+            one = schedule.slots[r.gameIds[0]].mask
+            two = schedule.slots[r.gameIds[1]].mask
+            playersOne, playersTwo, deltas = tracker.swapDeltas(one, two)
+            self.assertEqual(len(playersOne), 10)
+            self.assertEqual(len(playersTwo), 10)
+            for a, playerA in enumerate(playersOne):
+                for b, playerB in enumerate(playersTwo):
+                    self.assertAlmostEqual(deltas[a][b], tracker.swapDelta(one, two, playerA, playerB), places=6)
+
+    def test_opponentsScore_swapDeltas(self):
+        conf = Configuration(numPlayers=36, numTables=3,
+                             numRounds=12, numGames=36, numAttempts=10)
+        opt = OptimizeOpponents(verbose=False)
+        schedule = opt.optimize(conf, numRuns=1, numIterations=300, seed=17)
+        self.checkSwapDeltas(OpponentsScore(schedule), schedule)
+
+    @unittest.skipIf(NumpyOpponentsScore is None, "numpy is not installed")
+    def test_numpyOpponentsScore_swapDeltas(self):
+        conf = Configuration(numPlayers=36, numTables=3,
+                             numRounds=12, numGames=36, numAttempts=10)
+        opt = OptimizeOpponents(verbose=False)
+        schedule = opt.optimize(conf, numRuns=1, numIterations=300, seed=17)
+        self.checkSwapDeltas(NumpyOpponentsScore(schedule), schedule)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+
+from optimize_opponents import *
+from test_checkpoint import CrashingCheckpoint
+
+import os
+import tempfile
+
+
+class ScoreAssertions:
+    def assertScoreMatchesReference(self, optimizer: OptimizeOpponents):
+        '''Best score of <optimizer> is the score of its best schedule calculated from scratch'''
+        check = OptimizeOpponents(verbose=False)
+        check.schedule = optimizer.bestSchedule
+        self.assertAlmostEqual(optimizer.bestScore, check.scoreFunc(), places=6)
+
+
+class TestOptimizeOpponents(ScoreAssertions, unittest.TestCase):
+    conf = Configuration(numPlayers=12, numTables=1,
+                         numRounds=12, numGames=12, numAttempts=10)
+
+    def test_optimize_sameSeedSameResult(self):
+        one = OptimizeOpponents(verbose=False)
+        s1 = one.optimize(self.conf, numRuns=3, numIterations=300, seed=525)
+        two = OptimizeOpponents(verbose=False)
+        s2 = two.optimize(self.conf, numRuns=3, numIterations=300, seed=525)
+        self.assertEqual(one.bestScore, two.bestScore)
+        self.assertEqual(s1.toJson(), s2.toJson())
+
+    def test_optimize_jobsSameResult(self):
+        serial = OptimizeOpponents(verbose=False)
+        s1 = serial.optimize(self.conf, numRuns=3, numIterations=300, seed=727)
+        parallel = OptimizeOpponents(verbose=False)
+        s2 = parallel.optimize(self.conf, numRuns=3, numIterations=300, jobs=2, seed=727)
+        self.assertTrue(s2.isValid())
+        self.assertEqual(serial.bestScore, parallel.bestScore)
+        self.assertEqual(s1.toJson(), s2.toJson())
+
+    def test_optimize_annealingKeepsBest(self):
+        optimizer = OptimizeOpponents(verbose=False, acceptance=SimulatedAnnealing(reheatAfter=100))
+        schedule = optimizer.optimize(self.conf, numRuns=2, numIterations=500, seed=313)
+        self.assertTrue(schedule.isValid())
+        self.assertScoreMatchesReference(optimizer)
+
+    def test_optimize_steepestTabu(self):
+        conf = Configuration(numPlayers=36, numTables=3,
+                             numRounds=12, numGames=36, numAttempts=10)
+        optimizer = OptimizeOpponents(verbose=False, acceptance=SimulatedAnnealing(), steepest=True, tabuTenure=10)
+        schedule = optimizer.optimize(conf, numRuns=1, numIterations=300, seed=99)
+        self.assertTrue(schedule.isValid())
+        self.assertScoreMatchesReference(optimizer)
+
+    def test_isTabu(self):
+        optimizer = OptimizeOpponents(verbose=False, tabuTenure=5)
+        optimizer.tabu = {(3, 1): 10}
+        optimizer.iteration = 9
+        self.assertTrue(optimizer.isTabu(3, 1))
+        self.assertFalse(optimizer.isTabu(3, 2))
+        optimizer.iteration = 10
+        self.assertFalse(optimizer.isTabu(3, 1))
+
+    def test_optimizeHalving(self):
+        optimizer = OptimizeOpponents(verbose=False, acceptance=SimulatedAnnealing())
+        schedule = optimizer.optimizeHalving(self.conf, numRuns=4, minIterations=100, seed=11)
+        self.assertTrue(schedule.isValid())
+        self.assertScoreMatchesReference(optimizer)
+
+    def test_optimize_balancedInitial(self):
+        conf = Configuration(numPlayers=30, numTables=3,
+                             numRounds=10, numGames=30, numAttempts=10)
+        optimizer = OptimizeOpponents(verbose=False, initial=OptimizeOpponents.BALANCED)
+        schedule = optimizer.optimize(conf, numRuns=2, numIterations=200, jobs=2, seed=5)
+        self.assertTrue(schedule.isValid())
+        self.assertScoreMatchesReference(optimizer)
+        with self.assertRaises(ValueError):
+            OptimizeOpponents(verbose=False, initial="random")
+
+    def test_refine(self):
+        conf = Configuration(numPlayers=30, numTables=3,
+                             numRounds=10, numGames=30, numAttempts=10)
+        optimizer = OptimizeOpponents(verbose=False)
+        start = optimizer.optimize(conf, numRuns=1, numIterations=300, seed=8)
+        startScore = optimizer.bestScore
+        startJson = start.toJson()
+
+        refined = OptimizeOpponents(verbose=False)
+        schedule = refined.refine(start, numRuns=2, numIterations=300, jobs=2, seed=9)
+        self.assertTrue(schedule.isValid())
+        self.assertLess(refined.bestScore, startScore)
+        self.assertScoreMatchesReference(refined)
+
+        # start schedule isn't changed, most of players keep their seats
+        self.assertEqual(start.toJson(), startJson)
+        kept = sum(a == b for a, b in zip(start.playersArray, schedule.playersArray))
+        self.assertGreater(kept, len(start.playersArray) / 2)
+
+        # nothing to improve: start schedule is returned
+        self.assertIs(refined.refine(schedule, numRuns=1, numIterations=0, seed=9), schedule)
+
+    def test_checkpointResume(self):
+        conf = Configuration(numPlayers=30, numTables=3,
+                             numRounds=10, numGames=30, numAttempts=10)
+        one = OptimizeOpponents(verbose=False, acceptance=SimulatedAnnealing(), steepest=True, tabuTenure=5)
+        s1 = one.optimize(conf, numRuns=3, numIterations=200, seed=21)
+
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "opponents.checkpoint")
+            two = OptimizeOpponents(verbose=False, acceptance=SimulatedAnnealing(), steepest=True, tabuTenure=5)
+            with self.assertRaises(KeyboardInterrupt):
+                two.optimize(conf, numRuns=3, numIterations=200, seed=21,
+                             checkpoint=CrashingCheckpoint(path, interval=50, numSaves=7))
+
+            # the same result as without interruption, checkpoint is removed at the end
+            three = OptimizeOpponents(verbose=False)
+            checkpoint = Checkpoint(path)
+            s3 = three.resume(checkpoint)
+            self.assertEqual(one.bestScore, three.bestScore)
+            self.assertEqual(one.stopReasons, three.stopReasons)
+            self.assertEqual(s1.toJson(), s3.toJson())
+            self.assertFalse(checkpoint.exists())
+
+        with self.assertRaises(ValueError):
+            OptimizeOpponents(verbose=False).optimize(conf, numRuns=2, numIterations=10, jobs=2, checkpoint=checkpoint)
+
+
+class TestAcceptance(unittest.TestCase):
+    def test_greedy(self):
+        acceptance = GreedyAcceptance()
+        self.assertTrue(acceptance.accept(-0.5, random.Random(1)))
+        self.assertFalse(acceptance.accept(0.0, random.Random(1)))
+
+    def test_annealing_cooling(self):
+        for cooling in (SimulatedAnnealing.GEOMETRIC, SimulatedAnnealing.LINEAR):
+            acceptance = SimulatedAnnealing(initialTemperature=10.0, finalTemperature=1.0, cooling=cooling)
+            acceptance.start(100)
+            acceptance.step(0, False)
+            self.assertAlmostEqual(acceptance.temperature, 10.0)
+            acceptance.step(100, False)
+            self.assertAlmostEqual(acceptance.temperature, 1.0)
+
+    def test_annealing_reheat(self):
+        acceptance = SimulatedAnnealing(initialTemperature=10.0, finalTemperature=1.0, reheatAfter=10)
+        acceptance.start(100)
+        for i in range(50):
+            acceptance.step(i, False)
+        self.assertEqual(acceptance.reheats, 4)
+        self.assertGreater(acceptance.temperature, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+
+from schedule_factory import *
+from optimize_seats import *
+from test_checkpoint import CrashingCheckpoint
+
+import os
+import tempfile
+
+
+class TestOptimizeSeats(unittest.TestCase):
+    conf = Configuration(numPlayers=12, numTables=1,
+                         numRounds=12, numGames=12, numAttempts=10)
+
+    def createSchedule(self):
+        s = ScheduleFactory.createInitialSchedule(self.conf)
+        return s
+
+    def test_optimize_sameSeedSameResult(self):
+        s1 = self.createSchedule()
+        one = OptimizeSeats(s1, verbose=False)
+        one.optimize(numRuns=3, iterations=[300], seed=525)
+        s2 = self.createSchedule()
+        two = OptimizeSeats(s2, verbose=False)
+        two.optimize(numRuns=3, iterations=[300], seed=525)
+        self.assertEqual(one.bestScore, two.bestScore)
+        self.assertEqual(s1.toJson(), s2.toJson())
+
+    def test_optimize_parallel(self):
+        s = self.createSchedule()
+        opt = OptimizeSeats(s, verbose=False)
+        initialScore = opt.scoreFunc()
+        opt.optimize(numRuns=4, iterations=[300], jobs=2, seed=727)
+        self.assertTrue(s.isValid())
+        self.assertLess(opt.bestScore, initialScore)
+        self.assertAlmostEqual(opt.bestScore, opt.scoreFunc(), places=6)
+
+        # the same games, only seats are changed
+        for game, initial in zip(s.games, self.createSchedule().games):
+            self.assertEqual(set(game.players), set(initial.players))
+
+    def test_optimize_adaptiveAnnealing(self):
+        s = self.createSchedule()
+        opt = OptimizeSeats(s, verbose=False, acceptance=SimulatedAnnealing(1.0, 0.01), adaptiveMoves=True)
+        initialScore = opt.scoreFunc()
+        opt.optimize(numRuns=2, iterations=[500, 500], seed=313)
+        self.assertTrue(s.isValid())
+        self.assertLess(opt.bestScore, initialScore)
+        self.assertAlmostEqual(opt.bestScore, opt.scoreFunc(), places=6)
+        self.assertEqual(sum(opt.moveSelector.tried), 500)
+
+    def test_rotateThreePlayers(self):
+        s = self.createSchedule()
+        opt = OptimizeSeats(s, verbose=False)
+        game = s.games[0]
+        before = list(game.players)
+        opt.rotateThreePlayers(game)
+        after = list(game.players)
+        self.assertEqual(sorted(before), sorted(after))
+        self.assertEqual(sum(1 for one, two in zip(before, after) if one != two), 3)
+
+    def test_optimizeHalving(self):
+        s = self.createSchedule()
+        opt = OptimizeSeats(s, verbose=False, acceptance=SimulatedAnnealing(1.0, 0.01), adaptiveMoves=True)
+        initialScore = opt.scoreFunc()
+        opt.optimizeHalving(numRuns=4, minIterations=100, seed=11)
+        self.assertTrue(s.isValid())
+        self.assertLess(opt.bestScore, initialScore)
+        self.assertAlmostEqual(opt.bestScore, opt.scoreFunc(), places=6)
+
+    def test_construct(self):
+        s = self.createSchedule()
+        opt = OptimizeSeats(s, verbose=False)
+        self.assertEqual(opt.construct(seed=1), 0)
+        self.assertEqual(opt.scoreFunc(), 0)
+        self.assertTrue(s.isValid())
+        for game, initial in zip(s.games, self.createSchedule().games):
+            self.assertEqual(set(game.players), set(initial.players))
+
+    def test_optimizeAssignment(self):
+        s = self.createSchedule()
+        opt = OptimizeSeats(s, verbose=False)
+        initialScore = opt.scoreFunc()
+        opt.optimizeAssignment(seed=3)
+        self.assertTrue(s.isValid())
+        self.assertLess(opt.bestScore, initialScore)
+        self.assertAlmostEqual(opt.bestScore, opt.scoreFunc(), places=6)
+
+        # local optimum: no game can be improved alone
+        self.assertEqual(opt.stopReasons, [StopReason.NO_IMPROVEMENT])
+        self.assertFalse(any(opt.assignGame(game) for game in s.games))
+
+        score = opt.bestScore
+        opt.optimizeAssignment(kicks=10, seed=3)
+        self.assertLessEqual(opt.bestScore, score)
+        self.assertAlmostEqual(opt.bestScore, opt.scoreFunc(), places=6)
+
+    def test_checkpointResume(self):
+        s1 = self.createSchedule()
+        one = OptimizeSeats(s1, verbose=False, acceptance=SimulatedAnnealing(1.0, 0.01), adaptiveMoves=True)
+        one.optimize(numRuns=3, iterations=[200, 200], seed=21)
+
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "seats.checkpoint")
+            two = OptimizeSeats(self.createSchedule(), verbose=False, acceptance=SimulatedAnnealing(1.0, 0.01),
+                                adaptiveMoves=True)
+            with self.assertRaises(KeyboardInterrupt):
+                two.optimize(numRuns=3, iterations=[200, 200], seed=21,
+                             checkpoint=CrashingCheckpoint(path, interval=50, numSaves=11))
+
+            # the same result as without interruption, checkpoint is removed at the end
+            s3 = self.createSchedule()
+            three = OptimizeSeats(s3, verbose=False)
+            checkpoint = Checkpoint(path)
+            three.resume(checkpoint)
+            self.assertEqual(one.bestScore, three.bestScore)
+            self.assertEqual(one.stopReasons, three.stopReasons)
+            self.assertEqual(s1.toJson(), s3.toJson())
+            self.assertFalse(checkpoint.exists())
+
+
+class TestAdaptiveMoveSelector(unittest.TestCase):
+    def test_probabilities(self):
+        selector = AdaptiveMoveSelector(3, decay=0.5, minShare=0.1)
+        self.assertAlmostEqual(sum(selector.probabilities()), 1.0)
+        for _ in range(20):
+            selector.update(0, False)
+            selector.update(1, True)
+        probabilities = selector.probabilities()
+        self.assertAlmostEqual(sum(probabilities), 1.0)
+        self.assertAlmostEqual(probabilities[0], 0.1, places=3)
+        self.assertAlmostEqual(probabilities[1], probabilities[2])
+        self.assertEqual(selector.tried, [20, 20, 0])
+        self.assertEqual(selector.accepted, [0, 20, 0])
+
+    def test_choose(self):
+        selector = AdaptiveMoveSelector(2, minShare=0.0)
+        selector.rates = [0.0, 1.0]
+        rng = random.Random(5)
+        self.assertTrue(all(selector.choose(rng) == 1 for _ in range(100)))
+
+    def test_choose_followsProbabilities(self):
+        selector = AdaptiveMoveSelector(3, decay=0.3, minShare=0.05)
+        for index, accepted in [(0, True), (1, False), (2, True), (2, True), (1, False)]:
+            selector.update(index, accepted)
+
+        def chooseByProbabilities(rng):
+            value = rng.random()
+            for index, probability in enumerate(selector.probabilities()):
+                value -= probability
+                if value < 0:
+                    return index
+            return selector.numMoves - 1
+
+        one, two = random.Random(11), random.Random(11)
+        self.assertEqual([selector.choose(one) for _ in range(1000)],
+                         [chooseByProbabilities(two) for _ in range(1000)])
+
+
+if __name__ == '__main__':
+    unittest.main()
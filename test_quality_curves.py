@@ -0,0 +1,87 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from quality_curves import *
+
+
+class TestQualityCurves(unittest.TestCase):
+    conf = Configuration(numPlayers=30, numTables=3,
+                         numRounds=10, numGames=30, numAttempts=10)
+
+    def test_curve(self):
+        curve = QualityCurve("A", "greedy", 1, [(0.1, 100.0), (0.5, 50.0), (2.0, 10.0)])
+        self.assertIsNone(curve.scoreAt(0.05))
+        self.assertEqual(curve.scoreAt(0.1), 100.0)
+        self.assertEqual(curve.scoreAt(1.0), 50.0)
+        self.assertEqual(curve.finalScore, 10.0)
+        self.assertEqual(curve.timeToTarget(50.0), 0.5)
+        self.assertIsNone(curve.timeToTarget(5.0))
+        self.assertIsNone(QualityCurve("A", "greedy", 1).finalScore)
+
+    def test_recorderKeepsImprovements(self):
+        curve = QualityCurve("A", "greedy", 1)
+        recorder = CurveRecorder(curve)
+        for score in [100.0, 100.0, 80.0, 90.0, 70.0]:
+            recorder.record(score)
+        self.assertEqual([score for _, score in curve.points], [100.0, 80.0, 70.0])
+        times = [seconds for seconds, _ in curve.points]
+        self.assertEqual(times, sorted(times))
+
+    def test_summarize(self):
+        curves = [
+            QualityCurve("A", "greedy", 1, [(0.0, 100.0), (1.0, 40.0)]),
+            QualityCurve("A", "greedy", 2, [(0.0, 100.0), (3.0, 60.0)]),
+            QualityCurve("A", "greedy", 3, [(0.0, 100.0), (2.0, 20.0)]),
+            QualityCurve("A", "restarts", 1, [(0.0, 100.0), (3.0, 90.0)]),
+        ]
+        rows = summarize(curves, budget=4.0, targets={"A": 50.0})
+        self.assertEqual([row["strategy"] for row in rows], ["greedy", "restarts"])
+
+        greedy, restarts = rows
+        self.assertEqual(greedy["runs"], 3)
+        self.assertEqual(greedy["score25"], 100.0)
+        self.assertEqual(greedy["score50"], 40.0)
+        self.assertEqual(greedy["score100"], 40.0)
+        self.assertEqual(greedy["bestScore"], 20.0)
+        self.assertEqual(greedy["reached"], 2)
+        self.assertEqual(greedy["timeToTarget"], 2.0)
+        self.assertEqual(restarts["reached"], 0)
+        self.assertIsNone(restarts["timeToTarget"])
+        self.assertIn("restarts", formatSummary(rows))
+
+    def test_harness(self):
+        strategies = [strategy for strategy in opponentsStrategies() if strategy.name in ("greedy", "restarts-5k")]
+        harness = QualityHarness(strategies, budget=0.3, seeds=[1, 2])
+        curves = harness.run({"test": self.conf}, log=lambda *args: None)
+
+        self.assertEqual([(curve.strategy, curve.seed) for curve in curves],
+                         [("greedy", 1), ("greedy", 2), ("restarts-5k", 1), ("restarts-5k", 2)])
+        for curve in curves:
+            self.assertGreater(len(curve.points), 1)
+            scores = [score for _, score in curve.points]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "curves.csv")
+            saveCurves(curves, filename)
+            with open(filename, newline="") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(len(rows), sum(len(curve.points) for curve in curves))
+            self.assertEqual(float(rows[-1]["bestScore"]), curves[-1].finalScore)
+
+            filename = os.path.join(directory, "summary.csv")
+            saveSummary(summarize(curves, 0.3, {}), filename)
+            with open(filename, newline="") as f:
+                self.assertEqual(len(list(csv.DictReader(f))), 2)
+
+    def test_seatsStrategies(self):
+        strategy = [strategy for strategy in seatsStrategies() if strategy.name == "construct-annealing"][0]
+        curve = QualityHarness([strategy], budget=0.2, seeds=[1]).runStrategy("test", self.conf, strategy, 1)
+        # constructed seating of numAttempts multiple of 10 is optimal
+        self.assertAlmostEqual(curve.finalScore, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from racing import *
+from acceptance import *
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    def test_rungs(self):
+        halving = SuccessiveHalving(100)
+        self.assertEqual(halving.rungs(8), [(8, 100), (4, 200), (2, 400), (1, 800)])
+        self.assertEqual(halving.totalIterations(8), 3200)
+        self.assertEqual(SuccessiveHalving(10, keep=0.3, growth=3).rungs(10), [(10, 10), (3, 30), (1, 90)])
+
+    def test_forBudget(self):
+        halving = SuccessiveHalving.forBudget(8, 32000)
+        self.assertEqual(halving.minIterations, 1000)
+        self.assertLessEqual(halving.totalIterations(8), 32000)
+
+    def test_race(self):
+        # run quality is its index, score goes down with iterations
+        iterations = [0] * 8
+        def advance(run, numIterations):
+            iterations[run] += numIterations
+            return (run + 1000 / iterations[run], StopReason.ITERATIONS)
+
+        best, score, reason = SuccessiveHalving(10).race(list(range(8)), advance)
+        self.assertEqual(best, 0)
+        self.assertAlmostEqual(score, 1000 / 150)
+        self.assertEqual(reason, StopReason.ITERATIONS)
+        self.assertEqual(iterations, [150, 70, 30, 30, 10, 10, 10, 10])
+
+    def test_race_finalReason(self):
+        def advance(run, numIterations):
+            return (run, StopReason.TIME_BUDGET if run == 2 else StopReason.ITERATIONS)
+
+        best, score, reason = SuccessiveHalving(10).race([3, 1, 2, 5], advance)
+        self.assertEqual(best, 1)
+        self.assertEqual(score, 1)
+        self.assertEqual(reason, StopReason.TIME_BUDGET)
+
+    def test_continuedAcceptance(self):
+        annealing = SimulatedAnnealing(initialTemperature=10.0, finalTemperature=1.0)
+        acceptance = ContinuedAcceptance(annealing, 200)
+        self.assertFalse(acceptance.monotonic)
+        for stage in range(2):
+            acceptance.start(100)
+            for i in range(100):
+                acceptance.step(i, False)
+            self.assertAlmostEqual(annealing.temperature, 10.0 * 0.1 ** ((100 * stage + 99) / 200))
+
+
+if __name__ == '__main__':
+    unittest.main()
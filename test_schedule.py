@@ -1,3 +1,4 @@
+import pickle
 import unittest
 from schedule import Configuration
 from schedule import *
@@ -24,6 +25,70 @@ class TestSchedule(unittest.TestCase):
         self.assertEqual(s.participants, None)
         self.assertEqual(len(s.rounds), 1)
         self.assertEqual(len(s.games), 1)
+
+    def createSchedule(self):
+        numPlayers = 20
+        conf = Configuration(numPlayers, numTables = 2, numRounds = 1, numGames = 2, numAttempts = 1)
+        games = [Game(0, list(range(10))), Game(1, list(range(10, 20)))]
+        rounds = [Round(0, [0, 1])]
+        return Schedule(conf, rounds, games)
+
+    def test_schedule_GamesAndSlotsInSync(self):
+        s = self.createSchedule()
+        s.slots[0].swap(3, 15)
+        s.slots[1].swap(15, 3)
+        self.assertEqual(s.games[0].players, [0, 1, 2, 15, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(s.games[1].players, [10, 11, 12, 13, 14, 3, 16, 17, 18, 19])
+
+        s.games[0].players[0], s.games[0].players[9] = s.games[0].players[9], s.games[0].players[0]
+        self.assertEqual(s.slots[0].players, {9, 1, 2, 15, 4, 5, 6, 7, 8, 0})
+        self.assertTrue(s.slots[1].contains(3))
+        self.assertFalse(s.slots[1].contains(15))
+        self.assertTrue(s.isValid())
+
+    def test_schedule_PlayerGames(self):
+        s = self.createSchedule()
+        self.assertEqual(s.playerGames(3), [(0, 0, 3)])
+        s.slots[0].swap(3, 15)
+        s.slots[1].swap(15, 3)
+        self.assertEqual(s.playerGames(3), [(1, 0, 5)])
+        self.assertEqual(s.playerGames(15), [(0, 0, 3)])
+
+        s.games[1].players = list(reversed(s.games[1].players))
+        self.assertEqual(s.playerGames(3), [(1, 0, 4)])
+        s.games[1].players[0], s.games[1].players[4] = s.games[1].players[4], s.games[1].players[0]
+        self.assertEqual(s.playerGames(3), [(1, 0, 0)])
+        self.assertEqual(s.playerGamesCount(3), 1)
+        self.assertEqual(s.playerGames(25), [])
+
+    def test_schedule_SwapSeatsKeepsIndex(self):
+        s = self.createSchedule()
+        index = s._playerIndex()
+        mask = s.slots[1].mask
+        s.games[1].players.swap(0, 4)
+        self.assertEqual(s.games[1].players, [14, 11, 12, 13, 10, 15, 16, 17, 18, 19])
+        self.assertIs(s._playerIndex(), index)
+        self.assertEqual(s.playerGames(10), [(1, 0, 4)])
+        self.assertEqual(s.playerGames(14), [(1, 0, 0)])
+        self.assertEqual(s.slots[1].mask, mask)
+
+    def test_schedule_SnapshotRestore(self):
+        s = self.createSchedule()
+        snapshot = s.snapshot()
+        s.games[1].players = list(reversed(range(10, 20)))
+        s.slots[0].swap(0, 19)
+        s.restore(snapshot)
+        self.assertEqual(s.games[0].players, list(range(10)))
+        self.assertEqual(s.games[1].players, list(range(10, 20)))
+        self.assertEqual(s.slots[0].players, set(range(10)))
+
+    def test_schedule_Pickle(self):
+        s = self.createSchedule()
+        copy = pickle.loads(pickle.dumps(s))
+        self.assertEqual(copy.toJson(), s.toJson())
+        copy.slots[0].swap(0, 10)
+        self.assertEqual(copy.games[0].players[0], 10)
+        self.assertEqual(s.games[0].players[0], 0)
     
     pass
 
@@ -99,6 +99,42 @@ class TestScheduleFactory(unittest.TestCase):
         s = ScheduleFactory.createInitialSchedule(conf)
         self.assertTrue(s.isValid())
 
+    def test_balanced(self):
+        '''
+        Balanced schedules are valid, every player plays all attempts
+        and pairs are spread better than in the sequential schedule
+        '''
+        confs = [
+            Configuration(numPlayers=12, numTables=1, numRounds=6, numGames=6, numAttempts=5),
+            Configuration(numPlayers=25, numTables=2, numRounds=10, numGames=20, numAttempts=8),
+            Configuration(numPlayers=35, numTables=3, numRounds=12, numGames=35, numAttempts=10),
+            Configuration(numPlayers=36, numTables=3, numRounds=12, numGames=36, numAttempts=10),
+        ]
+        for conf in confs:
+            s = ScheduleFactory.createBalancedSchedule(conf, seed=1)
+            self.assertTrue(s.isValid())
+            for playerId in range(conf.numPlayers):
+                self.assertEqual(s.playerGamesCount(playerId), conf.numAttempts)
+
+            def maxMeetings(schedule):
+                meetings = {}
+                for game in schedule.games:
+                    for a in game.players:
+                        for b in game.players:
+                            if a < b:
+                                meetings[(a, b)] = meetings.get((a, b), 0) + 1
+                return max(meetings.values())
+            self.assertLessEqual(maxMeetings(s), maxMeetings(ScheduleFactory.createInitialSchedule(conf)))
+
+    def test_balanced_sameSeedSameResult(self):
+        conf = Configuration(numPlayers=25, numTables=2,
+                             numRounds=10, numGames=20, numAttempts=8)
+        one = ScheduleFactory.createBalancedSchedule(conf, seed=3)
+        two = ScheduleFactory.createBalancedSchedule(conf, seed=3)
+        self.assertEqual(one.toJson(), two.toJson())
+        self.assertTrue(ScheduleFactory.createBalancedSchedule(
+            Configuration(numPlayers=11, numTables=1, numRounds=1, numGames=1, numAttempts=1)) is None)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from schedule_factory import *
+from seats_construction import *
+from seats_score import SeatsScore
+
+
+class TestSeatsConstruction(unittest.TestCase):
+    def construct(self, conf: Configuration, seed: int):
+        s = ScheduleFactory.createBalancedSchedule(conf, seed=seed)
+        games = [set(game.players) for game in s.games]
+        s.restore(SeatsConstruction.balancedSeating(s, seed))
+        self.assertTrue(s.isValid())
+
+        # the same games, only seats are changed
+        self.assertEqual(games, [set(game.players) for game in s.games])
+        return s
+
+    def test_attemptsMultipleOf10(self):
+        confs = [
+            Configuration(numPlayers=12, numTables=1, numRounds=12, numGames=12, numAttempts=10),
+            Configuration(numPlayers=30, numTables=3, numRounds=10, numGames=30, numAttempts=10),
+            Configuration(numPlayers=20, numTables=2, numRounds=20, numGames=40, numAttempts=20),
+        ]
+        for conf in confs:
+            for seed in range(3):
+                s = self.construct(conf, seed)
+                self.assertEqual(SeatsScore(s).score, 0)
+
+    def test_attemptsNotMultipleOf10(self):
+        conf = Configuration(numPlayers=25, numTables=2, numRounds=10, numGames=20, numAttempts=8)
+        s = self.construct(conf, 1)
+        for seats in SeatsScore(s).seats:
+            self.assertEqual(max(seats), 1)
+
+        conf = Configuration(numPlayers=35, numTables=3, numRounds=12, numGames=35, numAttempts=10)
+        s = self.construct(conf, 1)
+        self.assertEqual(SeatsScore(s).score, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
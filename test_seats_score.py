@@ -0,0 +1,39 @@
+import random
+import unittest
+
+from schedule_factory import *
+from optimize_seats import *
+from seats_score import *
+
+
+class TestSeatsScore(unittest.TestCase):
+    def test_seatsScore_randomChanges(self):
+        random.seed(727)
+        conf = Configuration(numPlayers=25, numTables=2,
+                             numRounds=10, numGames=20, numAttempts=8)
+        s = ScheduleFactory.createInitialSchedule(conf)
+        opt = OptimizeSeats(s, verbose=False)
+        opt.random = random.Random(727)
+        tracker = SeatsScore(s)
+        self.assertAlmostEqual(tracker.score, opt.scoreFunc(), places=9)
+
+        for i in range(200):
+            game = random.choice(s.games)
+            oldPlayers = game.players.copy()
+            if i % 2 == 0:
+                opt.swapTwoPlayers(game)
+            else:
+                opt.swapAllPlayers(game)
+
+            delta = tracker.changeDelta(oldPlayers, game.players)
+            tracker.applyChange(oldPlayers, game.players)
+            after = opt.scoreFunc()
+            self.assertAlmostEqual(tracker.score, after, places=9)
+
+            tracker.applyChange(game.players, oldPlayers)
+            game.players = oldPlayers
+            self.assertAlmostEqual(delta, after - opt.scoreFunc(), places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import time
+import unittest
+
+from stopping import *
+from optimize_opponents import *
+from optimize_seats import *
+
+
+class TestStopping(unittest.TestCase):
+    conf = Configuration(numPlayers=12, numTables=1,
+                         numRounds=12, numGames=12, numAttempts=10)
+
+    def test_stopping_noCriteria(self):
+        state = StoppingState(None, None)
+        self.assertEqual(state.check(100000, 0.0), None)
+
+    def test_stopping_stall(self):
+        state = StoppingState(StoppingCriteria(maxStallIterations=10), None)
+        state.improved(5)
+        self.assertEqual(state.check(14, 1.0), None)
+        self.assertEqual(state.check(15, 1.0), StopReason.NO_IMPROVEMENT)
+
+    def test_stopping_target(self):
+        state = StoppingState(StoppingCriteria(targetScore=2.0), None)
+        self.assertEqual(state.check(1, 2.5), None)
+        self.assertEqual(state.check(1, 2.0), StopReason.TARGET_SCORE)
+
+    def test_stopping_timeBudget(self):
+        criteria = StoppingCriteria(timeBudget=0.0)
+        state = StoppingState(criteria, criteria.deadline())
+        time.sleep(0.01)
+        self.assertEqual(state.check(0, 1.0), StopReason.TIME_BUDGET)
+
+    def test_optimizeOpponents_targetScoreSkipsRuns(self):
+        opt = OptimizeOpponents(verbose=False)
+        s = opt.optimize(self.conf, numRuns=3, numIterations=1000, seed=1,
+                         stop=StoppingCriteria(targetScore=math.inf))
+        self.assertTrue(s.isValid())
+        self.assertEqual(opt.stopReasons, [StopReason.TARGET_SCORE])
+
+    def test_optimizeOpponents_stall(self):
+        conf = Configuration(numPlayers=25, numTables=2,
+                             numRounds=10, numGames=20, numAttempts=8)
+        opt = OptimizeOpponents(verbose=False)
+        opt.optimize(conf, numRuns=2, numIterations=100000, seed=1,
+                     stop=StoppingCriteria(maxStallIterations=200))
+        self.assertEqual(opt.stopReasons, [StopReason.NO_IMPROVEMENT] * 2)
+
+    def test_optimizeSeats_timeBudget(self):
+        s = ScheduleFactory.createInitialSchedule(self.conf)
+        opt = OptimizeSeats(s, verbose=False)
+        opt.optimize(numRuns=3, iterations=[10 ** 9], seed=1,
+                     stop=StoppingCriteria(timeBudget=0.2))
+        self.assertEqual(opt.stopReasons, [StopReason.TIME_BUDGET])
+        self.assertTrue(s.isValid())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import unittest
+
+from optimize_opponents import *
+from test_optimize_opponents import ScoreAssertions
+from tempering import *
+
+
+class TestTempering(ScoreAssertions, unittest.TestCase):
+    conf = Configuration(numPlayers=36, numTables=3,
+                         numRounds=12, numGames=36, numAttempts=10)
+
+    def test_geometricTemperatures(self):
+        temperatures = ParallelTempering.geometricTemperatures(0.5, 8.0, 5)
+        self.assertEqual(len(temperatures), 5)
+        self.assertAlmostEqual(temperatures[0], 0.5)
+        self.assertAlmostEqual(temperatures[2], 2.0)
+        self.assertAlmostEqual(temperatures[-1], 8.0)
+
+    def test_tooFewTemperatures(self):
+        with self.assertRaises(ValueError):
+            ParallelTempering(self.conf, [1.0])
+
+    def test_replicaStore_exchange(self):
+        store = ReplicaStore(2, 3)
+        store.save(0, array('i', [1, 2, 3]))
+        store.save(1, array('i', [4, 5, 6]))
+        store.scores[0] = 10.0
+        store.scores[1] = 20.0
+        store.exchange(0, 1)
+        self.assertEqual(store.load(0).tolist(), [4, 5, 6])
+        self.assertEqual(store.load(1).tolist(), [1, 2, 3])
+        self.assertEqual(list(store.scores), [20.0, 10.0])
+        self.assertEqual(list(store.reload), [1, 1])
+
+    def test_optimizeTempering_jobsSameResult(self):
+        temperatures = ParallelTempering.geometricTemperatures(0.5, 6.0, 4)
+        serial = OptimizeOpponents(verbose=False)
+        s1 = serial.optimizeTempering(self.conf, temperatures, numIterations=600, exchangeInterval=100, seed=525)
+        self.assertTrue(s1.isValid())
+        self.assertScoreMatchesReference(serial)
+        self.assertEqual(serial.stopReasons, [StopReason.ITERATIONS])
+
+        parallel = OptimizeOpponents(verbose=False)
+        s2 = parallel.optimizeTempering(self.conf, temperatures, numIterations=600, exchangeInterval=100,
+                                        jobs=2, seed=525)
+        self.assertEqual(serial.bestScore, parallel.bestScore)
+        self.assertEqual(s1.toJson(), s2.toJson())
+
+    def test_optimizeTempering_shortLastSegment(self):
+        temperatures = ParallelTempering.geometricTemperatures(0.5, 6.0, 4)
+        results = []
+        for jobs in [1, 2]:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                optimizer = OptimizeOpponents(verbose=False)
+                s = optimizer.optimizeTempering(self.conf, temperatures, numIterations=150, exchangeInterval=100,
+                                                jobs=jobs, seed=525)
+            self.assertIn("Iteration:      150 of 150", output.getvalue())
+            self.assertNotIn("Iteration:      200", output.getvalue())
+            results.append(s.toJson())
+        self.assertEqual(results[0], results[1])
+
+    def test_optimizeTempering_killedWorker(self):
+        def killWorker():
+            os.kill(multiprocessing.active_children()[0].pid, signal.SIGKILL)
+
+        temperatures = ParallelTempering.geometricTemperatures(0.5, 6.0, 4)
+        killer = threading.Timer(1.0, killWorker)
+        killer.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(RuntimeError):
+                OptimizeOpponents(verbose=False).optimizeTempering(self.conf, temperatures, numIterations=10 ** 9,
+                                                                   exchangeInterval=100, jobs=2, seed=525)
+        finally:
+            killer.join()
+
+
+if __name__ == '__main__':
+    unittest.main()